@@ -0,0 +1,527 @@
+import operator
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from buffers import (
+    FLOAT_TYPECODE,
+    INT_TYPECODE,
+    Buffer,
+    Number,
+    store,
+    typecode_of,
+    zeros,
+)
+from kernels import (
+    CLASSICAL,
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_STRASSEN_CUTOFF,
+    STRASSEN,
+    choose_matmul_strategy,
+    matmul_batched,
+    matmul_blocked,
+    matmul_strassen,
+)
+from parallel import matmul_parallel, should_parallelize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+AUTO = "auto"
+INT64_MAX = 2 ** 63 - 1
+
+
+class BackendNotAvailableException(Exception):
+    """Backend is not available.
+
+    This error is raised if backend is unknown or its optional dependencies
+    are not installed.
+
+    Args:
+        name: not available backend name.
+
+    """
+
+    def __init__(self, name: str):
+        super().__init__(f"{name} backend is not available.")
+
+
+class Backend(Protocol):
+    """Arithmetic kernels over flat row-major buffers."""
+
+    name: str
+
+    def matmul(
+        self,
+        left: Buffer,
+        right: Buffer,
+        rows_num: int,
+        inner_num: int,
+        columns_num: int,
+        strategy: str = CLASSICAL,
+        workers: int = 1,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get product of matrices.
+
+        Left matrix has size ``rows_num x inner_num``, right one has size
+        ``inner_num x columns_num``. Strategy is the name of algorithm and
+        workers is the number of processes (all CPUs if it isn't
+        positive), backends may ignore them if they have their own ones.
+
+        All kernels write the result to ``out`` buffer if it's set and
+        can hold the result, otherwise they return a new buffer. Out
+        buffer of multiplication must not overlap operands, elementwise
+        kernels may write over the left operand.
+
+        """
+
+    def matmul_batched(
+        self,
+        left: Buffer,
+        right: Buffer,
+        count: int,
+        rows_num: int,
+        inner_num: int,
+        columns_num: int,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get products of stacked matrices pairwise.
+
+        Right buffer holds ``count`` matrices or a single one multiplied
+        by every left matrix.
+
+        """
+
+    def add(
+        self,
+        left: Buffer,
+        right: Buffer,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get elementwise sum of buffers."""
+
+    def sub(
+        self,
+        left: Buffer,
+        right: Buffer,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get elementwise difference of buffers."""
+
+    def mul(
+        self,
+        values: Buffer,
+        number: Number,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get buffer multiplied by number."""
+
+
+class PythonBackend:
+    """Pure Python kernels, work with any kind of numbers.
+
+    Matrices are multiplied by the tiled classical algorithm or by Strassen
+    one, ``auto`` strategy chooses it by size of matrices. Big products
+    by the classical algorithm are spread between ``workers`` processes.
+
+    Args:
+        block_size: Size of tiles for classical multiplication.
+        strassen_cutoff: Size of matrices, starting from which Strassen
+            algorithm falls back to the classical one.
+
+    """
+
+    name = "python"
+
+    def __init__(
+        self,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        strassen_cutoff: int = DEFAULT_STRASSEN_CUTOFF,
+    ) -> None:
+        self.block_size = block_size
+        self.strassen_cutoff = strassen_cutoff
+
+    def matmul(
+        self,
+        left: Buffer,
+        right: Buffer,
+        rows_num: int,
+        inner_num: int,
+        columns_num: int,
+        strategy: str = CLASSICAL,
+        workers: int = 1,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get product of matrices by the chosen algorithm."""
+        if strategy == AUTO:
+            strategy = choose_matmul_strategy(rows_num, inner_num, columns_num)
+
+        if strategy == CLASSICAL and should_parallelize(
+            rows_num,
+            inner_num,
+            columns_num,
+            workers,
+        ):
+            return store(
+                out,
+                matmul_parallel(
+                    left,
+                    right,
+                    rows_num,
+                    inner_num,
+                    columns_num,
+                    workers,
+                    self.block_size,
+                ),
+            )
+        if strategy == CLASSICAL:
+            return matmul_blocked(
+                left,
+                right,
+                rows_num,
+                inner_num,
+                columns_num,
+                self.block_size,
+                out,
+            )
+        if strategy == STRASSEN:
+            return store(
+                out,
+                matmul_strassen(
+                    left,
+                    right,
+                    rows_num,
+                    inner_num,
+                    columns_num,
+                    self.strassen_cutoff,
+                ),
+            )
+        raise ValueError(f"Unknown multiplication strategy: {strategy}.")
+
+    def matmul_batched(
+        self,
+        left: Buffer,
+        right: Buffer,
+        count: int,
+        rows_num: int,
+        inner_num: int,
+        columns_num: int,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get products of stacked matrices pairwise."""
+        return matmul_batched(
+            left,
+            right,
+            count,
+            rows_num,
+            inner_num,
+            columns_num,
+            out,
+        )
+
+    def add(
+        self,
+        left: Buffer,
+        right: Buffer,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get elementwise sum of buffers."""
+        return store(out, list(map(operator.add, left, right)))
+
+    def sub(
+        self,
+        left: Buffer,
+        right: Buffer,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get elementwise difference of buffers."""
+        return store(out, list(map(operator.sub, left, right)))
+
+    def mul(
+        self,
+        values: Buffer,
+        number: Number,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get buffer multiplied by number."""
+        return store(out, [elem * number for elem in values])
+
+
+class NumpyBackend:
+    """Vectorized NumPy kernels.
+
+    Integer results are computed in int64 only if they can't overflow,
+    otherwise (and for big integers stored in lists) the work is passed
+    to the pure Python backend, so integer results are always the same.
+    Multiplication strategy and workers are used only by the fallback,
+    NumPy relies on BLAS algorithms and threads.
+
+    """
+
+    name = "numpy"
+
+    def __init__(self) -> None:
+        self._fallback = PythonBackend()
+
+    def matmul(
+        self,
+        left: Buffer,
+        right: Buffer,
+        rows_num: int,
+        inner_num: int,
+        columns_num: int,
+        strategy: str = CLASSICAL,
+        workers: int = 1,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get product of matrices computed by NumPy if it can."""
+        left_array = _as_numpy(left)
+        right_array = _as_numpy(right)
+        typecode = _product_typecode(left_array, right_array, inner_num)
+        if typecode is None:
+            return self._fallback.matmul(
+                left,
+                right,
+                rows_num,
+                inner_num,
+                columns_num,
+                strategy,
+                workers,
+                out,
+            )
+
+        result = _output(out, typecode, rows_num * columns_num)
+        np.matmul(
+            left_array.reshape(rows_num, inner_num),
+            right_array.reshape(inner_num, columns_num),
+            out=np.asarray(memoryview(result)).reshape(
+                rows_num,
+                columns_num,
+            ),
+        )
+        return result
+
+    def matmul_batched(
+        self,
+        left: Buffer,
+        right: Buffer,
+        count: int,
+        rows_num: int,
+        inner_num: int,
+        columns_num: int,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get products of stacked matrices computed by NumPy."""
+        left_array = _as_numpy(left)
+        right_array = _as_numpy(right)
+        typecode = _product_typecode(left_array, right_array, inner_num)
+        if typecode is None:
+            return self._fallback.matmul_batched(
+                left,
+                right,
+                count,
+                rows_num,
+                inner_num,
+                columns_num,
+                out,
+            )
+
+        result = _output(out, typecode, count * rows_num * columns_num)
+        np.matmul(
+            left_array.reshape(count, rows_num, inner_num),
+            # Single right matrix is broadcast to all left ones.
+            right_array.reshape(-1, inner_num, columns_num),
+            out=np.asarray(memoryview(result)).reshape(
+                count,
+                rows_num,
+                columns_num,
+            ),
+        )
+        return result
+
+    def add(
+        self,
+        left: Buffer,
+        right: Buffer,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get elementwise sum of buffers computed by NumPy."""
+        return self._elementwise(np.add, self._fallback.add, left, right, out)
+
+    def sub(
+        self,
+        left: Buffer,
+        right: Buffer,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get elementwise difference computed by NumPy."""
+        return self._elementwise(
+            np.subtract,
+            self._fallback.sub,
+            left,
+            right,
+            out,
+        )
+
+    def mul(
+        self,
+        values: Buffer,
+        number: Number,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Get buffer multiplied by number by NumPy."""
+        values_array = _as_numpy(values)
+        if values_array is None or not isinstance(number, (int, float)):
+            return self._fallback.mul(values, number, out)
+
+        if isinstance(number, float) or values_array.dtype.kind == "f":
+            typecode = FLOAT_TYPECODE
+            number = float(number)
+        elif _max_abs(values_array) * abs(number) <= INT64_MAX:
+            typecode = INT_TYPECODE
+        else:
+            return self._fallback.mul(values, number, out)
+
+        result = _output(out, typecode, len(values))
+        np.multiply(
+            values_array,
+            number,
+            out=np.asarray(memoryview(result)),
+        )
+        return result
+
+    def _elementwise(
+        self,
+        function: Any,
+        fallback: Callable[[Buffer, Buffer, Buffer | None], Buffer],
+        left: Buffer,
+        right: Buffer,
+        out: Buffer | None,
+    ) -> Buffer:
+        """Apply elementwise ufunc, fallback computes it if it overflows."""
+        left_array = _as_numpy(left)
+        right_array = _as_numpy(right)
+        typecode = (
+            None
+            if left_array is None or right_array is None
+            else _result_typecode(
+                left_array,
+                right_array,
+                _max_abs(left_array) + _max_abs(right_array),
+            )
+        )
+        if typecode is None:
+            return fallback(left, right, out)
+
+        result = _output(out, typecode, len(left))
+        function(left_array, right_array, out=np.asarray(memoryview(result)))
+        return result
+
+
+def _as_numpy(values: Buffer) -> Any:
+    """Get NumPy array over the buffer without copying.
+
+    Returns None if elements can't be represented by machine types.
+
+    """
+    if isinstance(values, list):
+        return None
+
+    values_array = np.asarray(memoryview(values))
+    if values_array.dtype.kind in "iu":
+        return values_array.astype(np.int64, copy=False)
+    if values_array.dtype.kind == "f":
+        return values_array.astype(np.float64, copy=False)
+    return None
+
+
+def _output(out: Buffer | None, typecode: str, length: int) -> Buffer:
+    """Get out buffer if NumPy can write the result to it."""
+    if (
+        out is not None
+        and typecode_of(out) == typecode
+        and len(out) == length
+        and not memoryview(out).readonly  # type: ignore[arg-type]
+    ):
+        return out
+    return zeros(typecode, length)
+
+
+def _max_abs(values_array: Any) -> int:
+    """Get upper bound of absolute values of integer array."""
+    if values_array.dtype.kind == "f" or not values_array.size:
+        return 0
+    return max(int(values_array.max()), -int(values_array.min()))
+
+
+def _product_typecode(
+    left_array: Any,
+    right_array: Any,
+    inner_num: int,
+) -> str | None:
+    """Get typecode of matrix product.
+
+    Returns None if operands aren't NumPy arrays or integer result may
+    overflow int64.
+
+    """
+    if left_array is None or right_array is None:
+        return None
+    return _result_typecode(
+        left_array,
+        right_array,
+        _max_abs(left_array) * _max_abs(right_array) * inner_num,
+    )
+
+
+def _result_typecode(
+    left_array: Any,
+    right_array: Any,
+    int_bound: int,
+) -> str | None:
+    """Get typecode of the result.
+
+    Returns None if integer result may overflow int64.
+
+    """
+    if "f" in (left_array.dtype.kind, right_array.dtype.kind):
+        return FLOAT_TYPECODE
+    if int_bound > INT64_MAX:
+        return None
+    return INT_TYPECODE
+
+
+BACKENDS: dict[str, Backend] = {PythonBackend.name: PythonBackend()}
+if np is not None:
+    BACKENDS[NumpyBackend.name] = NumpyBackend()
+
+
+def register_backend(backend: Backend) -> None:
+    """Make backend available by its name."""
+    BACKENDS[backend.name] = backend
+
+
+def get_backend(name: str = AUTO) -> Backend:
+    """Get backend by name.
+
+    The ``auto`` backend is NumPy if it is installed and pure Python
+    otherwise.
+
+    Raises:
+        BackendNotAvailableException: If backend is unknown or its
+            dependencies are not installed.
+
+    """
+    if name == AUTO:
+        name = (
+            NumpyBackend.name
+            if NumpyBackend.name in BACKENDS
+            else PythonBackend.name
+        )
+
+    try:
+        return BACKENDS[name]
+    except KeyError as error:
+        raise BackendNotAvailableException(name) from error
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import chain
+from typing import Any
+
+from backends import Backend, get_backend
+from buffers import Buffer, Number, as_flat_buffer, pack
+from kernels import power_by_squaring, transpose_batched
+from matrix import DifferentSizeException, Matrix, MatrixRow, Size
+
+
+class MatrixBatch:
+    """Stack of matrices of the same size in one contiguous buffer.
+
+    Matrices are stored one after another in row-major order. Each
+    operation is a single backend call over the whole buffer, so sizes
+    are checked and Python objects are created once per batch instead of
+    once per matrix. Provide the following operations:
+     - addition or subtraction of batches
+     - multiplication of batch and a number
+     - pairwise multiplication of batches, or multiplication of each
+       matrix by the same matrix
+     - transposing and power of each matrix
+
+    Backend is selected the same way as for ``Matrix``.
+
+    Attributes:
+        count: Get number of matrices.
+        size: Get size of each matrix.
+        buffer: Get flat buffer with all matrices.
+        backend: Get backend used for arithmetic.
+        data: Get rows of matrices, they write to the batch buffer.
+        T: Get batch of transposed matrices.
+
+    """
+
+    backend_name: str | None = None
+
+    def __init__(
+        self,
+        data: Sequence[Sequence[Sequence[Number]]],
+        backend: str | None = None,
+    ):
+        """Constructor for MatrixBatch class.
+
+        Args:
+            data: Matrices in the form of nested number sequences.
+            backend: Name of backend, ``Matrix.default_backend`` if not set.
+
+        """
+        rows = list(chain.from_iterable(data))
+        if len(set(map(len, data))) != 1 or len(set(map(len, rows))) != 1:
+            raise DifferentSizeException(
+                "Matrices should have the same size.",
+            )
+
+        self._buffer = pack(chain.from_iterable(rows))
+        self._count = len(data)
+        self._size = Size(len(data[0]), len(rows[0]))
+        self.backend_name = backend
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: Any,
+        count: int,
+        size: tuple[int, int],
+        backend: str | None = None,
+    ) -> MatrixBatch:
+        """Create batch over flat buffer without copying it.
+
+        Raises:
+            ValueError: If the buffer has different length.
+
+        """
+        rows_num, columns_num = size
+        buffer = as_flat_buffer(buffer)
+        if min(count, rows_num, columns_num) < 1:
+            raise ValueError("Batch should have at least one element.")
+        if len(buffer) != count * rows_num * columns_num:
+            raise ValueError(
+                f"Buffer of length {len(buffer)} doesn't fit {count} "
+                f"matrices of size {tuple(size)}.",
+            )
+
+        batch = cls.__new__(cls)
+        batch._buffer = buffer
+        batch._count = count
+        batch._size = Size(rows_num, columns_num)
+        batch.backend_name = backend
+        return batch
+
+    @classmethod
+    def from_matrices(
+        cls,
+        matrices: Sequence[Matrix],
+        backend: str | None = None,
+    ) -> MatrixBatch:
+        """Copy matrices to new batch.
+
+        Batch takes backend of the first matrix if it isn't set.
+
+        Raises:
+            DifferentSizeException: If matrices have different size.
+
+        """
+        if not matrices or len({matrix.size for matrix in matrices}) != 1:
+            raise DifferentSizeException(
+                "Matrices should have the same size.",
+            )
+        return cls.from_buffer(
+            pack(list(chain.from_iterable(
+                matrix._values() for matrix in matrices
+            ))),
+            len(matrices),
+            matrices[0].size,
+            backend or matrices[0].backend_name,
+        )
+
+    def _derived(
+        self,
+        values: Iterable[Number],
+        count: int,
+        size: Size,
+    ) -> MatrixBatch:
+        """Create batch with the same backend from numbers."""
+        return MatrixBatch.from_buffer(
+            pack(values),
+            count,
+            size,
+            self.backend_name,
+        )
+
+    @property
+    def count(self) -> int:
+        """Get number of matrices."""
+        return self._count
+
+    @property
+    def size(self) -> Size:
+        """Get size of each matrix."""
+        return self._size
+
+    @property
+    def buffer(self) -> Buffer:
+        """Get flat buffer with all matrices."""
+        return self._buffer
+
+    @property
+    def backend(self) -> Backend:
+        """Get backend used for arithmetic."""
+        return get_backend(self.backend_name or Matrix.default_backend)
+
+    @property
+    def data(self) -> list[list[MatrixRow]]:
+        """Get rows of matrices, they write to the batch buffer."""
+        return [matrix.data for matrix in self]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Matrix:
+        """Get matrix by index, it shares the buffer with the batch."""
+        index = range(self._count)[index]
+        rows_num, columns_num = self._size
+        return Matrix.from_buffer(
+            self._buffer,
+            self._size,
+            offset=index * rows_num * columns_num,
+            backend=self.backend_name,
+        )
+
+    def __iter__(self) -> Iterator[Matrix]:
+        return map(self.__getitem__, range(self._count))
+
+    def T(self) -> MatrixBatch:
+        """Get batch of transposed matrices."""
+        rows_num, columns_num = self._size
+        return self._derived(
+            transpose_batched(
+                self._buffer,
+                self._count,
+                rows_num,
+                columns_num,
+            ),
+            self._count,
+            Size(columns_num, rows_num),
+        )
+
+    def copy(self) -> MatrixBatch:
+        """Get batch with own buffer."""
+        return self._derived(list(self._buffer), self._count, self._size)
+
+    def __add__(self, other: MatrixBatch) -> MatrixBatch:
+        if not isinstance(other, MatrixBatch):
+            return NotImplemented
+        self._check_same_shape(other)
+        return self._derived(
+            self.backend.add(self._buffer, other._buffer),
+            self._count,
+            self._size,
+        )
+
+    def __sub__(self, other: MatrixBatch) -> MatrixBatch:
+        if not isinstance(other, MatrixBatch):
+            return NotImplemented
+        self._check_same_shape(other)
+        return self._derived(
+            self.backend.sub(self._buffer, other._buffer),
+            self._count,
+            self._size,
+        )
+
+    def __mul__(self, number: Number) -> MatrixBatch:
+        """Get multiplication of each matrix by number."""
+        return self._derived(
+            self.backend.mul(self._buffer, number),
+            self._count,
+            self._size,
+        )
+
+    def __rmul__(self, number: Number) -> MatrixBatch:
+        return self.__mul__(number)
+
+    def __neg__(self) -> MatrixBatch:
+        return -1 * self
+
+    def __matmul__(self, other: MatrixBatch | Matrix) -> MatrixBatch:
+        """Multiply matrices pairwise or each matrix by the same matrix.
+
+        Raises:
+            DifferentSizeException: If batches have different number of
+                matrices or matrices can't be multiplied.
+
+        """
+        if isinstance(other, Matrix):
+            right = other.flat()
+        elif isinstance(other, MatrixBatch):
+            if other.count != self._count:
+                raise DifferentSizeException(
+                    "Batches should have the same number of matrices.",
+                )
+            right = other._buffer
+        else:
+            return NotImplemented
+
+        if other.size.rows_num != self._size.columns_num:
+            raise DifferentSizeException(
+                "the first matrix must have the same number "
+                "of columns as the second matrix has rows",
+            )
+
+        size = Size(self._size.rows_num, other.size.columns_num)
+        return self._derived(
+            self.backend.matmul_batched(
+                self._buffer,
+                right,
+                self._count,
+                size.rows_num,
+                self._size.columns_num,
+                size.columns_num,
+            ),
+            self._count,
+            size,
+        )
+
+    def __rmatmul__(self, other: Matrix) -> MatrixBatch:
+        """Multiply the same matrix by each matrix of batch."""
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        # (A @ B)^T == B^T @ A^T
+        return (self.T() @ other.T()).T()
+
+    def __pow__(self, power: int) -> MatrixBatch:
+        """Positive pow of each matrix by fast exponentiation.
+
+        Raises:
+            ValueError: Raise if power isn't positive.
+            DifferentSizeException: If matrices aren't square.
+
+        """
+        if power <= 0:
+            raise ValueError("Power must be positive.")
+        if power == 1:
+            return self.copy()
+
+        size, _ = self._size
+        if self._size.columns_num != size:
+            raise DifferentSizeException("Matrices should be square.")
+
+        backend = self.backend
+        return self._derived(
+            power_by_squaring(
+                self._buffer,
+                power,
+                lambda left, right, out: backend.matmul_batched(
+                    left,
+                    right,
+                    self._count,
+                    size,
+                    size,
+                    size,
+                    out,
+                ),
+            ),
+            self._count,
+            self._size,
+        )
+
+    def _check_same_shape(self, other: MatrixBatch) -> None:
+        if self._count != other.count or self._size != other.size:
+            raise DifferentSizeException(
+                "Batches should have the same number and size of matrices.",
+            )
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.data})"
@@ -0,0 +1,400 @@
+import argparse
+import json
+import random
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import NamedTuple
+
+from backends import AUTO, PythonBackend
+from buffers import Number
+from matrix import Matrix, Size
+from sparse import CSRMatrix
+
+DEFAULT_SIZES = [50, 100, 200, 500]
+
+SUITE_SIZES = [50, 100, 200]
+DTYPES = ["int", "float", "sparse"]
+OPERATIONS = ["construct", "add", "sub", "mul", "matmul", "T", "pow"]
+SPARSE_DENSITY = 0.05
+POWER = 4
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+
+
+class Measurement(NamedTuple):
+    """Result of benchmark of one operation.
+
+    Throughput is the number of processed elements per second, for
+    products it's the number of multiply-add operations per second.
+
+    """
+
+    seconds: float
+    throughput: float
+    peak_memory: int
+
+
+def reference_matmul(
+    left: Sequence[Sequence[Number]],
+    right: Sequence[Sequence[Number]],
+) -> list[list[Number]]:
+    """Multiply nested lists the way Matrix did before the flat storage.
+
+    The right matrix is transposed by ``zip(*right)`` for every row.
+
+    """
+    return [
+        [
+            sum(
+                row_elem * column_elem
+                for row_elem, column_elem in zip(row, column)
+            )
+            for column in zip(*right)
+        ]
+        for row in left
+    ]
+
+
+def random_data(size: int, dtype: str) -> list[list[Number]]:
+    """Get square matrix with random int or float elements."""
+    if dtype == "int":
+        return [
+            [random.randint(-100, 100) for _ in range(size)]
+            for _ in range(size)
+        ]
+    return [[random.random() for _ in range(size)] for _ in range(size)]
+
+
+def random_sparse_rows(size: int) -> list[dict[int, Number]]:
+    """Get rows of square sparse matrix with random int elements."""
+    return [
+        {
+            col_idx: random.randint(1, 100)
+            for col_idx in range(size)
+            if random.random() < SPARSE_DENSITY
+        }
+        for _ in range(size)
+    ]
+
+
+def compare_matmul(size: int, dtype: str, repeat: int) -> tuple[float, float]:
+    """Get the best time of reference and blocked matmul in seconds."""
+    left, right = random_data(size, dtype), random_data(size, dtype)
+    left_matrix = Matrix(left, backend=PythonBackend.name)
+    right_matrix = Matrix(right, backend=PythonBackend.name)
+
+    reference_time = min(timeit.repeat(
+        lambda: reference_matmul(left, right),
+        number=1,
+        repeat=repeat,
+    ))
+    blocked_time = min(timeit.repeat(
+        lambda: left_matrix @ right_matrix,
+        number=1,
+        repeat=repeat,
+    ))
+    return reference_time, blocked_time
+
+
+def get_cases(
+    size: int,
+    dtype: str,
+    backend: str = AUTO,
+) -> dict[str, tuple[Callable[[], object], int]]:
+    """Get benchmarked operations on square matrices with their work.
+
+    Returns:
+        Functions running operations by names with number of processed
+        elements (or multiply-add operations for products).
+
+    """
+    rows = random_sparse_rows(size) if dtype == "sparse" else []
+    data = random_data(size, dtype) if dtype != "sparse" else []
+
+    def construct() -> Matrix | CSRMatrix:
+        if rows:
+            return CSRMatrix.from_rows(rows, Size(size, size))
+        return Matrix(data, backend=backend)
+
+    left, right = construct(), construct()
+    elements, products = size ** 2, size ** 3
+    return {
+        "construct": (construct, elements),
+        "add": (lambda: left + right, elements),
+        "sub": (lambda: left - right, elements),
+        "mul": (lambda: left * 3, elements),
+        "matmul": (lambda: left @ right, products),
+        "T": (left.T, elements),
+        # Fast exponentiation does two squarings for the fourth power.
+        "pow": (lambda: left ** POWER, 2 * products),
+    }
+
+
+def measure(
+    function: Callable[[], object],
+    work: int,
+    repeat: int,
+    number: int | None = None,
+) -> Measurement:
+    """Measure the best time and peak memory of function call.
+
+    If number of calls in a measurement isn't set, it's chosen so that
+    a measurement takes at least 0.2 second.
+
+    """
+    timer = timeit.Timer(function)
+    if number is None:
+        number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat, number)) / number
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(seconds, work / max(seconds, 1e-12), peak_memory)
+
+
+def run_suite(
+    sizes: Sequence[int] = tuple(SUITE_SIZES),
+    dtypes: Sequence[str] = tuple(DTYPES),
+    repeat: int = 3,
+    number: int | None = None,
+    backend: str = AUTO,
+) -> dict[str, Measurement]:
+    """Benchmark all operations on matrices of sizes and dtypes.
+
+    Returns:
+        Measurements by names like ``matmul/int/100``.
+
+    """
+    results = {}
+    for dtype in dtypes:
+        for size in sizes:
+            # The same matrices in every run make results comparable.
+            random.seed(f"{dtype}/{size}")
+            for operation, (function, work) in get_cases(
+                size,
+                dtype,
+                backend,
+            ).items():
+                results[f"{operation}/{dtype}/{size}"] = measure(
+                    function,
+                    work,
+                    repeat,
+                    number,
+                )
+    return results
+
+
+def save_results(results: dict[str, Measurement], path: Path) -> None:
+    """Write measurements to JSON file."""
+    path.write_text(
+        json.dumps(
+            {name: result._asdict() for name, result in results.items()},
+            indent=2,
+            sort_keys=True,
+        ),
+    )
+
+
+def load_results(path: Path) -> dict[str, Measurement]:
+    """Read measurements from JSON file."""
+    return {
+        name: Measurement(**result)
+        for name, result in json.loads(path.read_text()).items()
+    }
+
+
+def find_regressions(
+    results: dict[str, Measurement],
+    baseline: dict[str, Measurement],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """Compare results with baseline.
+
+    Only operations from the baseline are tracked. Operation regresses
+    if its time or peak memory is greater than the baseline one by more
+    than ``tolerance`` part.
+
+    Returns:
+        Descriptions of regressions.
+
+    """
+    regressions = []
+    for name, expected in baseline.items():
+        result = results.get(name)
+        if result is None:
+            continue
+        if result.seconds > expected.seconds * (1 + tolerance):
+            regressions.append(
+                f"{name}: {result.seconds:.6f} s against "
+                f"{expected.seconds:.6f} s in baseline",
+            )
+        if result.peak_memory > expected.peak_memory * (1 + tolerance):
+            regressions.append(
+                f"{name}: {result.peak_memory} bytes against "
+                f"{expected.peak_memory} bytes in baseline",
+            )
+    return regressions
+
+
+def run_suite_command(args: argparse.Namespace) -> int:
+    """Run benchmark suite and compare it with the baseline.
+
+    Returns:
+        Exit code, non-zero if operations regressed or there is no
+        baseline.
+
+    """
+    results = run_suite(
+        args.sizes,
+        args.dtypes,
+        args.repeat,
+        args.number,
+        args.backend,
+    )
+
+    print(f"{'operation':<22} {'time, s':>12} {'ops/s':>12} {'peak, KiB':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<22} {result.seconds:>12.6f} "
+            f"{result.throughput:>12.3g} {result.peak_memory / 1024:>10.1f}",
+        )
+
+    if args.output:
+        save_results(results, args.output)
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        return 0
+    if not args.baseline.exists():
+        print(
+            f"No baseline in {args.baseline}, save it by --update-baseline.",
+            file=sys.stderr,
+        )
+        return 2
+
+    regressions = find_regressions(
+        results,
+        load_results(args.baseline),
+        args.tolerance,
+    )
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def run_matmul_command(args: argparse.Namespace) -> int:
+    """Print speedup of pure Python matmul against the reference one."""
+    print(
+        f"{'size':>6} {'reference, s':>14} {'blocked, s':>12} "
+        f"{'speedup':>8}",
+    )
+    for size in args.sizes:
+        reference_time, blocked_time = compare_matmul(
+            size,
+            args.dtype,
+            args.repeat,
+        )
+        print(
+            f"{size:>6} {reference_time:>14.4f} {blocked_time:>12.4f} "
+            f"{reference_time / blocked_time:>7.2f}x",
+        )
+    return 0
+
+
+def main() -> None:
+    """Run benchmark command."""
+    parser = argparse.ArgumentParser(description="Benchmark matrices.")
+    commands = parser.add_subparsers(required=True)
+
+    matmul_parser = commands.add_parser(
+        "matmul",
+        help="compare pure Python matmul with the reference one",
+    )
+    matmul_parser.set_defaults(command=run_matmul_command)
+    matmul_parser.add_argument(
+        "sizes",
+        type=int,
+        nargs="*",
+        default=DEFAULT_SIZES,
+        help="sizes of square matrices",
+    )
+    matmul_parser.add_argument(
+        "--dtype",
+        choices=["int", "float"],
+        default="int",
+        help="type of matrix elements",
+    )
+
+    suite_parser = commands.add_parser(
+        "suite",
+        help="benchmark all operations and check regressions",
+    )
+    suite_parser.set_defaults(command=run_suite_command)
+    suite_parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SUITE_SIZES,
+        help="sizes of square matrices",
+    )
+    suite_parser.add_argument(
+        "--dtypes",
+        choices=DTYPES,
+        nargs="+",
+        default=DTYPES,
+        help="types of matrices",
+    )
+    suite_parser.add_argument(
+        "--backend",
+        default=AUTO,
+        help="backend of dense matrices",
+    )
+    suite_parser.add_argument(
+        "--number",
+        type=int,
+        help="number of calls in a measurement, chosen if not set",
+    )
+    suite_parser.add_argument(
+        "--output",
+        type=Path,
+        help="JSON file for results",
+    )
+    suite_parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="JSON file with results to compare with",
+    )
+    suite_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="allowed slowdown as part of the baseline value",
+    )
+    suite_parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="save results as the new baseline",
+    )
+
+    for command_parser in (matmul_parser, suite_parser):
+        command_parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="number of measurements, the best one is reported",
+        )
+
+    args = parser.parse_args()
+    sys.exit(args.command(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from array import array
+from collections.abc import Iterable, MutableSequence, Sequence
+from typing import Any, TypeAlias
+
+Number: TypeAlias = int | float
+# Flat row-major storage of matrix elements: ``array("q")`` for integers,
+# ``array("d")`` for floats, ``memoryview`` for external buffers and plain
+# ``list`` for values which don't fit into machine types (big integers).
+Buffer: TypeAlias = MutableSequence[Any]
+
+INT_TYPECODE = "q"
+FLOAT_TYPECODE = "d"
+
+
+def pack(values: Iterable[Number]) -> Buffer:
+    """Pack numbers into the most compact flat buffer.
+
+    Integers are stored in 64-bit ``array("q")``, floats in ``array("d")``,
+    so each element costs 8 bytes instead of a whole Python object. Values
+    which can't be stored in machine types are kept in a plain list.
+
+    Args:
+        values: Numbers in row-major order.
+
+    """
+    if isinstance(values, array):
+        return values
+    if not isinstance(values, Sequence):
+        values = list(values)
+
+    try:
+        return array(INT_TYPECODE, values)
+    except OverflowError:
+        # Big integers must stay exact.
+        return list(values)
+    except TypeError:
+        pass
+
+    try:
+        return array(FLOAT_TYPECODE, values)
+    except (TypeError, OverflowError):
+        return list(values)
+
+
+def as_flat_buffer(buffer: Any) -> Buffer:
+    """Get one-dimensional view on the object.
+
+    Arrays and lists are used as is, other objects have to support
+    the buffer protocol (e.g. ``bytearray``, ``mmap`` or numpy arrays).
+
+    """
+    if isinstance(buffer, (array, list)):
+        return buffer
+
+    view: Any = memoryview(buffer)
+    if view.ndim != 1:
+        view = view.cast("B").cast(view.format)
+    return view
+
+
+def zeros(typecode: str, length: int) -> Buffer:
+    """Allocate typed buffer filled with zeros."""
+    return array(typecode, [0]) * length
+
+
+def typecode_of(buffer: Buffer) -> str | None:
+    """Get typecode of typed buffer elements, None for lists."""
+    if isinstance(buffer, array):
+        return buffer.typecode
+    return getattr(buffer, "format", None)
+
+
+def write(buffer: Buffer, start: int, values: Sequence[Number]) -> Buffer:
+    """Write values to the buffer starting from index.
+
+    Returns:
+        The same buffer or its copy as list if values don't fit into it.
+
+    """
+    stop = start + len(values)
+    typecode = typecode_of(buffer)
+    if typecode is None:
+        buffer[start:stop] = values
+        return buffer
+
+    try:
+        buffer[start:stop] = (
+            values
+            if isinstance(values, array) and values.typecode == typecode
+            else array(typecode, values)
+        )
+    except (TypeError, OverflowError, ValueError):
+        # Typed buffer can't hold values (or it's read-only), continue
+        # with a list which can.
+        buffer = list(buffer)
+        buffer[start:stop] = values
+    return buffer
+
+
+def store(out: Buffer | None, values: Sequence[Number]) -> Buffer:
+    """Copy values to the out buffer if it's set and can hold them.
+
+    Returns:
+        The out buffer or a new one with values.
+
+    """
+    if out is None or len(out) != len(values):
+        return pack(values)
+    buffer = write(out, 0, values)
+    if buffer is out:
+        return out
+    return pack(values)
@@ -0,0 +1,429 @@
+import operator
+from array import array
+from collections.abc import Callable
+from functools import partial
+from itertools import chain
+
+from buffers import INT_TYPECODE, Buffer, Number, pack, write
+
+DEFAULT_BLOCK_SIZE = 64
+DEFAULT_STRASSEN_CUTOFF = 128
+# Square matrices starting from this size are multiplied by Strassen
+# algorithm in ``auto`` strategy, smaller ones don't win from it.
+STRASSEN_MIN_SIZE = 256
+
+CLASSICAL = "classical"
+STRASSEN = "strassen"
+
+
+def to_rows(
+    values: Buffer,
+    rows_num: int,
+    columns_num: int,
+) -> list[list[Number]]:
+    """Split row-major buffer into list of rows."""
+    values = values.tolist() if isinstance(values, array) else list(values)
+    return [
+        values[row_start:row_start + columns_num]
+        for row_start in range(0, rows_num * columns_num, columns_num)
+    ]
+
+
+def transpose(
+    values: Buffer,
+    rows_num: int,
+    columns_num: int,
+) -> list[list[Number]]:
+    """Split row-major buffer into list of columns."""
+    values = values.tolist() if isinstance(values, array) else list(values)
+    return [
+        values[col_idx:rows_num * columns_num:columns_num]
+        for col_idx in range(columns_num)
+    ]
+
+
+def is_int_buffer(values: Buffer) -> bool:
+    """Check if buffer is typed array of integers."""
+    return isinstance(values, array) and values.typecode == INT_TYPECODE
+
+
+def choose_matmul_strategy(
+    rows_num: int,
+    inner_num: int,
+    columns_num: int,
+) -> str:
+    """Choose multiplication algorithm by matrices size."""
+    if rows_num == inner_num == columns_num >= STRASSEN_MIN_SIZE:
+        return STRASSEN
+    return CLASSICAL
+
+
+def matmul_blocked(
+    left: Buffer,
+    right: Buffer,
+    rows_num: int,
+    inner_num: int,
+    columns_num: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    out: Buffer | None = None,
+) -> Buffer:
+    """Get product of matrices with tiled loops.
+
+    The right matrix is transposed only once. Columns are processed by
+    tiles of ``block_size``, so the same tile of columns is reused for
+    every row while it's hot in cache, and each dot product is computed
+    by ``sum(map(...))`` without interpreting the inner loop.
+
+    Tiles of the result are written straight to ``out`` buffer if it's
+    set and can hold them, otherwise a new buffer is returned.
+
+    """
+    rows = to_rows(left, rows_num, inner_num)
+    columns = transpose(right, inner_num, columns_num)
+    mul = operator.mul
+
+    result: Buffer = (
+        [0] * (rows_num * columns_num)
+        if out is None or len(out) != rows_num * columns_num
+        else out
+    )
+    for col_start in range(0, columns_num, block_size):
+        columns_block = columns[col_start:col_start + block_size]
+        result_start = col_start
+        for row in rows:
+            result = write(
+                result,
+                result_start,
+                [sum(map(mul, row, column)) for column in columns_block],
+            )
+            result_start += columns_num
+
+    if result is out:
+        return out
+    return pack_product(result, left, right)
+
+
+def pack_product(values: Buffer, left: Buffer, right: Buffer) -> Buffer:
+    """Pack product of two buffers.
+
+    Product of integer arrays is integer, so it's packed without probing
+    the type of elements.
+
+    """
+    if is_int_buffer(left) and is_int_buffer(right):
+        try:
+            return array(INT_TYPECODE, values)
+        except OverflowError:
+            return values
+    return pack(values)
+
+
+def matmul_batched(
+    left: Buffer,
+    right: Buffer,
+    count: int,
+    rows_num: int,
+    inner_num: int,
+    columns_num: int,
+    out: Buffer | None = None,
+) -> Buffer:
+    """Get products of stacked matrices pairwise.
+
+    Left buffer holds ``count`` matrices of size ``rows_num x inner_num``
+    one after another, right one holds ``count`` matrices of size
+    ``inner_num x columns_num`` or a single matrix multiplied by every
+    left one. Matrices are small, so they are multiplied without tiling,
+    all products are collected into one list.
+
+    """
+    left_values = left.tolist() if isinstance(left, array) else list(left)
+    right_values = right.tolist() if isinstance(right, array) else list(right)
+    left_size = rows_num * inner_num
+    right_size = inner_num * columns_num
+    right_step = right_size if len(right) > right_size else 0
+    mul = operator.mul
+
+    result: list[Number] = []
+    columns: list[list[Number]] = []
+    for index in range(count):
+        if right_step or not columns:
+            right_start = index * right_step
+            columns = [
+                right_values[
+                    right_start + col_idx:right_start + right_size:columns_num
+                ]
+                for col_idx in range(columns_num)
+            ]
+        left_start = index * left_size
+        for row_start in range(left_start, left_start + left_size, inner_num):
+            row = left_values[row_start:row_start + inner_num]
+            result.extend([sum(map(mul, row, column)) for column in columns])
+
+    if out is not None and len(out) == len(result):
+        product = write(out, 0, result)
+        if product is out:
+            return out
+    return pack_product(result, left, right)
+
+
+def transpose_batched(
+    values: Buffer,
+    count: int,
+    rows_num: int,
+    columns_num: int,
+) -> list[Number]:
+    """Get stacked matrices transposed one by one."""
+    size = rows_num * columns_num
+    return [
+        elem
+        for start in range(0, count * size, size)
+        for col_idx in range(columns_num)
+        for elem in values[start + col_idx:start + size:columns_num]
+    ]
+
+
+def power_by_squaring(
+    source: Buffer,
+    power: int,
+    multiply: Callable[[Buffer, Buffer, Buffer | None], Buffer],
+) -> Buffer:
+    """Get power greater than one by fast exponentiation.
+
+    At most three buffers are allocated whatever the power is: the
+    result, the current square and scratch buffer for the next product.
+    The buffer replaced by a product becomes the scratch.
+
+    Args:
+        source: Buffer to raise to the power, it's never written.
+        power: Power greater than one.
+        multiply: Get product of two buffers, write it to the third one
+            if it isn't None and can hold the product.
+
+    """
+    result: Buffer | None = None
+    square = source
+    scratch: Buffer | None = None
+
+    def release(buffer: Buffer) -> Buffer | None:
+        """Get buffer as scratch if nothing refers to it."""
+        if any(buffer is used for used in (source, result, square)):
+            return None
+        return buffer
+
+    while True:
+        if power % 2:
+            if result is None:
+                result = square
+            else:
+                result, previous = multiply(result, square, scratch), result
+                scratch = release(previous)
+        power //= 2
+        if not power:
+            # The highest bit of power is set, so result is computed.
+            assert result is not None
+            return result
+        square, previous = multiply(square, square, scratch), square
+        scratch = release(previous)
+
+
+def power_mod(
+    values: Buffer,
+    size: int,
+    power: int,
+    modulo: int,
+) -> list[int]:
+    """Get positive power of square integer matrix by modulo.
+
+    Every dot product is reduced, so elements never grow above
+    ``size * modulo ** 2`` and each multiplication costs the same
+    whatever the power is. 2x2 and 3x3 matrices (companion matrices of
+    linear recurrences) are multiplied by unrolled kernels.
+
+    """
+    multiply = _MATMUL_MOD_UNROLLED.get(size) or partial(
+        _matmul_mod,
+        size=size,
+    )
+    base = [elem % modulo for elem in values]
+    if power == 1:
+        return base
+    result = power_by_squaring(
+        base,
+        power,
+        lambda left, right, _: multiply(left, right, modulo=modulo),
+    )
+    return list(result)
+
+
+def _matmul_mod(
+    left: Buffer,
+    right: Buffer,
+    size: int,
+    modulo: int,
+) -> list[int]:
+    rows = to_rows(left, size, size)
+    columns = transpose(right, size, size)
+    mul = operator.mul
+    return [
+        sum(map(mul, row, column)) % modulo
+        for row in rows
+        for column in columns
+    ]
+
+
+def _matmul_mod_2x2(left: Buffer, right: Buffer, modulo: int) -> list[int]:
+    a11, a12, a21, a22 = left
+    b11, b12, b21, b22 = right
+    return [
+        (a11 * b11 + a12 * b21) % modulo,
+        (a11 * b12 + a12 * b22) % modulo,
+        (a21 * b11 + a22 * b21) % modulo,
+        (a21 * b12 + a22 * b22) % modulo,
+    ]
+
+
+def _matmul_mod_3x3(left: Buffer, right: Buffer, modulo: int) -> list[int]:
+    a11, a12, a13, a21, a22, a23, a31, a32, a33 = left
+    b11, b12, b13, b21, b22, b23, b31, b32, b33 = right
+    return [
+        (a11 * b11 + a12 * b21 + a13 * b31) % modulo,
+        (a11 * b12 + a12 * b22 + a13 * b32) % modulo,
+        (a11 * b13 + a12 * b23 + a13 * b33) % modulo,
+        (a21 * b11 + a22 * b21 + a23 * b31) % modulo,
+        (a21 * b12 + a22 * b22 + a23 * b32) % modulo,
+        (a21 * b13 + a22 * b23 + a23 * b33) % modulo,
+        (a31 * b11 + a32 * b21 + a33 * b31) % modulo,
+        (a31 * b12 + a32 * b22 + a33 * b32) % modulo,
+        (a31 * b13 + a32 * b23 + a33 * b33) % modulo,
+    ]
+
+
+_MATMUL_MOD_UNROLLED: dict[int, Callable[..., list[int]]] = {
+    2: _matmul_mod_2x2,
+    3: _matmul_mod_3x3,
+}
+
+
+def matmul_strassen(
+    left: Buffer,
+    right: Buffer,
+    rows_num: int,
+    inner_num: int,
+    columns_num: int,
+    cutoff: int = DEFAULT_STRASSEN_CUTOFF,
+) -> Buffer:
+    """Get product of matrices by Strassen algorithm.
+
+    Matrices are padded by zeros to the same square size, odd sizes are
+    padded by one row and column on each level of recursion. Matrices
+    not greater than ``cutoff`` are multiplied by the classical kernel.
+
+    """
+    size = max(rows_num, inner_num, columns_num)
+    rows = _pad(to_rows(left, rows_num, inner_num), size)
+    other_rows = _pad(to_rows(right, inner_num, columns_num), size)
+
+    result = _strassen(rows, other_rows, max(cutoff, 1))
+
+    return pack_product(
+        [
+            elem
+            for row in result[:rows_num]
+            for elem in row[:columns_num]
+        ],
+        left,
+        right,
+    )
+
+
+def _pad(rows: list[list[Number]], size: int) -> list[list[Number]]:
+    """Pad matrix by zeros to square matrix of the size."""
+    padded = [row + [0] * (size - len(row)) for row in rows]
+    padded.extend([0] * size for _ in range(size - len(rows)))
+    return padded
+
+
+def _add(
+    first: list[list[Number]],
+    second: list[list[Number]],
+) -> list[list[Number]]:
+    return [
+        list(map(operator.add, first_row, second_row))
+        for first_row, second_row in zip(first, second)
+    ]
+
+
+def _sub(
+    first: list[list[Number]],
+    second: list[list[Number]],
+) -> list[list[Number]]:
+    return [
+        list(map(operator.sub, first_row, second_row))
+        for first_row, second_row in zip(first, second)
+    ]
+
+
+def _classical(
+    rows: list[list[Number]],
+    other_rows: list[list[Number]],
+) -> list[list[Number]]:
+    columns = list(zip(*other_rows))
+    mul = operator.mul
+    return [
+        [sum(map(mul, row, column)) for column in columns]
+        for row in rows
+    ]
+
+
+def _strassen(
+    rows: list[list[Number]],
+    other_rows: list[list[Number]],
+    cutoff: int,
+) -> list[list[Number]]:
+    """Multiply square matrices recursively with 7 multiplications."""
+    size = len(rows)
+    if size <= cutoff:
+        return _classical(rows, other_rows)
+    if size % 2:
+        result = _strassen(
+            _pad(rows, size + 1),
+            _pad(other_rows, size + 1),
+            cutoff,
+        )
+        return [row[:size] for row in result[:size]]
+
+    half = size // 2
+    a11, a12, a21, a22 = _split(rows, half)
+    b11, b12, b21, b22 = _split(other_rows, half)
+
+    m1 = _strassen(_add(a11, a22), _add(b11, b22), cutoff)
+    m2 = _strassen(_add(a21, a22), b11, cutoff)
+    m3 = _strassen(a11, _sub(b12, b22), cutoff)
+    m4 = _strassen(a22, _sub(b21, b11), cutoff)
+    m5 = _strassen(_add(a11, a12), b22, cutoff)
+    m6 = _strassen(_sub(a21, a11), _add(b11, b12), cutoff)
+    m7 = _strassen(_sub(a12, a22), _add(b21, b22), cutoff)
+
+    c11 = _add(_sub(_add(m1, m4), m5), m7)
+    c12 = _add(m3, m5)
+    c21 = _add(m2, m4)
+    c22 = _add(_add(_sub(m1, m2), m3), m6)
+
+    return [
+        left_row + right_row
+        for left_row, right_row in chain(zip(c11, c12), zip(c21, c22))
+    ]
+
+
+def _split(
+    rows: list[list[Number]],
+    half: int,
+) -> tuple[list[list[Number]], ...]:
+    """Split square matrix of even size into four blocks."""
+    top, bottom = rows[:half], rows[half:]
+    return (
+        [row[:half] for row in top],
+        [row[half:] for row in top],
+        [row[:half] for row in bottom],
+        [row[half:] for row in bottom],
+    )
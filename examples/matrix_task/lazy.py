@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import operator
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from itertools import repeat
+
+from backends import PythonBackend
+from buffers import Number
+from matrix import DifferentSizeException, Matrix, Size
+
+
+class Expression(ABC):
+    """Node of lazy expression over matrices.
+
+    Operators build a tree instead of computing a result. Evaluation of
+    the tree fuses elementwise operations (addition, subtraction,
+    multiplication by number) into a single pass over elements, so only
+    the result is allocated, and multiplies chains of matrices in the
+    cheapest order. Result never shares buffer with the input matrices.
+
+    Attributes:
+        size: Get size of result matrix.
+        evaluate: Compute result of expression.
+        value: Compute result, it may be an input matrix.
+        stream: Get elements of result in row-major order.
+        template: Get the leftmost matrix, result inherits its settings.
+
+    """
+
+    size: Size
+
+    @abstractmethod
+    def evaluate(self) -> Matrix:
+        """Compute result of expression."""
+
+    def value(self) -> Matrix:
+        """Compute result, it may be an input matrix.
+
+        It's used for operands of other nodes, which create new matrices
+        anyway, so input matrices aren't copied.
+
+        """
+        return self.evaluate()
+
+    def stream(self) -> Iterator[Number]:
+        """Get elements of result in row-major order."""
+        return iter(self.value().flat())
+
+    @abstractmethod
+    def template(self) -> Matrix:
+        """Get the leftmost matrix, result inherits its settings."""
+
+    def _is_fusible(self) -> bool:
+        """Check if elementwise operations can be fused.
+
+        Fusion streams elements through Python iterators, vectorized
+        backends are faster to compute operations one by one.
+
+        """
+        return isinstance(self.template().backend, PythonBackend)
+
+    def __add__(self, other: Expression | Matrix) -> Expression:
+        return Add(self, as_expression(other))
+
+    def __radd__(self, other: Matrix) -> Expression:
+        return Add(as_expression(other), self)
+
+    def __sub__(self, other: Expression | Matrix) -> Expression:
+        return Add(self, -as_expression(other))
+
+    def __rsub__(self, other: Matrix) -> Expression:
+        return Add(as_expression(other), -self)
+
+    def __mul__(self, number: Number) -> Expression:
+        return Scale(self, number)
+
+    def __rmul__(self, number: Number) -> Expression:
+        return Scale(self, number)
+
+    def __neg__(self) -> Expression:
+        return Scale(self, -1)
+
+    def __matmul__(self, other: Expression | Matrix) -> Expression:
+        return MatMul(self, as_expression(other))
+
+    def __rmatmul__(self, other: Matrix) -> Expression:
+        return MatMul(as_expression(other), self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}{self.size}"
+
+
+class Leaf(Expression):
+    """Matrix in expression tree."""
+
+    def __init__(self, matrix: Matrix):
+        self.matrix = matrix
+        self.size = matrix.size
+
+    def evaluate(self) -> Matrix:
+        return self.matrix.copy()
+
+    def value(self) -> Matrix:
+        return self.matrix
+
+    def stream(self) -> Iterator[Number]:
+        return iter(self.matrix.flat())
+
+    def template(self) -> Matrix:
+        return self.matrix
+
+
+class Add(Expression):
+    """Sum of two expressions."""
+
+    def __init__(self, left: Expression, right: Expression):
+        if left.size != right.size:
+            raise DifferentSizeException(
+                "Matrices should have the same size.",
+            )
+
+        self.left = left
+        self.right = right
+        self.size = left.size
+
+    def evaluate(self) -> Matrix:
+        if self._is_fusible():
+            return self.template().like(list(self.stream()), self.size)
+        return self.left.value() + self.right.value()
+
+    def stream(self) -> Iterator[Number]:
+        return map(operator.add, self.left.stream(), self.right.stream())
+
+    def template(self) -> Matrix:
+        return self.left.template()
+
+
+class Scale(Expression):
+    """Expression multiplied by number."""
+
+    def __init__(self, expression: Expression, number: Number):
+        self.expression = expression
+        self.number = number
+        self.size = expression.size
+
+    def evaluate(self) -> Matrix:
+        if self._is_fusible():
+            return self.template().like(list(self.stream()), self.size)
+        return self.expression.value() * self.number
+
+    def stream(self) -> Iterator[Number]:
+        return map(
+            operator.mul,
+            self.expression.stream(),
+            repeat(self.number),
+        )
+
+    def template(self) -> Matrix:
+        return self.expression.template()
+
+
+class MatMul(Expression):
+    """Product of two expressions.
+
+    Attributes:
+        operands: Get operands of consecutive multiplications.
+
+    """
+
+    def __init__(self, left: Expression, right: Expression):
+        if left.size.columns_num != right.size.rows_num:
+            raise DifferentSizeException(
+                "the first matrix must have the same number "
+                "of columns as the second matrix has rows",
+            )
+
+        self.left = left
+        self.right = right
+        self.size = Size(left.size.rows_num, right.size.columns_num)
+
+    def evaluate(self) -> Matrix:
+        matrices = [operand.value() for operand in self.operands()]
+        return _multiply_chain(matrices)
+
+    def operands(self) -> list[Expression]:
+        """Get operands of consecutive multiplications."""
+        operands = []
+        for operand in (self.left, self.right):
+            if isinstance(operand, MatMul):
+                operands.extend(operand.operands())
+            else:
+                operands.append(operand)
+        return operands
+
+    def template(self) -> Matrix:
+        return self.left.template()
+
+
+def as_expression(operand: Expression | Matrix) -> Expression:
+    """Wrap matrix into expression tree leaf."""
+    if isinstance(operand, Expression):
+        return operand
+    return Leaf(operand)
+
+
+def chain_order(dimensions: list[int]) -> list[list[int]]:
+    """Get optimal order of matrix chain multiplication.
+
+    Classic dynamic programming over the number of scalar
+    multiplications, matrix ``i`` has size
+    ``dimensions[i] x dimensions[i + 1]``.
+
+    Returns:
+        Table where ``[i][j]`` is index of the last matrix of the left
+        part in the best split of chain from ``i`` to ``j``.
+
+    """
+    count = len(dimensions) - 1
+    costs = [[0] * count for _ in range(count)]
+    splits = [[0] * count for _ in range(count)]
+
+    for length in range(2, count + 1):
+        for start in range(count - length + 1):
+            end = start + length - 1
+            costs[start][end], splits[start][end] = min(
+                (
+                    costs[start][split]
+                    + costs[split + 1][end]
+                    + dimensions[start]
+                    * dimensions[split + 1]
+                    * dimensions[end + 1],
+                    split,
+                )
+                for split in range(start, end)
+            )
+
+    return splits
+
+
+def _multiply_chain(matrices: list[Matrix]) -> Matrix:
+    """Multiply matrices in the cheapest order."""
+    dimensions = [matrices[0].rows_num]
+    dimensions.extend(matrix.columns_num for matrix in matrices)
+    splits = chain_order(dimensions)
+
+    def _multiply(start: int, end: int) -> Matrix:
+        if start == end:
+            return matrices[start]
+        split = splits[start][end]
+        return _multiply(start, split) @ _multiply(split + 1, end)
+
+    return _multiply(0, len(matrices) - 1)
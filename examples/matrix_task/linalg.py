@@ -0,0 +1,136 @@
+import operator
+from collections.abc import Iterable, Sequence
+from math import prod
+from typing import NamedTuple
+
+from buffers import Buffer, Number
+from kernels import to_rows
+
+
+class SingularMatrixException(Exception):
+    """Raise if matrix is singular, so it can't be inverted."""
+
+
+class LUDecomposition(NamedTuple):
+    """LU decomposition with partial pivoting: ``P @ A = L @ U``.
+
+    Attributes:
+        rows: Rows of ``L`` under the diagonal (its diagonal is ones) and
+            rows of ``U`` on and above the diagonal.
+        pivots: Row ``i`` of ``P @ A`` is row ``pivots[i]`` of ``A``.
+        sign: Sign of the permutation.
+        singular: Is there zero pivot.
+
+    """
+
+    rows: list[list[float]]
+    pivots: list[int]
+    sign: int
+    singular: bool
+
+
+def lu_decompose(values: Buffer, size: int) -> LUDecomposition:
+    """Get LU decomposition of square matrix by Gaussian elimination.
+
+    Each column is eliminated with the row having the greatest absolute
+    value in it as a pivot. Rows are updated by ``map`` over whole
+    slices, so the inner loop isn't interpreted.
+
+    """
+    rows = [list(map(float, row)) for row in to_rows(values, size, size)]
+    pivots = list(range(size))
+    sign = 1
+    singular = False
+    sub = operator.sub
+
+    for col_idx in range(size):
+        column = [abs(row[col_idx]) for row in rows[col_idx:]]
+        pivot_idx = col_idx + column.index(max(column))
+        pivot = rows[pivot_idx][col_idx]
+        if not pivot:
+            # Column is already eliminated.
+            singular = True
+            continue
+
+        if pivot_idx != col_idx:
+            rows[col_idx], rows[pivot_idx] = rows[pivot_idx], rows[col_idx]
+            pivots[col_idx], pivots[pivot_idx] = (
+                pivots[pivot_idx],
+                pivots[col_idx],
+            )
+            sign = -sign
+
+        pivot_tail = rows[col_idx][col_idx + 1:]
+        for row in rows[col_idx + 1:]:
+            factor = row[col_idx] / pivot
+            row[col_idx] = factor
+            if factor:
+                row[col_idx + 1:] = map(
+                    sub,
+                    row[col_idx + 1:],
+                    map(factor.__mul__, pivot_tail),
+                )
+
+    return LUDecomposition(rows, pivots, sign, singular)
+
+
+def lu_det(lu: LUDecomposition) -> float:
+    """Get determinant of decomposed matrix."""
+    if lu.singular:
+        return 0.0
+    return lu.sign * prod(row[idx] for idx, row in enumerate(lu.rows))
+
+
+def lu_solve(
+    lu: LUDecomposition,
+    columns: Iterable[Sequence[Number]],
+) -> list[list[float]]:
+    """Solve systems with decomposed matrix by forward and back substitution.
+
+    Args:
+        lu: Decomposition of matrix of the systems.
+        columns: Right-hand sides of the systems.
+
+    Returns:
+        Solutions of the systems.
+
+    Raises:
+        SingularMatrixException: If matrix is singular.
+
+    """
+    if lu.singular:
+        raise SingularMatrixException("Matrix is singular.")
+
+    mul = operator.mul
+    solutions = []
+    for column in columns:
+        solution = [float(column[row_idx]) for row_idx in lu.pivots]
+        for row_idx, row in enumerate(lu.rows):
+            solution[row_idx] -= sum(
+                map(mul, row[:row_idx], solution[:row_idx]),
+            )
+        for row_idx in reversed(range(len(lu.rows))):
+            row = lu.rows[row_idx]
+            solution[row_idx] = (
+                solution[row_idx]
+                - sum(map(mul, row[row_idx + 1:], solution[row_idx + 1:]))
+            ) / row[row_idx]
+        solutions.append(solution)
+    return solutions
+
+
+def lu_inverse(lu: LUDecomposition) -> list[list[float]]:
+    """Get columns of inverse of decomposed matrix.
+
+    Raises:
+        SingularMatrixException: If matrix is singular.
+
+    """
+    size = len(lu.rows)
+    return lu_solve(
+        lu,
+        (
+            [0] * col_idx + [1] + [0] * (size - col_idx - 1)
+            for col_idx in range(size)
+        ),
+    )
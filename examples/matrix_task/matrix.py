@@ -1,17 +1,78 @@
 from __future__ import annotations
 
 from collections import namedtuple
-from collections.abc import Sequence
-from typing import TypeAlias
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import chain
+from typing import TYPE_CHECKING, Any
+
+from backends import AUTO, Backend, get_backend
+from buffers import Buffer, Number, as_flat_buffer, pack, store
+from kernels import CLASSICAL, is_int_buffer, power_by_squaring, power_mod
+
+if TYPE_CHECKING:
+    from lazy import Expression
+    from linalg import LUDecomposition
+    from sparse import CSRMatrix
 
-Number: TypeAlias = int | float
 Size = namedtuple("Size", ["rows_num", "columns_num"])
+Strides = namedtuple("Strides", ["row", "column"])
 
 
 class DifferentSizeException(Exception):
     """Raise if matrices have different size."""
 
 
+def _as_slice(index: int | slice, length: int) -> slice:
+    """Get slice selecting the same items as index."""
+    if isinstance(index, slice):
+        return index
+    # Range checks bounds and supports negative indexes.
+    index = range(length)[index]
+    return slice(index, index + 1)
+
+
+class MatrixRow(Sequence[Number]):
+    """Row of matrix, it reads and writes elements of the matrix.
+
+    Row isn't a copy: ``matrix[row][column] = value`` changes the matrix
+    and the row sees later changes of the matrix. Row is equal to any
+    sequence of the same elements, e.g. list.
+
+    """
+
+    __slots__ = ("_matrix", "_row_idx")
+
+    def __init__(self, matrix: Matrix, row_idx: int):
+        self._matrix = matrix
+        self._row_idx = row_idx
+
+    def __len__(self) -> int:
+        return self._matrix.columns_num
+
+    def __getitem__(self, index: Any) -> Any:
+        """Get element by index or list of elements by slice."""
+        if isinstance(index, slice):
+            return list(self)[index]
+        return self._matrix[self._row_idx, index]
+
+    def __setitem__(self, col_idx: int, value: Number) -> None:
+        """Set element of the matrix."""
+        self._matrix[self._row_idx, col_idx] = value
+
+    def __iter__(self) -> Iterator[Number]:
+        return iter(self._matrix._row(self._row_idx))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return list(self) == list(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 class Matrix:
     """Class for matrix computations.
 
@@ -21,20 +82,76 @@ class Matrix:
      - multiplication of matrix and a number
      - matrix transposing
      - dimensions check
+     - views on submatrices
+     - determinant, inverse and solving of linear systems
+
+    Elements are kept in a flat row-major buffer with strides metadata,
+    element with indexes ``(row, column)`` is located at
+    ``offset + row * strides.row + column * strides.column``. Transposition
+    and slicing give views sharing the buffer, the buffer is copied only
+    on the first write to the view or to the parent. External buffers
+    (see ``from_buffer``, e.g. mapped files) are never copied by the
+    parent, its writes always reach the buffer and are seen by views.
+    Writes which can't be stored in external buffer (read-only one or
+    values of wider type) raise ``TypeError``.
+
+    Arithmetic is done by a backend (see ``backends`` module). It can be
+    selected for a single matrix with ``backend_name`` or for all matrices
+    with ``Matrix.default_backend``, results inherit backend of the left
+    operand. The same way ``matmul_strategy`` and
+    ``Matrix.default_matmul_strategy`` select multiplication algorithm:
+    ``classical``, ``strassen`` or ``auto`` to choose it by matrix size.
+    ``workers`` and ``Matrix.default_workers`` set number of processes
+    for big multiplications (all CPUs if it isn't positive).
+
+    In-place operators (``+=``, ``-=``, ``*=``, ``@=``) write results to
+    the own buffer of the matrix. Products are computed into a scratch
+    buffer kept by the matrix and copied back, so repeated ``@=`` doesn't
+    allocate memory.
+
+    LU decomposition used by ``det``, ``inverse`` and ``solve`` is cached
+    on the matrix until its elements are changed.
 
     Attributes:
         rows_num: Get number of rows.
         columns_num: Get number of columns.
         size: Get size of matrix.
+        data: Get list of rows, they read and write elements of matrix.
+        buffer: Get flat buffer with matrix elements.
+        flat: Get contiguous row-major buffer, copy only if it's needed.
+        like: Create matrix with the same settings from row-major numbers.
+        strides: Get steps in the buffer between rows and columns.
+        backend: Get backend used for arithmetic.
         T: Get matrix transposition.
+        lazy: Start lazy expression over the matrix.
+        lu: Get LU decomposition with partial pivoting.
+        det: Get determinant.
+        inverse: Get inverse matrix.
+        solve: Solve linear systems with the matrix.
+        to_sparse: Convert to compressed sparse row matrix.
 
     """
 
-    def __init__(self, data: Sequence[Sequence[Number]]):
+    default_backend = AUTO
+    default_matmul_strategy = CLASSICAL
+    default_workers = 1
+
+    backend_name: str | None = None
+    matmul_strategy: str | None = None
+    workers: int | None = None
+    _scratch: Buffer | None = None
+    _lu: LUDecomposition | None = None
+
+    def __init__(
+        self,
+        data: Sequence[Sequence[Number]],
+        backend: str | None = None,
+    ):
         """Constructor for Matrix class.
 
         Args:
             data: Matrix in the form of nested number sequences.
+            backend: Name of backend, ``default_backend`` if not set.
 
         """
         if len(set(map(len, data))) != 1:
@@ -44,36 +161,375 @@ class Matrix:
                 "Rows should have the same length.",
             )
 
-        self.data = data
+        columns_num = len(data[0])
+        self._set_storage(
+            pack(chain.from_iterable(data)),
+            Size(len(data), columns_num),
+            Strides(columns_num, 1),
+        )
+        self.backend_name = backend
+        if backend is not None:
+            # Fail fast on unknown backend.
+            get_backend(backend)
+
+    def _set_storage(
+        self,
+        buffer: Buffer,
+        size: Size,
+        strides: Strides,
+        offset: int = 0,
+        shared: bool = False,
+        external: bool = False,
+    ) -> None:
+        """Attach flat buffer to the matrix."""
+        self._buffer = buffer
+        self._size = size
+        self._strides = strides
+        self._offset = offset
+        # Buffer is used by views, it's copied before the first write.
+        self._shared = shared
+        # Buffer isn't owned by the matrix, so it's written in place.
+        self._external = external
+        self._lu = None
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: Any,
+        size: tuple[int, int],
+        strides: tuple[int, int] | None = None,
+        offset: int = 0,
+        backend: str | None = None,
+    ) -> Matrix:
+        """Create matrix over flat buffer without copying it.
+
+        Args:
+            buffer: List, array or object supporting buffer protocol.
+            size: Number of rows and columns.
+            strides: Steps between rows and columns, row-major by default.
+            offset: Index of the first element in the buffer.
+            backend: Name of backend, ``default_backend`` if not set.
+
+        Raises:
+            ValueError: If the buffer is too small for the matrix.
+
+        """
+        size = Size(*size)
+        strides = Strides(*(strides or (size.columns_num, 1)))
+        buffer = as_flat_buffer(buffer)
+
+        if size.rows_num < 1 or size.columns_num < 1:
+            raise ValueError("Matrix should have at least one element.")
+
+        last_index = (
+            offset
+            + (size.rows_num - 1) * strides.row
+            + (size.columns_num - 1) * strides.column
+        )
+        if offset < 0 or last_index >= len(buffer):
+            raise ValueError(
+                f"Buffer of length {len(buffer)} is too small for "
+                f"matrix of size {tuple(size)}.",
+            )
+
+        matrix = cls.__new__(cls)
+        matrix._set_storage(buffer, size, strides, offset, external=True)
+        matrix.backend_name = backend
+        return matrix
+
+    @classmethod
+    def from_values(
+        cls,
+        values: Iterable[Number],
+        size: tuple[int, int],
+        backend: str | None = None,
+    ) -> Matrix:
+        """Create matrix owning new buffer with row-major numbers.
+
+        Unlike ``from_buffer`` matrix is a usual one, its views are
+        protected by copy-on-write.
+
+        Raises:
+            ValueError: If number of values doesn't match the size.
+
+        """
+        size = Size(*size)
+        buffer = pack(values)
+        if len(buffer) != size.rows_num * size.columns_num or not buffer:
+            raise ValueError(
+                f"{len(buffer)} values don't fit matrix of size "
+                f"{tuple(size)}.",
+            )
+
+        matrix = cls.__new__(cls)
+        matrix._set_storage(buffer, size, Strides(size.columns_num, 1))
+        matrix.backend_name = backend
+        return matrix
+
+    def _new_like(
+        self,
+        buffer: Buffer,
+        size: Size,
+        strides: Strides,
+        offset: int = 0,
+        shared: bool = False,
+    ) -> Matrix:
+        """Create matrix over the buffer with the same settings.
+
+        It's always plain ``Matrix``, subclasses bound to external storage
+        (e.g. files) produce in-memory results.
+
+        """
+        matrix = Matrix.__new__(Matrix)
+        matrix._set_storage(buffer, size, strides, offset, shared)
+        matrix.backend_name = self.backend_name
+        matrix.matmul_strategy = self.matmul_strategy
+        matrix.workers = self.workers
+        return matrix
+
+    def like(self, values: Iterable[Number], size: Size) -> Matrix:
+        """Create matrix with the same settings from row-major numbers."""
+        return self._new_like(
+            pack(values),
+            size,
+            Strides(size.columns_num, 1),
+        )
+
+    def _view(self, size: Size, strides: Strides, offset: int) -> Matrix:
+        """Create matrix sharing the buffer.
+
+        View copies the buffer before its first write. The parent does it
+        too unless the buffer is external, e.g. mapped file, which must
+        get the writes.
+
+        """
+        if not self._external:
+            self._shared = True
+        return self._new_like(self._buffer, size, strides, offset, True)
+
+    def _prepare_write(self) -> None:
+        """Detach from shared buffer and drop cache before modification.
+
+        Raises:
+            TypeError: If external buffer is read-only.
+
+        """
+        if self._external and getattr(self._buffer, "readonly", False):
+            raise TypeError("Matrix over read-only buffer can't be changed.")
+        self._lu = None
+        if self._shared:
+            self._set_storage(
+                pack(list(self._values())),
+                self.size,
+                Strides(self.columns_num, 1),
+            )
+
+    def _out(self) -> Buffer | None:
+        """Get own buffer if results can be written to it in place."""
+        return self._buffer if self.is_contiguous else None
+
+    def _store(self, values: Buffer, size: Size) -> None:
+        """Write row-major values to own buffer.
+
+        Buffer is replaced if values don't fit into it or the matrix isn't
+        contiguous.
+
+        Raises:
+            TypeError: If external buffer would be replaced.
+
+        """
+        if values is self._buffer:
+            return
+        buffer = (
+            store(self._buffer, values)
+            if size == self.size and self.is_contiguous
+            else pack(values)
+        )
+        if buffer is not self._buffer:
+            if self._external:
+                raise TypeError(
+                    "Result can't be written to external buffer of matrix.",
+                )
+            self._set_storage(buffer, size, Strides(size.columns_num, 1))
 
     @property
     def rows_num(self) -> int:
-        return len(self.data)
+        return self._size.rows_num
 
     @property
     def columns_num(self) -> int:
-        return len(self.data[0])
+        return self._size.columns_num
 
     @property
     def size(self) -> Size:
         """Get size of matrix."""
-        return Size(self.rows_num, self.columns_num)
+        return self._size
+
+    @property
+    def strides(self) -> Strides:
+        """Get steps in the buffer between rows and between columns."""
+        return self._strides
+
+    @property
+    def buffer(self) -> Buffer:
+        """Get flat buffer with matrix elements."""
+        return self._buffer
+
+    @property
+    def backend(self) -> Backend:
+        """Get backend used for arithmetic."""
+        return get_backend(self.backend_name or self.default_backend)
+
+    @property
+    def is_contiguous(self) -> bool:
+        """Check if elements are stored one by one in row-major order."""
+        return (
+            self._offset == 0
+            and self._strides == (self.columns_num, 1)
+            and len(self._buffer) == self.rows_num * self.columns_num
+        )
+
+    @property
+    def data(self) -> list[MatrixRow]:
+        """Get list of rows, they read and write elements of matrix."""
+        return [MatrixRow(self, row_idx) for row_idx in range(self.rows_num)]
+
+    def _row(self, row_idx: int) -> list[Number]:
+        """Get copy of row by index."""
+        start = self._offset + row_idx * self._strides.row
+        stop = start + self.columns_num * self._strides.column
+        return list(self._buffer[start:stop:self._strides.column])
+
+    def _column(self, col_idx: int) -> list[Number]:
+        """Get copy of column by index."""
+        start = self._offset + col_idx * self._strides.column
+        stop = start + self.rows_num * self._strides.row
+        return list(self._buffer[start:stop:self._strides.row])
+
+    def _iter_rows(self) -> Iterator[list[Number]]:
+        return map(self._row, range(self.rows_num))
+
+    def _iter_columns(self) -> Iterator[list[Number]]:
+        return map(self._column, range(self.columns_num))
+
+    def _values(self) -> Iterable[Number]:
+        """Get elements in row-major order."""
+        if self.is_contiguous:
+            return self._buffer
+        return chain.from_iterable(self._iter_rows())
+
+    def flat(self) -> Buffer:
+        """Get contiguous row-major buffer, copy only if it's needed."""
+        if self.is_contiguous:
+            return self._buffer
+        return pack(self._values())
 
     def T(self) -> Matrix:
-        """Get matrix transposition."""
-        if self.rows_num != self.columns_num:
+        """Get matrix transposition.
+
+        It's a view sharing the buffer with swapped strides, so it costs
+        O(1) for matrices of any size.
+
+        """
+        return self._view(
+            Size(self.columns_num, self.rows_num),
+            Strides(self._strides.column, self._strides.row),
+            self._offset,
+        )
+
+    def copy(self) -> Matrix:
+        """Get matrix with own contiguous buffer."""
+        return self.like(list(self._values()), self.size)
+
+    def lazy(self) -> Expression:
+        """Start lazy expression over the matrix.
+
+        Operators on the result build an expression tree, which is computed
+        by ``evaluate`` method with fused elementwise operations and
+        optimal order of matrix chain multiplication::
+
+            (2 * a.lazy() + b - c).evaluate()
+
+        """
+        from lazy import Leaf
+
+        return Leaf(self)
+
+    def lu(self) -> LUDecomposition:
+        """Get LU decomposition with partial pivoting.
+
+        It's computed once and cached until elements of the matrix are
+        changed.
+
+        Raises:
+            DifferentSizeException: If matrix isn't square.
+
+        """
+        if self._lu is None:
+            from linalg import lu_decompose
+
+            self._check_square()
+            self._lu = lu_decompose(self.flat(), self.rows_num)
+        return self._lu
+
+    def det(self) -> float:
+        """Get determinant.
+
+        Raises:
+            DifferentSizeException: If matrix isn't square.
+
+        """
+        from linalg import lu_det
+
+        return lu_det(self.lu())
+
+    def inverse(self) -> Matrix:
+        """Get inverse matrix.
+
+        Raises:
+            DifferentSizeException: If matrix isn't square.
+            SingularMatrixException: If matrix is singular.
+
+        """
+        from linalg import lu_inverse
+
+        return self.like(
+            chain.from_iterable(zip(*lu_inverse(self.lu()))),
+            self.size,
+        )
+
+    def solve(self, matrix: Matrix) -> Matrix:
+        """Solve linear systems ``self @ x = matrix``.
+
+        Each column of the matrix is the right-hand side of a system, the
+        result has solutions in the same columns. Decomposition of the
+        matrix is reused, so each solve costs only O(n^2) per column.
+
+        Raises:
+            DifferentSizeException: If matrix isn't square or the other
+                matrix has different number of rows.
+            SingularMatrixException: If matrix is singular.
+
+        """
+        from linalg import lu_solve
+
+        if matrix.rows_num != self.rows_num:
             raise DifferentSizeException(
-                "Matrix should be square.",
+                "Right-hand side should have the same number of rows.",
             )
 
-        return Matrix(
-            [
-                [
-                    self[row_idx][col_idx] for row_idx in range(self.rows_num)
-                ] for col_idx in range(self.columns_num)
-            ],
+        solutions = lu_solve(self.lu(), matrix._iter_columns())
+        return self.like(
+            chain.from_iterable(zip(*solutions)),
+            matrix.size,
         )
 
+    def to_sparse(self) -> CSRMatrix:
+        """Convert to compressed sparse row matrix."""
+        from sparse import CSRMatrix
+
+        return CSRMatrix.from_dense(self)
+
     def __matmul__(self, other_matrix: Matrix) -> Matrix:
         """Get multiplication matrix by matrix.
 
@@ -82,48 +538,218 @@ class Matrix:
             matrix is not equal to the number of rows in the second matrix.
 
         """
+        if not isinstance(other_matrix, Matrix):
+            # Let lazy expressions build a node.
+            return NotImplemented
+
+        self._check_matmul_size(other_matrix)
+        size = Size(self.rows_num, other_matrix.columns_num)
+        return self.like(
+            self._matmul_buffers(
+                self.flat(),
+                other_matrix.flat(),
+                self.columns_num,
+                size,
+            ),
+            size,
+        )
+
+    def __imatmul__(self, other_matrix: Matrix) -> Matrix:
+        """Multiply matrix by matrix in place.
+
+        Raises:
+            DifferentSizeException: If the number of columns in the first
+            matrix is not equal to the number of rows in the second matrix.
+
+        """
+        if not isinstance(other_matrix, Matrix):
+            return NotImplemented
+
+        self._check_matmul_size(other_matrix)
+        self._prepare_write()
+        size = Size(self.rows_num, other_matrix.columns_num)
+        scratch = self._scratch
+        if scratch is not None and len(scratch) != size[0] * size[1]:
+            scratch = None
+
+        product = self._matmul_buffers(
+            self.flat(),
+            other_matrix.flat(),
+            self.columns_num,
+            size,
+            scratch,
+        )
+        self._store(product, size)
+        # The product can't be written over operands, so it's computed
+        # into scratch buffer and copied, the scratch is kept for the next
+        # multiplication.
+        self._scratch = None if product is self._buffer else product
+        return self
+
+    def _check_square(self) -> None:
+        if self.rows_num != self.columns_num:
+            raise DifferentSizeException("Matrix should be square.")
+
+    def _check_matmul_size(self, other_matrix: Matrix) -> None:
         if other_matrix.rows_num != self.columns_num:
             raise DifferentSizeException(
                 "the first matrix must have the same number "
                 "of columns as the second matrix has rows",
             )
 
-        result = [
-            [
-                sum(
-                    row_elem * column_elem
-                    for row_elem, column_elem in zip(row, column)
-                )
-                for column in zip(*other_matrix.data)
-            ]
-            for row in self.data
-        ]
-
-        return Matrix(result)
+    def _matmul_buffers(
+        self,
+        left: Buffer,
+        right: Buffer,
+        inner_num: int,
+        size: Size,
+        out: Buffer | None = None,
+    ) -> Buffer:
+        """Multiply row-major buffers with settings of the matrix."""
+        return self.backend.matmul(
+            left,
+            right,
+            size.rows_num,
+            inner_num,
+            size.columns_num,
+            self.matmul_strategy or self.default_matmul_strategy,
+            self.default_workers if self.workers is None else self.workers,
+            out,
+        )
 
     def __mul__(self, number: Number) -> Matrix:
         """Get multiplication matrix by number."""
-        return Matrix(
-            [
-                [elem * number for elem in rows]
-                for rows in self.data
-            ],
+        return self.like(
+            self.backend.mul(self.flat(), number),
+            self.size,
         )
 
     def __rmul__(self, number: Number) -> Matrix:
         """Get reflected multiplication."""
         return self.__mul__(number)
 
-    def __getitem__(self, index: int) -> Sequence[Number]:
-        """Get row by index.
+    def __imul__(self, number: Number) -> Matrix:
+        """Multiply matrix by number in place."""
+        self._prepare_write()
+        self._store(
+            self.backend.mul(self.flat(), number, self._out()),
+            self.size,
+        )
+        return self
+
+    def __getitem__(
+        self,
+        index: int | slice | tuple[int | slice, int | slice],
+    ) -> Any:
+        """Get row by index, element by pair of indexes or submatrix.
 
         It is needed for getting elements by two indexes without call
-        data attribute.
+        data attribute: both ``matrix[row][column]`` and
+        ``matrix[row, column]`` are supported. Row is ``MatrixRow``, so
+        ``matrix[row][column] = value`` changes the matrix. Slices return
+        views sharing the buffer: ``matrix[1:3]`` for rows,
+        ``matrix[::2, 1:]`` for strided submatrix.
 
         """
-        return self.data[index]
+        if isinstance(index, slice):
+            return self._submatrix(index, slice(None))
+
+        if not isinstance(index, tuple):
+            return MatrixRow(self, range(self.rows_num)[index])
+
+        row_idx, col_idx = index
+        if isinstance(row_idx, int) and isinstance(col_idx, int):
+            return self._buffer[self._flat_index(row_idx, col_idx)]
+
+        return self._submatrix(
+            _as_slice(row_idx, self.rows_num),
+            _as_slice(col_idx, self.columns_num),
+        )
+
+    def __setitem__(self, index: tuple[int, int], value: Number) -> None:
+        """Set element by pair of indexes.
+
+        Shared buffer is copied before the first write, so views and
+        the parent matrix never see changes of each other.
+
+        Raises:
+            TypeError: If value doesn't fit into external buffer or it's
+                read-only.
+
+        """
+        self._prepare_write()
+        flat_index = self._flat_index(*index)
+        try:
+            self._buffer[flat_index] = value
+        except (TypeError, OverflowError) as error:
+            if self._external:
+                raise TypeError(
+                    f"{value!r} doesn't fit into external buffer of matrix.",
+                ) from error
+            # Value doesn't fit into the typed array, e.g. float in int
+            # matrix, so choose a wider buffer.
+            values = list(self._buffer)
+            values[flat_index] = value
+            self._buffer = pack(values)
+
+    def _submatrix(self, rows: slice, columns: slice) -> Matrix:
+        """Get view on rows and columns in the slices.
+
+        Raises:
+            ValueError: If slices are empty or have negative step.
+
+        """
+        row_range = range(self.rows_num)[rows]
+        col_range = range(self.columns_num)[columns]
+        if row_range.step < 0 or col_range.step < 0:
+            raise ValueError("Negative steps are not supported.")
+        if not row_range or not col_range:
+            raise ValueError("Matrix should have at least one element.")
+
+        return self._view(
+            Size(len(row_range), len(col_range)),
+            Strides(
+                self._strides.row * row_range.step,
+                self._strides.column * col_range.step,
+            ),
+            self._flat_index(row_range.start, col_range.start),
+        )
+
+    def _flat_index(self, row_idx: int, col_idx: int) -> int:
+        """Get index of element in the buffer."""
+        # Ranges check bounds and support negative indexes.
+        row_idx = range(self.rows_num)[row_idx]
+        col_idx = range(self.columns_num)[col_idx]
+        return (
+            self._offset
+            + row_idx * self._strides.row
+            + col_idx * self._strides.column
+        )
 
     def __add__(self, matrix: Matrix) -> Matrix:
+        if not isinstance(matrix, Matrix):
+            return NotImplemented
+
+        self._check_same_size(matrix)
+        return self.like(
+            self.backend.add(self.flat(), matrix.flat()),
+            self.size,
+        )
+
+    def __iadd__(self, matrix: Matrix) -> Matrix:
+        """Add matrix in place."""
+        if not isinstance(matrix, Matrix):
+            return NotImplemented
+
+        self._check_same_size(matrix)
+        self._prepare_write()
+        self._store(
+            self.backend.add(self.flat(), matrix.flat(), self._out()),
+            self.size,
+        )
+        return self
+
+    def _check_same_size(self, matrix: Matrix) -> None:
         if self.size != matrix.size:
             # One matrix can be added to another matrix only if they have
             # the same dimensions.
@@ -131,15 +757,6 @@ class Matrix:
                 "Matrices should have the same size.",
             )
 
-        return Matrix(
-            [
-                [
-                    self[row_idx][col_idx] + matrix[row_idx][col_idx]
-                    for col_idx in range(self.columns_num)
-                ] for row_idx in range(self.rows_num)
-            ],
-        )
-
     def __repr__(self) -> str:
         """Convert matrix to string."""
         return f"{self.__class__.__name__}({self.data})"
@@ -154,27 +771,91 @@ class Matrix:
 
     def __sub__(self, matrix: Matrix) -> Matrix:
         """Binary minus operator."""
-        return -matrix + self
+        if not isinstance(matrix, Matrix):
+            return NotImplemented
+
+        self._check_same_size(matrix)
+        return self.like(
+            self.backend.sub(self.flat(), matrix.flat()),
+            self.size,
+        )
 
-    def __pow__(self, power: int) -> Matrix:
+    def __isub__(self, matrix: Matrix) -> Matrix:
+        """Subtract matrix in place."""
+        if not isinstance(matrix, Matrix):
+            return NotImplemented
+
+        self._check_same_size(matrix)
+        self._prepare_write()
+        self._store(
+            self.backend.sub(self.flat(), matrix.flat(), self._out()),
+            self.size,
+        )
+        return self
+
+    def __pow__(self, power: int, modulo: int | None = None) -> Matrix:
         """Positive pow of matrix use fast exponentiation algorithm.
 
+        At most three buffers are allocated whatever the power is: the
+        result, the current square and scratch buffer for the next
+        product. The buffer replaced by a product becomes the scratch.
+
+        With modulo (``pow(matrix, power, modulo)``) elements are reduced
+        after each dot product, so they don't grow with the power.
+
         Raises:
-            ValueError: Raise if power isn't positive.
+            ValueError: Raise if power or modulo isn't positive.
+            TypeError: If modulo isn't integer or it's set for matrix
+                with not integer elements.
+            DifferentSizeException: If matrix isn't square and power is
+                above one.
 
         """
         if power <= 0:
             raise ValueError("Power must be positive.")
+        if modulo is not None:
+            return self._power_mod(power, modulo)
+        if power == 1:
+            return self.copy()
+
+        self._check_square()
+        return self.like(self._power_buffer(power), self.size)
+
+    def _power_mod(self, power: int, modulo: int) -> Matrix:
+        """Get positive power by modulo."""
+        if not isinstance(modulo, int):
+            raise TypeError("Modulo must be integer.")
+        if modulo <= 0:
+            raise ValueError("Modulo must be positive.")
+        values = self.flat()
+        if not (
+            is_int_buffer(values)
+            or all(isinstance(elem, int) for elem in values)
+        ):
+            raise TypeError("Only integer matrices support modulo.")
+        if power == 1:
+            # The same as without modulo, matrix may be not square.
+            return self.like(
+                [elem % modulo for elem in values],
+                self.size,
+            )
 
-        result = Matrix(self.data)
-        last_matrix = Matrix(self.data)
-
-        power -= 1
-
-        while power > 0:
-            if power % 2:
-                result @= last_matrix
-            last_matrix @= last_matrix
-            power //= 2
+        self._check_square()
+        return self.like(
+            power_mod(values, self.rows_num, power, modulo),
+            self.size,
+        )
 
-        return result
+    def _power_buffer(self, power: int) -> Buffer:
+        """Get buffer with power of matrix greater than one."""
+        return power_by_squaring(
+            self.flat(),
+            power,
+            lambda left, right, out: self._matmul_buffers(
+                left,
+                right,
+                self.columns_num,
+                self.size,
+                out,
+            ),
+        )
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import mmap
+import operator
+import os
+import struct
+import sys
+import tempfile
+import weakref
+from array import array
+from functools import reduce
+from pathlib import Path
+
+from buffers import FLOAT_TYPECODE, INT_TYPECODE
+from matrix import DifferentSizeException, Matrix, Size
+
+# File starts with header: magic, format version, typecode of elements,
+# byte order of elements, number of rows and columns. Elements follow
+# the header in row-major order.
+HEADER = struct.Struct("<4sBcc9xQQ")
+MAGIC = b"MTRX"
+VERSION = 1
+BYTE_ORDERS = {"little": b"<", "big": b">"}
+SUFFIX = ".matrix"
+# Out-of-core multiplication keeps three tiles in memory at once.
+DEFAULT_TILE_SIZE = 512
+
+INT_FORMATS = "bBhHiIlLqQ"
+FLOAT_FORMATS = "fd"
+
+
+class DiskMatrix(Matrix):
+    """Matrix stored in file and mapped to memory.
+
+    Elements are read from disk only when they are used. Multiplication
+    and power are computed tile by tile into new files, so they work with
+    matrices larger than memory. Results of other operations are
+    in-memory matrices. Writes to matrix opened for writing go to the
+    file even if the matrix has views.
+
+    Attributes:
+        path: Get path to file with matrix.
+
+    """
+
+    path: Path
+    tile_size: int = DEFAULT_TILE_SIZE
+
+    def __matmul__(self, other_matrix: Matrix) -> Matrix:
+        if not isinstance(other_matrix, Matrix):
+            return NotImplemented
+        return matmul(self, other_matrix, tile_size=self.tile_size)
+
+    def __rmatmul__(self, other_matrix: Matrix) -> Matrix:
+        if not isinstance(other_matrix, Matrix):
+            return NotImplemented
+        return matmul(other_matrix, self, tile_size=self.tile_size)
+
+    def __imatmul__(self, other_matrix: Matrix) -> Matrix:
+        # Product may be larger than memory, so ``@=`` is computed out of
+        # core into new file.
+        return NotImplemented
+
+    def __pow__(self, power: int, modulo: int | None = None) -> Matrix:
+        if modulo is not None:
+            # Reduced elements are small, so it's computed in memory.
+            return super().__pow__(power, modulo)
+        return matrix_power(self, power, tile_size=self.tile_size)
+
+
+def save(matrix: Matrix, path: str | Path) -> None:
+    """Write matrix to file row by row.
+
+    Raises:
+        ValueError: If elements don't fit into machine types.
+
+    """
+    typecode = _get_typecode(matrix)
+    with open(path, "wb") as file:
+        file.write(_pack_header(typecode, matrix.size))
+        for row_idx in range(matrix.rows_num):
+            array(typecode, matrix[row_idx]).tofile(file)
+
+
+def create(
+    path: str | Path,
+    size: tuple[int, int],
+    typecode: str,
+) -> DiskMatrix:
+    """Create file with zero matrix and open it for writing."""
+    rows_num, columns_num = size
+    with open(path, "wb") as file:
+        file.write(_pack_header(typecode, Size(rows_num, columns_num)))
+        # Zeros are not written, file system creates sparse file.
+        file.truncate(
+            HEADER.size + rows_num * columns_num * array(typecode).itemsize,
+        )
+    return open_matrix(path, writable=True)
+
+
+def open_matrix(path: str | Path, writable: bool = False) -> DiskMatrix:
+    """Map matrix file to memory without reading it.
+
+    Raises:
+        ValueError: If file isn't a matrix file or it was written on
+            machine with different byte order.
+
+    """
+    with open(path, "r+b" if writable else "rb") as file:
+        try:
+            magic, version, typecode, byte_order, rows_num, columns_num = (
+                HEADER.unpack(file.read(HEADER.size))
+            )
+        except struct.error as error:
+            raise ValueError(f"{path} is not a matrix file.") from error
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a matrix file.")
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise ValueError(f"{path} has different byte order.")
+
+        memory = mmap.mmap(
+            file.fileno(),
+            0,
+            access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ,
+        )
+
+    typecode = typecode.decode()
+    length = rows_num * columns_num * array(typecode).itemsize
+    buffer = memoryview(memory)[HEADER.size:HEADER.size + length]
+
+    matrix = DiskMatrix.from_buffer(
+        buffer.cast(typecode),
+        (rows_num, columns_num),
+    )
+    matrix.path = Path(path)
+    return matrix
+
+
+def matmul(
+    left: Matrix,
+    right: Matrix,
+    path: str | Path | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> DiskMatrix:
+    """Multiply matrices tile by tile into file.
+
+    Only three tiles of ``tile_size x tile_size`` are in memory at once,
+    operands are read from their files when tiles are used. If path isn't
+    set, result is written to temporary file, which is removed with the
+    result matrix.
+
+    Raises:
+        DifferentSizeException: If the number of columns in the first
+            matrix is not equal to the number of rows in the second matrix.
+        OverflowError: If integer result doesn't fit into int64.
+
+    """
+    if left.columns_num != right.rows_num:
+        raise DifferentSizeException(
+            "the first matrix must have the same number "
+            "of columns as the second matrix has rows",
+        )
+
+    typecode = (
+        INT_TYPECODE
+        if _get_typecode(left) == _get_typecode(right) == INT_TYPECODE
+        else FLOAT_TYPECODE
+    )
+    result = _create_result(
+        path,
+        Size(left.rows_num, right.columns_num),
+        typecode,
+        left,
+    )
+
+    for row_start in range(0, left.rows_num, tile_size):
+        rows = slice(row_start, row_start + tile_size)
+        for col_start in range(0, right.columns_num, tile_size):
+            columns = slice(col_start, col_start + tile_size)
+            tile = _matmul_tile(left[rows], right[:, columns], tile_size)
+            _write_tile(result, row_start, col_start, tile)
+
+    return result
+
+
+def matrix_power(
+    matrix: Matrix,
+    power: int,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> DiskMatrix:
+    """Positive pow of matrix with intermediate results on disk.
+
+    Intermediate matrices are temporary files, which are removed as soon
+    as they are not needed.
+
+    Raises:
+        ValueError: Raise if power isn't positive.
+
+    """
+    if power <= 0:
+        raise ValueError("Power must be positive.")
+
+    if power == 1:
+        copy = _create_result(None, matrix.size, _get_typecode(matrix))
+        _write_tile(copy, 0, 0, matrix)
+        return copy
+
+    result: Matrix | None = None
+    last_matrix = matrix
+
+    while power > 0:
+        if power % 2:
+            result = (
+                last_matrix
+                if result is None
+                else matmul(result, last_matrix, tile_size=tile_size)
+            )
+        power //= 2
+        if power:
+            last_matrix = matmul(last_matrix, last_matrix, tile_size=tile_size)
+
+    assert isinstance(result, DiskMatrix)
+    return result
+
+
+def _matmul_tile(rows: Matrix, columns: Matrix, tile_size: int) -> Matrix:
+    """Multiply block of rows by block of columns tile by tile."""
+    products = (
+        rows[:, inner_start:inner_start + tile_size]
+        @ columns[inner_start:inner_start + tile_size]
+        for inner_start in range(0, rows.columns_num, tile_size)
+    )
+    return reduce(operator.add, products)
+
+
+def _write_tile(
+    result: DiskMatrix,
+    row_start: int,
+    col_start: int,
+    tile: Matrix,
+) -> None:
+    """Copy tile to position in the result matrix."""
+    buffer = result.buffer
+    typecode = _get_typecode(result)
+    for row_idx in range(tile.rows_num):
+        start = (row_start + row_idx) * result.columns_num + col_start
+        buffer[start:start + tile.columns_num] = array(
+            typecode,
+            tile[row_idx],
+        )
+
+
+def _create_result(
+    path: str | Path | None,
+    size: Size,
+    typecode: str,
+    operand: Matrix | None = None,
+) -> DiskMatrix:
+    """Create result file, temporary one if path isn't set.
+
+    Temporary file is placed next to the operand file.
+
+    """
+    if path is not None:
+        return create(path, size, typecode)
+
+    directory = (
+        operand.path.parent if isinstance(operand, DiskMatrix) else None
+    )
+    file_descriptor, temp_path = tempfile.mkstemp(
+        suffix=SUFFIX,
+        dir=directory,
+    )
+    os.close(file_descriptor)
+
+    result = create(temp_path, size, typecode)
+    # Mapping stays valid after removing the file.
+    weakref.finalize(result, os.remove, temp_path)
+    return result
+
+
+def _get_typecode(matrix: Matrix) -> str:
+    """Get typecode of matrix elements on disk.
+
+    Raises:
+        ValueError: If elements don't fit into machine types.
+
+    """
+    buffer = matrix.buffer
+    element_format = (
+        buffer.typecode
+        if isinstance(buffer, array)
+        else getattr(buffer, "format", "")
+    )
+    if len(element_format) == 1 and element_format in INT_FORMATS:
+        return INT_TYPECODE
+    if len(element_format) == 1 and element_format in FLOAT_FORMATS:
+        return FLOAT_TYPECODE
+    raise ValueError("Only int64 and float64 matrices can be stored.")
+
+
+def _pack_header(typecode: str, size: Size) -> bytes:
+    return HEADER.pack(
+        MAGIC,
+        VERSION,
+        typecode.encode(),
+        BYTE_ORDERS[sys.byteorder],
+        size.rows_num,
+        size.columns_num,
+    )
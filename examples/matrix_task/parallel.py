@@ -0,0 +1,230 @@
+import atexit
+import os
+from array import array
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import cache
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+from buffers import FLOAT_TYPECODE, INT_TYPECODE, Buffer, Number, zeros
+from kernels import DEFAULT_BLOCK_SIZE, matmul_blocked
+
+# Number of multiply-add operations starting from which computation is
+# spread between processes, smaller products are faster to compute in
+# one process than to pay for task dispatching.
+PARALLEL_MIN_OPERATIONS = 2 ** 22
+
+
+class RowsTask(NamedTuple):
+    """Task for worker to compute rows of product."""
+
+    left_name: str
+    right_name: str
+    result_name: str
+    left_typecode: str
+    right_typecode: str
+    result_typecode: str
+    row_start: int
+    row_stop: int
+    inner_num: int
+    columns_num: int
+    block_size: int
+
+
+def get_workers_num(workers: int) -> int:
+    """Get number of processes, all CPUs if workers isn't positive."""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def should_parallelize(
+    rows_num: int,
+    inner_num: int,
+    columns_num: int,
+    workers: int,
+) -> bool:
+    """Check if product is big enough to spread it between processes."""
+    return (
+        get_workers_num(workers) > 1
+        and rows_num > 1
+        and rows_num * inner_num * columns_num >= PARALLEL_MIN_OPERATIONS
+    )
+
+
+def matmul_parallel(
+    left: Buffer,
+    right: Buffer,
+    rows_num: int,
+    inner_num: int,
+    columns_num: int,
+    workers: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Buffer:
+    """Get product of matrices computing blocks of rows in processes.
+
+    Operands and the result are placed in shared memory, so workers get
+    only names of memory blocks instead of pickled matrices. Buffers
+    which aren't typed arrays (big integers) are multiplied in the
+    current process.
+
+    """
+    if not (_is_typed(left) and _is_typed(right)):
+        return matmul_blocked(
+            left, right, rows_num, inner_num, columns_num, block_size,
+        )
+
+    workers = get_workers_num(workers)
+    result_typecode = (
+        INT_TYPECODE
+        if left.typecode == right.typecode == INT_TYPECODE
+        else FLOAT_TYPECODE
+    )
+
+    with ExitStack() as stack:
+        left_memory = stack.enter_context(_shared_copy(left))
+        right_memory = stack.enter_context(_shared_copy(right))
+        result_memory = stack.enter_context(
+            _shared_copy(zeros(result_typecode, rows_num * columns_num)),
+        )
+
+        rows_per_worker = -(-rows_num // workers)
+        tasks = [
+            RowsTask(
+                left_memory.name,
+                right_memory.name,
+                result_memory.name,
+                left.typecode,
+                right.typecode,
+                result_typecode,
+                row_start,
+                min(row_start + rows_per_worker, rows_num),
+                inner_num,
+                columns_num,
+                block_size,
+            )
+            for row_start in range(0, rows_num, rows_per_worker)
+        ]
+        overflowed_blocks = list(
+            _get_executor(workers).map(_compute_rows, tasks),
+        )
+
+        result = _read(result_memory, result_typecode, rows_num * columns_num)
+
+    if any(block is not None for block in overflowed_blocks):
+        # Integers don't fit into int64, collect exact values.
+        values: list[Number] = []
+        for task, block in zip(tasks, overflowed_blocks):
+            row_slice = slice(
+                task.row_start * columns_num,
+                task.row_stop * columns_num,
+            )
+            values.extend(block if block is not None else result[row_slice])
+        return values
+
+    return result
+
+
+def _compute_rows(task: RowsTask) -> list[Number] | None:
+    """Compute rows of product in worker process.
+
+    Returns:
+        None if rows are written to shared result, or rows as list if
+        they don't fit into the result typed array.
+
+    """
+    with ExitStack() as stack:
+        left_memory = stack.enter_context(_attach(task.left_name))
+        right_memory = stack.enter_context(_attach(task.right_name))
+        result_memory = stack.enter_context(_attach(task.result_name))
+
+        rows_num = task.row_stop - task.row_start
+        left = _read(
+            left_memory,
+            task.left_typecode,
+            rows_num * task.inner_num,
+            task.row_start * task.inner_num,
+        )
+        right = _read(
+            right_memory,
+            task.right_typecode,
+            task.inner_num * task.columns_num,
+        )
+        block = matmul_blocked(
+            left,
+            right,
+            rows_num,
+            task.inner_num,
+            task.columns_num,
+            task.block_size,
+        )
+        if not isinstance(block, array):
+            return block
+
+        start = task.row_start * task.columns_num * block.itemsize
+        _memory_view(result_memory)[
+            start:start + len(block) * block.itemsize
+        ] = memoryview(block).cast("B")
+    return None
+
+
+def _is_typed(values: Buffer) -> bool:
+    return isinstance(values, array) and values.typecode in (
+        INT_TYPECODE,
+        FLOAT_TYPECODE,
+    )
+
+
+def _memory_view(memory: SharedMemory) -> memoryview:
+    if memory.buf is None:
+        raise ValueError("Shared memory is closed.")
+    return memory.buf
+
+
+def _read(
+    memory: SharedMemory,
+    typecode: str,
+    length: int,
+    start: int = 0,
+) -> Buffer:
+    """Copy typed elements from shared memory."""
+    values = array(typecode)
+    start *= values.itemsize
+    values.frombytes(
+        _memory_view(memory)[start:start + length * values.itemsize],
+    )
+    return values
+
+
+@contextmanager
+def _shared_copy(values: Buffer) -> Iterator[SharedMemory]:
+    """Place copy of typed array in new shared memory."""
+    data = memoryview(values).cast("B")  # type: ignore[arg-type]
+    memory = SharedMemory(create=True, size=max(len(data), 1))
+    try:
+        _memory_view(memory)[:len(data)] = data
+        data.release()
+        yield memory
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+@contextmanager
+def _attach(name: str) -> Iterator[SharedMemory]:
+    """Attach to shared memory created by another process."""
+    memory = SharedMemory(name=name)
+    try:
+        yield memory
+    finally:
+        memory.close()
+
+
+@cache
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """Get pool of processes reused between multiplications."""
+    executor = ProcessPoolExecutor(max_workers=workers)
+    atexit.register(executor.shutdown)
+    return executor
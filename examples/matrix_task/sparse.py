@@ -0,0 +1,481 @@
+from __future__ import annotations
+
+import operator
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Iterable, Iterator
+from itertools import repeat
+
+from buffers import INT_TYPECODE, Buffer, Number, pack
+from kernels import to_rows
+from matrix import DifferentSizeException, Matrix, Size
+
+# Sparse results with bigger part of non-zero elements are returned as
+# dense matrices: sparse format costs two numbers per element and its
+# kernels are slower than dense ones on such matrices.
+DENSE_FILL_RATIO = 0.25
+
+
+class SparseMatrix(ABC):
+    """Base class for sparse matrices.
+
+    Provide the same operations as ``Matrix``: addition, subtraction,
+    multiplication by matrix and by number, power and transposition. Only
+    non-zero elements are stored and processed. Results of operations on
+    two sparse matrices are dense if their fill ratio is greater than
+    ``DENSE_FILL_RATIO``, operations with dense matrices give dense results.
+
+    Attributes:
+        size: Get size of matrix.
+        nnz: Get number of stored elements.
+        density: Get part of stored elements.
+        data: Get copy of matrix in the form of nested lists.
+        T: Get matrix transposition.
+
+    """
+
+    size: Size
+
+    @property
+    def rows_num(self) -> int:
+        return self.size.rows_num
+
+    @property
+    def columns_num(self) -> int:
+        return self.size.columns_num
+
+    @property
+    @abstractmethod
+    def nnz(self) -> int:
+        """Get number of stored elements."""
+
+    @property
+    def density(self) -> float:
+        """Get part of stored elements."""
+        return self.nnz / (self.rows_num * self.columns_num)
+
+    @property
+    def data(self) -> list[list[Number]]:
+        """Get copy of matrix in the form of nested lists."""
+        return [list(row) for row in self.to_dense().data]
+
+    @abstractmethod
+    def to_csr(self) -> CSRMatrix:
+        """Convert to compressed sparse row format."""
+
+    def to_dense(self) -> Matrix:
+        """Convert to dense matrix."""
+        return self.to_csr().to_dense()
+
+    @abstractmethod
+    def T(self) -> SparseMatrix:
+        """Get matrix transposition."""
+
+    def __matmul__(
+        self,
+        other: SparseMatrix | Matrix,
+    ) -> SparseMatrix | Matrix:
+        """Get multiplication matrix by matrix.
+
+        Raises:
+            DifferentSizeException: If the number of columns in the first
+            matrix is not equal to the number of rows in the second matrix.
+
+        """
+        if not isinstance(other, (SparseMatrix, Matrix)):
+            return NotImplemented
+
+        if self.columns_num != other.rows_num:
+            raise DifferentSizeException(
+                "the first matrix must have the same number "
+                "of columns as the second matrix has rows",
+            )
+
+        if isinstance(other, Matrix):
+            return self.to_csr().matmul_dense(other)
+        return _choose_format(self.to_csr().matmul_sparse(other.to_csr()))
+
+    def __rmatmul__(self, other: Matrix) -> Matrix:
+        if not isinstance(other, Matrix):
+            return NotImplemented
+
+        if other.columns_num != self.rows_num:
+            raise DifferentSizeException(
+                "the first matrix must have the same number "
+                "of columns as the second matrix has rows",
+            )
+
+        # A @ B == (B.T @ A.T).T
+        transposed = self.T().to_csr().matmul_dense(other.T())
+        return transposed.T().copy()
+
+    def __add__(self, other: SparseMatrix | Matrix) -> SparseMatrix | Matrix:
+        if not isinstance(other, (SparseMatrix, Matrix)):
+            return NotImplemented
+
+        if self.size != other.size:
+            raise DifferentSizeException(
+                "Matrices should have the same size.",
+            )
+
+        if isinstance(other, Matrix):
+            return self.to_csr().add_dense(other)
+        return _choose_format(self.to_csr().add_sparse(other.to_csr()))
+
+    def __radd__(self, other: Matrix) -> Matrix:
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return self + other  # type: ignore[return-value]
+
+    def __mul__(self, number: Number) -> CSRMatrix:
+        """Get multiplication matrix by number."""
+        return self.to_csr().scale(number)
+
+    def __rmul__(self, number: Number) -> CSRMatrix:
+        return self.__mul__(number)
+
+    def __neg__(self) -> CSRMatrix:
+        return -1 * self
+
+    def __sub__(self, other: SparseMatrix | Matrix) -> SparseMatrix | Matrix:
+        return self + -other
+
+    def __rsub__(self, other: Matrix) -> Matrix:
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return -self + other  # type: ignore[return-value]
+
+    def __pow__(self, power: int) -> SparseMatrix | Matrix:
+        """Positive pow of matrix use fast exponentiation algorithm.
+
+        Raises:
+            ValueError: Raise if power isn't positive.
+            DifferentSizeException: If matrix isn't square and power is
+                above one.
+
+        """
+        if power <= 0:
+            raise ValueError("Power must be positive.")
+        if power > 1 and self.rows_num != self.columns_num:
+            raise DifferentSizeException("Matrix should be square.")
+
+        result: SparseMatrix | Matrix = self
+        last_matrix: SparseMatrix | Matrix = self
+
+        power -= 1
+
+        while power > 0:
+            if power % 2:
+                result = result @ last_matrix
+            last_matrix = last_matrix @ last_matrix
+            power //= 2
+
+        return result
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(size={tuple(self.size)}, "
+            f"nnz={self.nnz})"
+        )
+
+
+class CSRMatrix(SparseMatrix):
+    """Matrix in compressed sparse row format.
+
+    Column indexes and values of non-zero elements of row ``i`` are
+    ``indices[indptr[i]:indptr[i + 1]]`` and ``values[...]`` with the same
+    slice. Indexes in a row are sorted.
+
+    """
+
+    def __init__(
+        self,
+        indptr: Iterable[int],
+        indices: Iterable[int],
+        values: Iterable[Number],
+        size: tuple[int, int],
+    ):
+        """Constructor for CSRMatrix class.
+
+        Args:
+            indptr: Start of every row in indices and values, and the end
+                of the last row.
+            indices: Column indexes of elements.
+            values: Values of elements.
+            size: Number of rows and columns.
+
+        Raises:
+            DifferentSizeException: If arrays don't match the size, row
+                starts decrease or indexes are out of the matrix.
+
+        """
+        self.indptr = array(INT_TYPECODE, indptr)
+        self.indices = array(INT_TYPECODE, indices)
+        self.values: Buffer = pack(list(values))
+        self.size = Size(*size)
+
+        if (
+            len(self.indptr) != self.rows_num + 1
+            or len(self.indices) != len(self.values)
+            or self.indptr[0] != 0
+            or self.indptr[-1] != len(self.values)
+        ):
+            raise DifferentSizeException(
+                "Index arrays don't match the size of matrix.",
+            )
+        if not all(map(operator.le, self.indptr, self.indptr[1:])):
+            raise DifferentSizeException("Row starts should not decrease.")
+        if self.nnz and not (
+            0 <= min(self.indices) <= max(self.indices) < self.columns_num
+        ):
+            raise DifferentSizeException("Indexes are out of the matrix.")
+
+    @classmethod
+    def from_dense(cls, matrix: Matrix) -> CSRMatrix:
+        """Convert dense matrix to sparse one."""
+        indptr = [0]
+        indices: list[int] = []
+        values: list[Number] = []
+
+        for row in matrix.data:
+            for col_idx, elem in enumerate(row):
+                if elem:
+                    indices.append(col_idx)
+                    values.append(elem)
+            indptr.append(len(indices))
+
+        return cls(indptr, indices, values, matrix.size)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[dict[int, Number]],
+        size: Size,
+    ) -> CSRMatrix:
+        """Create matrix from rows of ``{column index: value}``."""
+        indptr = [0]
+        indices: list[int] = []
+        values: list[Number] = []
+
+        for row in rows:
+            for col_idx in sorted(row):
+                if row[col_idx]:
+                    indices.append(col_idx)
+                    values.append(row[col_idx])
+            indptr.append(len(indices))
+
+        return cls(indptr, indices, values, size)
+
+    @property
+    def nnz(self) -> int:
+        """Get number of stored elements."""
+        return len(self.values)
+
+    def to_csr(self) -> CSRMatrix:
+        return self
+
+    def to_coo(self) -> COOMatrix:
+        """Convert to coordinate format."""
+        rows = [
+            row_idx
+            for row_idx in range(self.rows_num)
+            for _ in range(self.indptr[row_idx], self.indptr[row_idx + 1])
+        ]
+        return COOMatrix(rows, self.indices, self.values, self.size)
+
+    def to_dense(self) -> Matrix:
+        """Convert to dense matrix."""
+        elements: list[Number] = [0] * (self.rows_num * self.columns_num)
+        for row_idx in range(self.rows_num):
+            row_start = row_idx * self.columns_num
+            for col_idx, elem in self.row_items(row_idx):
+                elements[row_start + col_idx] = elem
+
+        return Matrix.from_values(elements, self.size)
+
+    def row_items(self, row_idx: int) -> Iterator[tuple[int, Number]]:
+        """Get column indexes and values of non-zero elements of the row."""
+        start, stop = self.indptr[row_idx], self.indptr[row_idx + 1]
+        return zip(self.indices[start:stop], self.values[start:stop])
+
+    def T(self) -> CSRMatrix:
+        """Get matrix transposition.
+
+        It's counting sort of elements by column, so it costs
+        O(nnz + columns_num).
+
+        """
+        indptr = [0] * (self.columns_num + 1)
+        for col_idx in self.indices:
+            indptr[col_idx + 1] += 1
+        for col_idx in range(self.columns_num):
+            indptr[col_idx + 1] += indptr[col_idx]
+
+        positions = indptr[:-1]
+        indices = [0] * self.nnz
+        values: list[Number] = [0] * self.nnz
+        for row_idx in range(self.rows_num):
+            for col_idx, elem in self.row_items(row_idx):
+                position = positions[col_idx]
+                indices[position] = row_idx
+                values[position] = elem
+                positions[col_idx] += 1
+
+        return CSRMatrix(
+            indptr,
+            indices,
+            values,
+            Size(self.columns_num, self.rows_num),
+        )
+
+    def matmul_sparse(self, other: CSRMatrix) -> CSRMatrix:
+        """Multiply by sparse matrix row by row (Gustavson algorithm)."""
+        rows = []
+        for row_idx in range(self.rows_num):
+            row: dict[int, Number] = {}
+            for inner_idx, elem in self.row_items(row_idx):
+                for col_idx, other_elem in other.row_items(inner_idx):
+                    row[col_idx] = row.get(col_idx, 0) + elem * other_elem
+            rows.append(row)
+
+        return CSRMatrix.from_rows(
+            rows,
+            Size(self.rows_num, other.columns_num),
+        )
+
+    def matmul_dense(self, other: Matrix) -> Matrix:
+        """Multiply by dense matrix skipping zero elements."""
+        other_rows = to_rows(other.flat(), other.rows_num, other.columns_num)
+        elements: list[Number] = []
+
+        for row_idx in range(self.rows_num):
+            row: list[Number] = [0] * other.columns_num
+            for inner_idx, elem in self.row_items(row_idx):
+                row = list(map(
+                    operator.add,
+                    row,
+                    map(operator.mul, repeat(elem), other_rows[inner_idx]),
+                ))
+            elements.extend(row)
+
+        return other.like(
+            elements,
+            Size(self.rows_num, other.columns_num),
+        )
+
+    def add_sparse(self, other: CSRMatrix) -> CSRMatrix:
+        """Add sparse matrix merging rows."""
+        rows = []
+        for row_idx in range(self.rows_num):
+            row = dict(self.row_items(row_idx))
+            for col_idx, elem in other.row_items(row_idx):
+                row[col_idx] = row.get(col_idx, 0) + elem
+            rows.append(row)
+
+        return CSRMatrix.from_rows(rows, self.size)
+
+    def add_dense(self, other: Matrix) -> Matrix:
+        """Add dense matrix updating only non-zero positions."""
+        elements = list(other.flat())
+        for row_idx in range(self.rows_num):
+            row_start = row_idx * self.columns_num
+            for col_idx, elem in self.row_items(row_idx):
+                elements[row_start + col_idx] += elem
+
+        return other.like(elements, self.size)
+
+    def scale(self, number: Number) -> CSRMatrix:
+        """Multiply by number."""
+        if not number:
+            return CSRMatrix([0] * (self.rows_num + 1), [], [], self.size)
+
+        return CSRMatrix(
+            self.indptr,
+            self.indices,
+            [elem * number for elem in self.values],
+            self.size,
+        )
+
+
+class COOMatrix(SparseMatrix):
+    """Matrix in coordinate format.
+
+    It's the simplest format to build sparse matrix from elements,
+    arithmetic converts it to CSR format. Duplicated coordinates are
+    summed up.
+
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[int],
+        columns: Iterable[int],
+        values: Iterable[Number],
+        size: tuple[int, int],
+    ):
+        """Constructor for COOMatrix class.
+
+        Args:
+            rows: Row indexes of elements.
+            columns: Column indexes of elements.
+            values: Values of elements.
+            size: Number of rows and columns.
+
+        Raises:
+            DifferentSizeException: If arrays have different length or
+                indexes are out of the matrix.
+
+        """
+        self.rows = array(INT_TYPECODE, rows)
+        self.columns = array(INT_TYPECODE, columns)
+        self.values: Buffer = pack(list(values))
+        self.size = Size(*size)
+
+        if not len(self.rows) == len(self.columns) == len(self.values):
+            raise DifferentSizeException(
+                "Coordinates and values should have the same length.",
+            )
+        if self.nnz and (
+            not 0 <= min(self.rows) <= max(self.rows) < self.rows_num
+            or not 0 <= min(self.columns) <= max(self.columns)
+            < self.columns_num
+        ):
+            raise DifferentSizeException("Indexes are out of the matrix.")
+
+    @classmethod
+    def from_dense(cls, matrix: Matrix) -> COOMatrix:
+        """Convert dense matrix to sparse one."""
+        return CSRMatrix.from_dense(matrix).to_coo()
+
+    @property
+    def nnz(self) -> int:
+        """Get number of stored elements."""
+        return len(self.values)
+
+    def to_csr(self) -> CSRMatrix:
+        rows: list[dict[int, Number]] = [{} for _ in range(self.rows_num)]
+        for row_idx, col_idx, elem in zip(
+            self.rows,
+            self.columns,
+            self.values,
+        ):
+            row = rows[row_idx]
+            row[col_idx] = row.get(col_idx, 0) + elem
+
+        return CSRMatrix.from_rows(rows, self.size)
+
+    def T(self) -> COOMatrix:
+        """Get matrix transposition."""
+        return COOMatrix(
+            self.columns,
+            self.rows,
+            self.values,
+            Size(self.columns_num, self.rows_num),
+        )
+
+
+def _choose_format(matrix: CSRMatrix) -> SparseMatrix | Matrix:
+    """Get dense matrix if sparse one is filled enough."""
+    if matrix.density > DENSE_FILL_RATIO:
+        return matrix.to_dense()
+    return matrix
@@ -1,6 +1,33 @@
+import argparse
+import gc
+import random
+from array import array
+from pathlib import Path
+
+import linalg
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from backends import BackendNotAvailableException, NumpyBackend, PythonBackend
+from batch import MatrixBatch
+from benchmark import (
+    OPERATIONS,
+    Measurement,
+    find_regressions,
+    load_results,
+    random_data,
+    reference_matmul,
+    run_suite,
+    run_suite_command,
+    save_results,
+)
+from kernels import STRASSEN, matmul_blocked, matmul_strassen
+from lazy import Expression, chain_order
+from linalg import SingularMatrixException
 from matrix import DifferentSizeException, Matrix, Size
+from ondisk import DiskMatrix, open_matrix, save
+from parallel import should_parallelize
 from pytest_lazyfixture import lazy_fixture
+from sparse import COOMatrix, CSRMatrix
 
 
 @pytest.fixture
@@ -293,3 +320,1057 @@ def test_unary_minus_of_matrix(
     """Test unary minus of matrix."""
     result = -matrix
     assert result.data == expected
+
+
+@pytest.mark.parametrize(
+    ["data", "typecode"],
+    [
+        [[[1, 2], [3, 4]], "q"],
+        [[[1.5, 2], [3, 4]], "d"],
+    ],
+)
+def test_matrix_packed_storage(
+    data: list[list[float]],
+    typecode: str,
+):
+    """Test matrix elements are stored in flat typed array."""
+    matrix = Matrix(data)
+
+    assert isinstance(matrix.buffer, array)
+    assert matrix.buffer.typecode == typecode
+    assert matrix.is_contiguous
+    assert matrix.strides == (2, 1)
+    assert matrix.data == data
+
+
+def test_matrix_with_big_integers():
+    """Test big integers are stored without precision loss."""
+    matrix = Matrix([[2 ** 70, 1], [0, 1]])
+
+    assert matrix.data == [[2 ** 70, 1], [0, 1]]
+    assert (matrix @ matrix).data == [[2 ** 140, 2 ** 70 + 1], [0, 1]]
+
+
+def test_matrix_from_buffer():
+    """Test matrix is created over buffer without copying."""
+    buffer = array("d", [1, 2, 3, 4, 5, 6])
+    matrix = Matrix.from_buffer(buffer, (2, 3))
+
+    assert matrix.data == [[1, 2, 3], [4, 5, 6]]
+    assert matrix[1, 2] == 6
+
+    buffer[0] = 10
+    assert matrix[0][0] == 10
+
+
+def test_matrix_from_buffer_with_strides():
+    """Test matrix over column-major buffer."""
+    matrix = Matrix.from_buffer(
+        array("q", [1, 4, 2, 5, 3, 6]),
+        (2, 3),
+        strides=(1, 2),
+    )
+
+    assert matrix.data == [[1, 2, 3], [4, 5, 6]]
+    assert not matrix.is_contiguous
+    assert (matrix * 2).data == [[2, 4, 6], [8, 10, 12]]
+
+
+def test_matrix_from_small_buffer():
+    """Test buffer should contain all matrix elements."""
+    with pytest.raises(ValueError):  # noqa: PT011
+        Matrix.from_buffer(array("d", [1, 2, 3]), (2, 2))
+
+
+@pytest.fixture
+def numpy_backend() -> str:
+    """Fixture for name of NumPy backend, skip test if it's not installed."""
+    pytest.importorskip("numpy")
+    return NumpyBackend.name
+
+
+@pytest.mark.parametrize(
+    ["max_value", "number"],
+    [
+        [10, 3],
+        [2 ** 30, -7],
+        [2 ** 40, 2 ** 30],
+    ],
+)
+def test_numpy_backend_int_results(
+    numpy_backend: str,
+    max_value: int,
+    number: int,
+):
+    """Test NumPy backend gives the same integer results as Python one."""
+    randomizer = random.Random(max_value)
+    data = [
+        [randomizer.randint(-max_value, max_value) for _ in range(7)]
+        for _ in range(7)
+    ]
+    numpy_matrix = Matrix(data, backend=numpy_backend)
+    python_matrix = Matrix(data, backend=PythonBackend.name)
+
+    assert (numpy_matrix @ numpy_matrix).data == (
+        (python_matrix @ python_matrix).data
+    )
+    assert (numpy_matrix + numpy_matrix).data == (
+        (python_matrix + python_matrix).data
+    )
+    assert (numpy_matrix * number).data == (python_matrix * number).data
+    assert (numpy_matrix ** 3).data == (python_matrix ** 3).data
+
+
+def test_default_backend(
+    monkeypatch: MonkeyPatch,
+    first_square_matrix: Matrix,
+):
+    """Test backend can be selected for all matrices."""
+    monkeypatch.setattr(Matrix, "default_backend", PythonBackend.name)
+    assert isinstance(first_square_matrix.backend, PythonBackend)
+
+    first_square_matrix.backend_name = "unknown"
+    with pytest.raises(BackendNotAvailableException):
+        first_square_matrix @ first_square_matrix
+
+
+def test_unknown_backend():
+    """Test matrix can't be created with unknown backend."""
+    with pytest.raises(BackendNotAvailableException):
+        Matrix([[1]], backend="unknown")
+
+
+@pytest.mark.parametrize(
+    ["rows_num", "inner_num", "columns_num", "block_size"],
+    [
+        [1, 1, 1, 1],
+        [5, 3, 7, 2],
+        [8, 8, 8, 3],
+        [4, 9, 2, 64],
+    ],
+)
+def test_blocked_matmul(
+    rows_num: int,
+    inner_num: int,
+    columns_num: int,
+    block_size: int,
+):
+    """Test tiled matmul gives the same result as the reference one."""
+    left = [
+        [random.randint(-9, 9) for _ in range(inner_num)]
+        for _ in range(rows_num)
+    ]
+    right = [
+        [random.randint(-9, 9) for _ in range(columns_num)]
+        for _ in range(inner_num)
+    ]
+
+    result = matmul_blocked(
+        Matrix(left).buffer,
+        Matrix(right).buffer,
+        rows_num,
+        inner_num,
+        columns_num,
+        block_size,
+    )
+
+    assert result.typecode == "q"
+    assert Matrix.from_buffer(result, (rows_num, columns_num)).data == (
+        reference_matmul(left, right)
+    )
+
+
+def test_blocked_matmul_with_floats():
+    """Test tiled matmul of float matrices."""
+    left, right = random_data(6, "float"), random_data(6, "float")
+    backend = PythonBackend(block_size=4)
+    result = backend.matmul(
+        Matrix(left).buffer,
+        Matrix(right).buffer,
+        6,
+        6,
+        6,
+    )
+
+    assert result.typecode == "d"
+    assert Matrix.from_buffer(result, (6, 6)).data == (
+        reference_matmul(left, right)
+    )
+
+
+@pytest.mark.parametrize(
+    ["rows_num", "inner_num", "columns_num", "cutoff"],
+    [
+        [1, 1, 1, 1],
+        [8, 8, 8, 2],
+        [7, 7, 7, 1],
+        [13, 13, 13, 3],
+        [5, 9, 3, 2],
+    ],
+)
+def test_strassen_matmul(
+    rows_num: int,
+    inner_num: int,
+    columns_num: int,
+    cutoff: int,
+):
+    """Test Strassen algorithm with padding of odd and rectangular sizes."""
+    left = [
+        [random.randint(-9, 9) for _ in range(inner_num)]
+        for _ in range(rows_num)
+    ]
+    right = [
+        [random.randint(-9, 9) for _ in range(columns_num)]
+        for _ in range(inner_num)
+    ]
+
+    result = matmul_strassen(
+        Matrix(left).buffer,
+        Matrix(right).buffer,
+        rows_num,
+        inner_num,
+        columns_num,
+        cutoff,
+    )
+
+    assert Matrix.from_buffer(result, (rows_num, columns_num)).data == (
+        reference_matmul(left, right)
+    )
+
+
+def test_matrix_strassen_strategy(first_square_matrix: Matrix):
+    """Test multiplication strategy is inherited by results."""
+    first_square_matrix.backend_name = PythonBackend.name
+    first_square_matrix.matmul_strategy = STRASSEN
+
+    result = first_square_matrix ** 4
+
+    assert result.matmul_strategy == STRASSEN
+    assert result.data == [[199, 290], [435, 634]]
+
+
+def test_unknown_matmul_strategy(first_square_matrix: Matrix):
+    """Test unknown multiplication strategy."""
+    first_square_matrix.backend_name = PythonBackend.name
+    first_square_matrix.matmul_strategy = "unknown"
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        first_square_matrix @ first_square_matrix
+
+
+def test_lazy_elementwise_fusion(
+    monkeypatch: MonkeyPatch,
+    first_square_matrix: Matrix,
+    second_square_matrix: Matrix,
+):
+    """Test elementwise operations are computed in a single pass."""
+    first_square_matrix.backend_name = PythonBackend.name
+    expected = (
+        2 * first_square_matrix + second_square_matrix - first_square_matrix
+    ).data
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("Temporary matrix was created.")
+
+    monkeypatch.setattr(Matrix, "__add__", _fail)
+    monkeypatch.setattr(Matrix, "__mul__", _fail)
+
+    expression = (
+        2 * first_square_matrix.lazy()
+        + second_square_matrix
+        - first_square_matrix
+    )
+
+    assert isinstance(expression, Expression)
+    assert expression.evaluate().data == expected
+
+
+def test_lazy_with_numpy_backend(
+    numpy_backend: str,
+    first_square_matrix: Matrix,
+    second_square_matrix: Matrix,
+):
+    """Test lazy expression over vectorized backend."""
+    first_square_matrix.backend_name = numpy_backend
+    expression = -first_square_matrix.lazy() * 3 + second_square_matrix
+
+    assert expression.evaluate().data == [[-2, -5], [-9, -11]]
+
+
+def test_lazy_matmul_chain(
+    two_four_matrix: Matrix,
+    four_two_matrix: Matrix,
+    first_square_matrix: Matrix,
+):
+    """Test chain of multiplications is computed in the optimal order."""
+    expression = (
+        four_two_matrix.lazy() @ two_four_matrix @ four_two_matrix
+        @ first_square_matrix
+    )
+
+    assert expression.size == (4, 2)
+    assert expression.evaluate().data == (
+        four_two_matrix @ two_four_matrix @ four_two_matrix
+        @ first_square_matrix
+    ).data
+
+
+def test_lazy_sizes_check(
+    first_square_matrix: Matrix,
+    two_four_matrix: Matrix,
+):
+    """Test sizes are checked while the tree is built."""
+    with pytest.raises(DifferentSizeException):
+        first_square_matrix.lazy() + two_four_matrix
+    with pytest.raises(DifferentSizeException):
+        two_four_matrix.lazy() @ first_square_matrix
+
+
+def test_lazy_result_is_new_matrix(first_square_matrix: Matrix):
+    """Test result of expression doesn't share buffer with input."""
+    result = first_square_matrix.lazy().evaluate()
+    result[0, 0] = 10
+
+    assert result is not first_square_matrix
+    assert first_square_matrix.data == [[1, 2], [3, 4]]
+    with pytest.raises(TypeError):
+        Expression()  # type: ignore[abstract]
+
+
+def test_chain_order():
+    """Test optimal parenthesization of matrix chain."""
+    # (10x30 @ 30x5) @ 5x60 costs 4500, 10x30 @ (30x5 @ 5x60) costs 27000.
+    assert chain_order([10, 30, 5, 60])[0][2] == 1
+    assert chain_order([60, 5, 30, 10])[0][2] == 0
+
+
+def test_rectangular_transposing(two_four_matrix: Matrix):
+    """Test transposition is a view for any size."""
+    transposed = two_four_matrix.T()
+
+    assert transposed.buffer is two_four_matrix.buffer
+    assert transposed.size == (4, 2)
+    assert transposed.data == [[1, 5], [2, 6], [3, 7], [4, 8]]
+    assert transposed.T().data == two_four_matrix.data
+    assert (two_four_matrix @ transposed).data == [[30, 70], [70, 174]]
+
+
+@pytest.mark.parametrize(
+    ["index", "expected"],
+    [
+        [slice(1, 2), [[5, 6, 7, 8]]],
+        [(slice(None), slice(1, 3)), [[2, 3], [6, 7]]],
+        [(slice(None), slice(None, None, 2)), [[1, 3], [5, 7]]],
+        [(1, slice(1, None, 2)), [[6, 8]]],
+        [(slice(None), -1), [[4], [8]]],
+    ],
+)
+def test_matrix_slicing(
+    two_four_matrix: Matrix,
+    index: slice | tuple[int | slice, int | slice],
+    expected: list[list[int]],
+):
+    """Test slices are views sharing the buffer."""
+    view = two_four_matrix[index]
+
+    assert view.buffer is two_four_matrix.buffer
+    assert view.data == expected
+    assert (view * 2).data == [[elem * 2 for elem in row] for row in expected]
+
+
+def test_matrix_copy_on_write(first_square_matrix: Matrix):
+    """Test views and parent don't see writes of each other."""
+    view = first_square_matrix[:, 1:]
+    transposed = first_square_matrix.T()
+
+    view[0, 0] = 10
+    first_square_matrix[1, 0] = 20
+
+    assert view.data == [[10], [4]]
+    assert first_square_matrix.data == [[1, 2], [20, 4]]
+    assert transposed.data == [[1, 3], [2, 4]]
+
+
+def test_matrix_rows_write_elements(first_square_matrix: Matrix):
+    """Test writes to rows change the matrix."""
+    rows = first_square_matrix.data
+    view = first_square_matrix.T()
+
+    first_square_matrix[0][1] = 10
+    rows[1][0] = 20
+
+    assert first_square_matrix.data == [[1, 10], [20, 4]]
+    assert rows == [[1, 10], [20, 4]]
+    assert view.data == [[1, 3], [2, 4]]
+    assert first_square_matrix[1][-1] == 4
+    assert first_square_matrix[1][:1] == [20]
+    assert repr(first_square_matrix) == "Matrix([[1, 10], [20, 4]])"
+
+
+def test_matrix_set_wider_value(first_square_matrix: Matrix):
+    """Test float can be written to integer matrix."""
+    first_square_matrix[0, 1] = 0.5
+
+    assert first_square_matrix.buffer.typecode == "d"
+    assert first_square_matrix.data == [[1, 0.5], [3, 4]]
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        slice(None, None, -1),
+        (slice(None), slice(2, 2)),
+    ],
+)
+def test_matrix_incorrect_slicing(
+    first_square_matrix: Matrix,
+    index: slice | tuple[slice, slice],
+):
+    """Test slices should select elements in direct order."""
+    with pytest.raises(ValueError):  # noqa: PT011
+        first_square_matrix[index]
+
+
+@pytest.fixture
+def sparse_matrix() -> Matrix:
+    """Fixture for dense matrix with mostly zero elements."""
+    data = [[0] * 6 for _ in range(6)]
+    data[0][1] = 2
+    data[2][2] = -1
+    data[3][0] = 5
+    data[5][4] = 3
+    return Matrix(data)
+
+
+def test_sparse_conversion(sparse_matrix: Matrix):
+    """Test conversion between dense and sparse formats."""
+    csr = sparse_matrix.to_sparse()
+    coo = COOMatrix.from_dense(sparse_matrix)
+
+    assert csr.nnz == coo.nnz == 4
+    assert csr.size == coo.size == (6, 6)
+    assert list(csr.indptr) == [0, 1, 1, 2, 3, 3, 4]
+    assert csr.data == coo.data == sparse_matrix.data
+    assert coo.to_csr().data == sparse_matrix.data
+
+
+def test_coo_duplicates():
+    """Test duplicated coordinates are summed up."""
+    coo = COOMatrix([0, 1, 0], [1, 0, 1], [1, 2, 3], (2, 2))
+
+    assert coo.data == [[0, 4], [2, 0]]
+
+
+def test_sparse_operations(
+    sparse_matrix: Matrix,
+    first_square_matrix: Matrix,
+):
+    """Test sparse operations give the same results as dense ones."""
+    csr = sparse_matrix.to_sparse()
+    coo = COOMatrix.from_dense(sparse_matrix)
+    dense = Matrix([
+        [(row_idx * 6 + col_idx) % 7 for col_idx in range(6)]
+        for row_idx in range(6)
+    ])
+
+    assert (csr @ coo).data == (sparse_matrix @ sparse_matrix).data
+    assert (csr @ dense).data == (sparse_matrix @ dense).data
+    assert (dense @ coo).data == (dense @ sparse_matrix).data
+    assert (csr + coo).data == (sparse_matrix + sparse_matrix).data
+    assert (csr - dense).data == (sparse_matrix - dense).data
+    assert (dense - csr).data == (dense - sparse_matrix).data
+    assert (dense + csr).data == (dense + sparse_matrix).data
+    assert (3 * coo).data == (3 * sparse_matrix).data
+    assert (-csr).data == (-sparse_matrix).data
+    assert csr.T().data == coo.T().data == sparse_matrix.T().data
+    assert (csr ** 3).data == (sparse_matrix ** 3).data
+
+    with pytest.raises(DifferentSizeException):
+        csr @ first_square_matrix
+
+
+@pytest.mark.parametrize(
+    ["indptr", "indices"],
+    [
+        [[0, 1], [0]],
+        [[1, 1, 2], [0, 1]],
+        [[0, 2, 1], [0]],
+        [[0, 1, 2], [0, 2]],
+        [[0, 1, 2], [-1, 0]],
+    ],
+)
+def test_incorrect_csr(indptr: list[int], indices: list[int]):
+    """Test CSR arrays are checked."""
+    with pytest.raises(DifferentSizeException):
+        CSRMatrix(indptr, indices, [1] * len(indices), (2, 2))
+
+
+def test_sparse_power_not_square(two_four_matrix: Matrix):
+    """Test only square sparse matrices can be raised to power above one."""
+    csr = two_four_matrix.to_sparse()
+
+    assert (csr ** 1).data == two_four_matrix.data
+    with pytest.raises(DifferentSizeException, match="square"):
+        csr ** 2
+
+
+def test_dense_from_sparse_owns_buffer(sparse_matrix: Matrix):
+    """Test dense matrix from sparse one is protected by copy-on-write."""
+    dense = sparse_matrix.to_sparse().to_dense()
+    transposed = dense.T()
+    dense[0, 1] = 99
+
+    assert transposed[1, 0] == sparse_matrix[0, 1]
+    assert dense[0, 1] == 99
+
+
+def test_sparse_result_format(sparse_matrix: Matrix):
+    """Test result format is chosen by fill ratio."""
+    csr = sparse_matrix.to_sparse()
+    filled = Matrix([[1] * 6 for _ in range(6)]).to_sparse()
+
+    assert isinstance(csr + csr, CSRMatrix)
+    assert isinstance(csr - csr, CSRMatrix)
+    assert (csr - csr).nnz == 0
+    assert isinstance(filled @ filled, Matrix)
+    assert isinstance(csr @ sparse_matrix, Matrix)
+
+
+@pytest.mark.parametrize(
+    ["max_value", "typecode"],
+    [
+        [9, "q"],
+        [2 ** 40, None],
+        [1.5, "d"],
+    ],
+)
+def test_parallel_matmul(
+    monkeypatch: MonkeyPatch,
+    max_value: float,
+    typecode: str | None,
+):
+    """Test product computed by processes is the same as serial one."""
+    monkeypatch.setattr("parallel.PARALLEL_MIN_OPERATIONS", 1)
+    data = [
+        [random.uniform(-max_value, max_value) for _ in range(5)]
+        for _ in range(7)
+    ]
+    if isinstance(max_value, int):
+        data = [[int(elem) for elem in row] for row in data]
+    matrix = Matrix(data, backend=PythonBackend.name)
+    expected = (matrix @ matrix.T()).data
+
+    matrix.workers = 3
+    result = matrix @ matrix.T()
+
+    assert result.workers == 3
+    assert getattr(result.buffer, "typecode", None) == typecode
+    assert result.data == expected
+
+
+@pytest.mark.parametrize(
+    ["size", "workers", "expected"],
+    [
+        [10, 4, False],
+        [1000, 1, False],
+        [1000, 4, True],
+    ],
+)
+def test_should_parallelize(size: int, workers: int, expected: bool):
+    """Test small products are computed in one process."""
+    assert should_parallelize(size, size, size, workers) == expected
+
+
+def test_matrix_file(tmp_path: Path, two_four_matrix: Matrix):
+    """Test matrix file is mapped to memory without reading."""
+    path = tmp_path / "matrix.matrix"
+    save(two_four_matrix.T(), path)
+
+    matrix = open_matrix(path)
+
+    assert isinstance(matrix.buffer, memoryview)
+    assert matrix.size == (4, 2)
+    assert matrix.data == two_four_matrix.T().data
+
+
+def test_not_matrix_file(tmp_path: Path):
+    """Test only matrix files can be opened."""
+    path = tmp_path / "text.txt"
+    path.write_text("some text")
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        open_matrix(path)
+
+
+def test_out_of_core_matmul(
+    tmp_path: Path,
+    two_four_matrix: Matrix,
+    four_two_matrix: Matrix,
+):
+    """Test multiplication of matrices in files tile by tile."""
+    save(four_two_matrix, tmp_path / "left.matrix")
+    save(two_four_matrix, tmp_path / "right.matrix")
+    left = open_matrix(tmp_path / "left.matrix")
+    left.tile_size = 3
+
+    result = left @ open_matrix(tmp_path / "right.matrix")
+    from_memory = two_four_matrix @ left
+
+    assert isinstance(result, DiskMatrix)
+    assert isinstance(from_memory, DiskMatrix)
+    assert result.path.parent == tmp_path
+    assert result.data == (four_two_matrix @ two_four_matrix).data
+    assert from_memory.data == (two_four_matrix @ four_two_matrix).data
+
+    del result, from_memory
+    gc.collect()
+    assert sorted(tmp_path.iterdir()) == [
+        tmp_path / "left.matrix",
+        tmp_path / "right.matrix",
+    ]
+
+
+@pytest.mark.parametrize("power", [1, 2, 5])
+def test_out_of_core_power(
+    tmp_path: Path,
+    first_square_matrix: Matrix,
+    power: int,
+):
+    """Test power of matrix in file."""
+    save(first_square_matrix, tmp_path / "matrix.matrix")
+    matrix = open_matrix(tmp_path / "matrix.matrix")
+    matrix.tile_size = 1
+
+    result = matrix ** power
+
+    assert isinstance(result, DiskMatrix)
+    assert result.data == (first_square_matrix ** power).data
+
+
+def test_writes_reach_matrix_file(
+    tmp_path: Path,
+    first_square_matrix: Matrix,
+):
+    """Test writes after views and products are saved to file."""
+    path = tmp_path / "matrix.matrix"
+    save(first_square_matrix, path)
+    matrix = open_matrix(path, writable=True)
+
+    transposed = matrix.T()
+    product = matrix @ matrix
+    matrix[0, 0] = 10
+    matrix *= 2
+
+    assert open_matrix(path).data == [[20, 4], [6, 8]]
+    # Views of external buffer see its changes.
+    assert transposed.data == [[20, 6], [4, 8]]
+    assert product.data == [[7, 10], [15, 22]]
+
+
+def test_matrix_file_isnt_detached(
+    tmp_path: Path,
+    first_square_matrix: Matrix,
+):
+    """Test writes which don't fit into file fail instead of copying it."""
+    path = tmp_path / "matrix.matrix"
+    save(first_square_matrix, path)
+    matrix = open_matrix(path, writable=True)
+
+    with pytest.raises(TypeError):
+        matrix[0, 0] = 1.5
+    with pytest.raises(TypeError):
+        matrix *= 1.5
+    with pytest.raises(TypeError):
+        open_matrix(path)[0, 0] = 10
+
+    matrix[0, 1] = 5
+    assert isinstance(matrix.buffer, memoryview)
+    assert open_matrix(path).data == [[1, 5], [3, 4]]
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [PythonBackend.name, lazy_fixture("numpy_backend")],
+)
+def test_inplace_operators(
+    first_square_matrix: Matrix,
+    second_square_matrix: Matrix,
+    backend: str,
+):
+    """Test in-place operators write results to own buffer."""
+    matrix = Matrix(first_square_matrix.data, backend=backend)
+    buffer = matrix.buffer
+
+    matrix += second_square_matrix
+    assert matrix.data == [[2, 3], [3, 5]]
+    matrix -= first_square_matrix
+    assert matrix.data == [[1, 1], [0, 1]]
+    matrix *= 3
+    assert matrix.data == [[3, 3], [0, 3]]
+    matrix @= first_square_matrix
+    assert matrix.data == [[12, 18], [9, 12]]
+    matrix @= matrix
+    assert matrix.data == [[306, 432], [216, 306]]
+
+    assert matrix.buffer is buffer
+    assert matrix.backend_name == backend
+
+
+def test_inplace_matmul_reuses_scratch(first_square_matrix: Matrix):
+    """Test repeated in-place products don't allocate new buffers."""
+    first_square_matrix @= first_square_matrix
+    scratch = first_square_matrix._scratch
+    first_square_matrix @= first_square_matrix
+
+    assert scratch is not None
+    assert first_square_matrix._scratch is scratch
+    assert first_square_matrix.data == (
+        (Matrix([[1, 2], [3, 4]]) ** 4).data
+    )
+
+
+def test_inplace_operators_copy_on_write(first_square_matrix: Matrix):
+    """Test in-place operators don't change views."""
+    transposed = first_square_matrix.T()
+    row = first_square_matrix[1:]
+
+    first_square_matrix += transposed
+    row @= first_square_matrix
+
+    assert transposed.data == [[1, 3], [2, 4]]
+    assert first_square_matrix.data == [[2, 5], [5, 8]]
+    assert row.data == [[26, 47]]
+
+
+def test_inplace_operators_widen_buffer(first_square_matrix: Matrix):
+    """Test in-place results which don't fit into own buffer."""
+    matrix = Matrix([[2 ** 62]])
+
+    matrix += matrix
+    first_square_matrix *= 0.5
+
+    assert matrix.data == [[2 ** 63]]
+    assert first_square_matrix.data == [[0.5, 1], [1.5, 2]]
+
+
+def test_inplace_operators_not_matrix(first_square_matrix: Matrix):
+    """Test in-place operators with other types fall back to binary ones."""
+    matrix = first_square_matrix
+    matrix -= first_square_matrix.lazy()
+
+    assert isinstance(matrix, Expression)
+    assert matrix.evaluate().data == [[0, 0], [0, 0]]
+
+
+@pytest.mark.parametrize("power", [2, 3, 10, 37])
+def test_power_buffers(monkeypatch: MonkeyPatch, power: int):
+    """Test power allocates at most three buffers for any exponent."""
+    matrix = Matrix([[1.0, 1.0], [1.0, 0.0]], backend=PythonBackend.name)
+    backend = matrix.backend
+    products = []
+    matmul = backend.matmul
+
+    def counting_matmul(*args, **kwargs):
+        product = matmul(*args, **kwargs)
+        products.append(product)
+        return product
+
+    monkeypatch.setattr(backend, "matmul", counting_matmul)
+
+    result = matrix ** power
+
+    assert len({id(product) for product in products}) <= 3
+    assert result[0, 1] == _fibonacci(power)
+
+
+def _fibonacci(number: int) -> int:
+    previous, current = 0, 1
+    for _ in range(number - 1):
+        previous, current = current, previous + current
+    return current
+
+
+def test_power_not_square(two_four_matrix: Matrix):
+    """Test only square matrices can be raised to power above one."""
+    assert (two_four_matrix ** 1).data == two_four_matrix.data
+    assert pow(two_four_matrix, 1, 3).data == [
+        [1, 2, 0, 1],
+        [2, 0, 1, 2],
+    ]
+
+    with pytest.raises(DifferentSizeException):
+        two_four_matrix ** 2
+
+
+def test_benchmark_suite(tmp_path: Path):
+    """Test suite measures all operations and results are saved."""
+    results = run_suite([3], ["float", "sparse"], repeat=1, number=1)
+
+    assert sorted(results) == sorted(
+        f"{operation}/{dtype}/3"
+        for operation in OPERATIONS
+        for dtype in ("float", "sparse")
+    )
+    assert all(result.throughput > 0 for result in results.values())
+
+    save_results(results, tmp_path / "results.json")
+    assert load_results(tmp_path / "results.json") == results
+
+
+def test_benchmark_regressions():
+    """Test only tracked operations beyond tolerance are regressions."""
+    baseline = {
+        "add/int/10": Measurement(1.0, 100, 1000),
+        "matmul/int/10": Measurement(1.0, 1000, 1000),
+        "pow/int/10": Measurement(1.0, 2000, 1000),
+    }
+    results = {
+        "add/int/10": Measurement(1.1, 90, 1100),
+        "matmul/int/10": Measurement(1.5, 600, 1000),
+        "pow/int/10": Measurement(0.5, 4000, 2000),
+        "sub/int/10": Measurement(10.0, 10, 10000),
+    }
+
+    assert find_regressions(results, baseline, 0.2) == [
+        "matmul/int/10: 1.500000 s against 1.000000 s in baseline",
+        "pow/int/10: 2000 bytes against 1000 bytes in baseline",
+    ]
+
+
+def test_benchmark_without_baseline(tmp_path: Path):
+    """Test missing baseline fails the regression check."""
+    args = argparse.Namespace(
+        sizes=[3],
+        dtypes=["float"],
+        repeat=1,
+        number=1,
+        backend=PythonBackend.name,
+        output=None,
+        baseline=tmp_path / "baseline.json",
+        tolerance=0.25,
+        update_baseline=False,
+    )
+
+    assert run_suite_command(args) != 0
+
+    args.update_baseline = True
+    assert run_suite_command(args) == 0
+    assert args.baseline.exists()
+
+
+@pytest.mark.parametrize(
+    ["data", "expected"],
+    [
+        [[[5]], 5],
+        [[[1, 2], [3, 4]], -2],
+        [[[0, 1], [1, 0]], -1],
+        [[[2, 0, 1], [1, 3, 2], [1, 1, 2]], 6],
+        [[[1, 2], [2, 4]], 0],
+        [[[0, 0], [0, 0]], 0],
+    ],
+)
+def test_det(data: list[list[int]], expected: int):
+    """Test determinant by LU decomposition."""
+    assert Matrix(data).det() == pytest.approx(expected)
+
+
+def test_inverse_and_solve():
+    """Test inverse and solutions of systems with random matrix."""
+    randomizer = random.Random(12)
+    data = [[randomizer.uniform(-1, 1) for _ in range(8)] for _ in range(8)]
+    matrix = Matrix(data)
+    identity = [[float(row == col) for col in range(8)] for row in range(8)]
+    right_side = Matrix([[1, 2], [3, 4]] * 4)
+
+    product = matrix @ matrix.inverse()
+    solution = matrix.solve(right_side)
+
+    for row, expected_row in zip(product.data, identity):
+        assert row == pytest.approx(expected_row)
+    assert solution.size == right_side.size
+    for row, expected_row in zip((matrix @ solution).data, right_side.data):
+        assert row == pytest.approx(expected_row)
+
+
+def test_lu_cache(monkeypatch: MonkeyPatch, first_square_matrix: Matrix):
+    """Test decomposition is reused until matrix is changed."""
+    decompositions = []
+    lu_decompose = linalg.lu_decompose
+
+    def counting_lu_decompose(*args):
+        decompositions.append(args)
+        return lu_decompose(*args)
+
+    monkeypatch.setattr(linalg, "lu_decompose", counting_lu_decompose)
+    transposed = first_square_matrix.T()
+
+    assert first_square_matrix.det() == pytest.approx(-2)
+    first_square_matrix.inverse()
+    first_square_matrix.solve(Matrix([[1], [1]]))
+    assert len(decompositions) == 1
+
+    first_square_matrix[0, 0] = 3
+    assert first_square_matrix.det() == pytest.approx(6)
+    first_square_matrix *= 2
+    assert first_square_matrix.det() == pytest.approx(24)
+    assert transposed.det() == pytest.approx(-2)
+    assert len(decompositions) == 4
+
+
+def test_linalg_errors(two_four_matrix: Matrix, first_square_matrix: Matrix):
+    """Test linear algebra on non-square and singular matrices."""
+    with pytest.raises(DifferentSizeException):
+        two_four_matrix.det()
+    with pytest.raises(DifferentSizeException):
+        first_square_matrix.solve(two_four_matrix.T())
+    with pytest.raises(SingularMatrixException):
+        Matrix([[1, 2], [2, 4]]).inverse()
+
+
+@pytest.fixture
+def matrices_data() -> list[list[list[int]]]:
+    """Fixture for data of several small matrices."""
+    randomizer = random.Random(3)
+    return [
+        [[randomizer.randint(-9, 9) for _ in range(3)] for _ in range(3)]
+        for _ in range(5)
+    ]
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [PythonBackend.name, lazy_fixture("numpy_backend")],
+)
+def test_batch_operations(
+    matrices_data: list[list[list[int]]],
+    first_square_matrix: Matrix,
+    backend: str,
+):
+    """Test batched operations give the same results as matrices one."""
+    batch = MatrixBatch(matrices_data, backend=backend)
+    other = MatrixBatch(matrices_data[::-1], backend=backend)
+    matrices = [Matrix(data) for data in matrices_data]
+    vector = Matrix([[1], [0], [2]])
+
+    assert batch.count == len(batch) == 5
+    assert batch.size == (3, 3)
+    assert (batch + other).data == [
+        (left + right).data for left, right in zip(matrices, matrices[::-1])
+    ]
+    assert (batch - other).data == [
+        (left - right).data for left, right in zip(matrices, matrices[::-1])
+    ]
+    assert (2 * batch).data == [(matrix * 2).data for matrix in matrices]
+    assert (batch @ other).data == [
+        (left @ right).data for left, right in zip(matrices, matrices[::-1])
+    ]
+    assert (batch @ vector).data == [
+        (matrix @ vector).data for matrix in matrices
+    ]
+    assert (vector.T() @ batch).data == [
+        (vector.T() @ matrix).data for matrix in matrices
+    ]
+    assert batch.T().data == [matrix.T().data for matrix in matrices]
+    for power in (1, 2, 7):
+        assert (batch ** power).data == [
+            (matrix ** power).data for matrix in matrices
+        ]
+    assert (batch @ batch).backend_name == backend
+
+
+def test_batch_buffer(matrices_data: list[list[list[int]]]):
+    """Test batch keeps matrices in one buffer shared with items."""
+    batch = MatrixBatch(matrices_data)
+    matrix = batch[-1]
+
+    assert len(batch.buffer) == 45
+    assert matrix.buffer is batch.buffer
+    assert matrix.data == matrices_data[-1]
+
+    batch.data[0][0][0] = 10
+    matrix[0, 0] += 1
+    with pytest.raises(TypeError):
+        matrix[0, 1] = 0.5
+    assert matrix.buffer is batch.buffer
+    assert batch[0][0, 0] == 10
+    assert batch[-1][0, 0] == matrices_data[-1][0][0] + 1
+    assert MatrixBatch.from_matrices(list(batch)).data == batch.data
+    assert MatrixBatch.from_buffer(
+        array("q", range(12)),
+        3,
+        (2, 2),
+    ).data == [[[0, 1], [2, 3]], [[4, 5], [6, 7]], [[8, 9], [10, 11]]]
+
+
+def test_batch_errors(
+    matrices_data: list[list[list[int]]],
+    two_four_matrix: Matrix,
+):
+    """Test batches of different shapes can't be combined."""
+    batch = MatrixBatch(matrices_data)
+
+    with pytest.raises(DifferentSizeException):
+        MatrixBatch([[[1, 2]], [[1], [2]]])
+    with pytest.raises(DifferentSizeException):
+        batch + MatrixBatch(matrices_data[1:])
+    with pytest.raises(DifferentSizeException):
+        batch @ two_four_matrix.T()
+    with pytest.raises(DifferentSizeException):
+        MatrixBatch([[[1, 2]]]) ** 2
+    with pytest.raises(ValueError):  # noqa: PT011
+        MatrixBatch.from_buffer([1, 2, 3], 2, (1, 1))
+
+
+def _fibonacci_mod(number: int, modulo: int) -> int:
+    """Get Fibonacci number by fast doubling."""
+    def _pair(index: int) -> tuple[int, int]:
+        if not index:
+            return 0, 1
+        previous, current = _pair(index // 2)
+        double = previous * (2 * current - previous) % modulo
+        square_sum = (previous ** 2 + current ** 2) % modulo
+        if index % 2:
+            return square_sum, (double + square_sum) % modulo
+        return double, square_sum
+
+    return _pair(number)[0]
+
+
+@pytest.mark.parametrize("power", [1, 2, 10, 97, 10 ** 18])
+def test_modular_power_2x2(power: int):
+    """Test Fibonacci numbers by modular power of companion matrix."""
+    modulo = 10 ** 9 + 7
+
+    result = pow(Matrix([[1, 1], [1, 0]]), power, modulo)
+
+    assert result[0, 1] == _fibonacci_mod(power, modulo)
+    assert result.buffer.typecode == "q"
+
+
+@pytest.mark.parametrize("size", [3, 4])
+def test_modular_power(size: int):
+    """Test modular power gives reduced exact power."""
+    randomizer = random.Random(size)
+    matrix = Matrix([
+        [randomizer.randint(-50, 50) for _ in range(size)]
+        for _ in range(size)
+    ])
+
+    assert pow(matrix, 13, 1000).data == [
+        [elem % 1000 for elem in row] for row in (matrix ** 13).data
+    ]
+
+
+def test_modular_power_errors(
+    first_square_matrix: Matrix,
+    two_four_matrix: Matrix,
+):
+    """Test modular power of unsupported matrices."""
+    with pytest.raises(TypeError):
+        pow(first_square_matrix * 0.5, 2, 7)
+    with pytest.raises(TypeError):
+        pow(first_square_matrix, 2, 2.5)  # type: ignore[arg-type]
+    with pytest.raises(ValueError):  # noqa: PT011
+        pow(first_square_matrix, 2, 0)
+    with pytest.raises(DifferentSizeException):
+        pow(two_four_matrix, 2, 7)
@@ -0,0 +1,169 @@
+import argparse
+import os
+import tempfile
+import timeit
+from pathlib import Path
+
+from duplicate_scanner import get_file_hash
+from hashers import AUTO, HASHERS, get_hasher
+from readers import READERS
+
+DEFAULT_SIZE = 256 * 2**20
+CHUNK_SIZE = 2**20
+# From 4 KiB to 4 GiB.
+READER_SIZES = [4 * 2**10 * 16**power for power in range(6)]
+
+
+def measure_memory(hasher: str, data: bytes, repeat: int) -> float:
+    """Get throughput of hashing data in memory, bytes per second.
+
+    Data is hashed by chunks like files are read.
+
+    """
+    new = get_hasher(hasher).new
+    chunks = [
+        memoryview(data)[start:start + CHUNK_SIZE]
+        for start in range(0, len(data), CHUNK_SIZE)
+    ]
+
+    def hash_data() -> None:
+        hashed = new()
+        for chunk in chunks:
+            hashed.update(chunk)
+        hashed.hexdigest()
+
+    return len(data) / min(timeit.repeat(hash_data, number=1, repeat=repeat))
+
+
+def measure_file(
+    path: Path,
+    repeat: int,
+    hasher: str = AUTO,
+    reader: str = AUTO,
+) -> float:
+    """Get throughput of ``get_file_hash``, bytes per second.
+
+    File is read from page cache after the first measurement, so it shows
+    cost of hashing and of copying from kernel, not speed of disk.
+
+    """
+    size = path.stat().st_size
+    # Small files are hashed many times, so timer resolution doesn't
+    # matter.
+    number = max(1, DEFAULT_SIZE // (size * 16))
+    seconds = min(timeit.repeat(
+        lambda: get_file_hash(path, hasher=hasher, reader=reader),
+        number=number,
+        repeat=repeat,
+    ))
+    return size * number / seconds
+
+
+def write_random_file(path: Path, size: int) -> None:
+    """Write file with random content by chunks."""
+    with open(path, "wb") as file:
+        for start in range(0, size, CHUNK_SIZE):
+            file.write(os.urandom(min(CHUNK_SIZE, size - start)))
+
+
+def run_hashers_command(args: argparse.Namespace) -> None:
+    """Print throughput of hashers."""
+    data = os.urandom(args.size)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "data.bin"
+        path.write_bytes(data)
+
+        print(f"{'hasher':<12} {'memory, GB/s':>14} {'file, GB/s':>12}")
+        for hasher in args.hashers:
+            memory = measure_memory(hasher, data, args.repeat)
+            file = measure_file(path, args.repeat, hasher=hasher)
+            print(f"{hasher:<12} {memory / 1e9:>14.2f} {file / 1e9:>12.2f}")
+
+
+def run_readers_command(args: argparse.Namespace) -> None:
+    """Print throughput of hashing files by each reader."""
+    print(
+        f"{'size, bytes':>12} "
+        + " ".join(f"{f'{reader}, GB/s':>14}" for reader in args.readers),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = Path(directory) / f"{size}.bin"
+            write_random_file(path, size)
+            throughputs = [
+                measure_file(path, args.repeat, args.hasher, reader)
+                for reader in args.readers
+            ]
+            path.unlink()
+            print(
+                f"{size:>12} "
+                + " ".join(
+                    f"{throughput / 1e9:>14.2f}"
+                    for throughput in throughputs
+                ),
+            )
+
+
+def main() -> None:
+    """Run benchmark command."""
+    parser = argparse.ArgumentParser(description="Benchmark file hashing.")
+    commands = parser.add_subparsers(required=True)
+
+    hashers_parser = commands.add_parser(
+        "hashers",
+        help="compare throughput of hash algorithms",
+    )
+    hashers_parser.set_defaults(command=run_hashers_command)
+    hashers_parser.add_argument(
+        "hashers",
+        nargs="*",
+        default=list(HASHERS),
+        help="names of hashers, all available by default",
+    )
+    hashers_parser.add_argument(
+        "--size",
+        type=int,
+        default=DEFAULT_SIZE,
+        help="size of hashed data in bytes",
+    )
+
+    readers_parser = commands.add_parser(
+        "readers",
+        help="compare ways to read files of different size",
+    )
+    readers_parser.set_defaults(command=run_readers_command)
+    readers_parser.add_argument(
+        "--readers",
+        nargs="+",
+        choices=READERS,
+        default=list(READERS),
+        help="ways to read files, all by default",
+    )
+    readers_parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=READER_SIZES,
+        help="sizes of files in bytes, from 4 KiB to 4 GiB by default",
+    )
+    readers_parser.add_argument(
+        "--hash",
+        dest="hasher",
+        default=AUTO,
+        help="hash algorithm",
+    )
+
+    for command_parser in (hashers_parser, readers_parser):
+        command_parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="number of measurements, the best one is reported",
+        )
+
+    args = parser.parse_args()
+    args.command(args)
+
+
+if __name__ == "__main__":
+    main()
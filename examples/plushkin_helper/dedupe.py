@@ -0,0 +1,139 @@
+import os
+import shutil
+from collections.abc import Sequence
+from pathlib import Path
+
+from entities import File, FileKey
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+# Ways to replace duplicate by the kept file.
+HARDLINK = "hardlink"
+REFLINK = "reflink"
+LINKS = (HARDLINK, REFLINK)
+
+# Policies to choose the kept file of duplicates.
+OLDEST = "oldest"
+SHORTEST_PATH = "shortest-path"
+FIRST_ROOT = "first-root"
+KEEP_POLICIES = (OLDEST, SHORTEST_PATH, FIRST_ROOT)
+
+# Linux ioctl sharing all extents of one file with another one, it's
+# ``fcntl.FICLONE`` since Python 3.12.
+FICLONE = getattr(fcntl, "FICLONE", 0x40049409)
+
+
+def choose_kept(
+    files: Sequence[File],
+    keep: str = OLDEST,
+    roots: Sequence[Path] = (),
+) -> File:
+    """Choose file which is kept, other duplicates are linked to it.
+
+    Policies:
+     - ``oldest`` keeps the file created first
+     - ``shortest-path`` keeps the file with the least nested and the
+       shortest path
+     - ``first-root`` keeps the file from the first of ``roots``
+
+    Ties are broken by path, so the choice doesn't depend on the order
+    of files.
+
+    Raises:
+        ValueError: If policy is unknown.
+
+    """
+    if keep == OLDEST:
+        return min(files, key=lambda file: (file.created_at, file.path))
+    if keep == SHORTEST_PATH:
+        return min(
+            files,
+            key=lambda file: (
+                len(file.path.parts),
+                len(os.fsencode(file.path)),
+                file.path,
+            ),
+        )
+    if keep == FIRST_ROOT:
+        return min(
+            files,
+            key=lambda file: (_root_number(file.path, roots), file.path),
+        )
+    raise ValueError(f"Unknown keep policy: {keep}.")
+
+
+def _root_number(path: Path, roots: Sequence[Path]) -> int:
+    """Get number of the first root containing path."""
+    for number, root in enumerate(roots):
+        if path.is_relative_to(root):
+            return number
+    return len(roots)
+
+
+def link_file(kept: File, duplicate: File, link: str = HARDLINK) -> bool:
+    """Replace duplicate by link to the kept file.
+
+    Link is created next to the duplicate under a temporary name and
+    renamed over it, so the duplicate is either replaced or left as it
+    was. Reflink is a new file sharing data with the kept one, it gets
+    permissions and times of the duplicate.
+
+    Files are stat again right before the duplicate is replaced, it's
+    left if any of files was changed since the scan. Files without keys
+    aren't checked.
+
+    Returns:
+        False if duplicate is already a hard link to the kept file or
+        files were changed.
+
+    Raises:
+        ValueError: If way to link is unknown.
+        OSError: If link can't be created, e.g. files are on different
+            file systems or reflinks aren't supported.
+
+    """
+    if link not in LINKS:
+        raise ValueError(f"Unknown link: {link}.")
+    if os.path.samefile(kept.path, duplicate.path):
+        return False
+
+    temporary = duplicate.path.with_name(
+        f".{duplicate.path.name}.{os.urandom(4).hex()}.plushkin",
+    )
+    replaced = False
+    try:
+        if link == HARDLINK:
+            os.link(kept.path, temporary)
+        else:
+            _reflink(kept.path, temporary)
+            shutil.copystat(duplicate.path, temporary)
+        if _is_unchanged(kept) and _is_unchanged(duplicate):
+            os.replace(temporary, duplicate.path)
+            replaced = True
+    finally:
+        if not replaced:
+            temporary.unlink(missing_ok=True)
+    return replaced
+
+
+def _is_unchanged(file: File) -> bool:
+    """Check file has the same key as when it was scanned."""
+    return file.key is None or FileKey.from_stat(os.stat(file.path)) == (
+        file.key
+    )
+
+
+def _reflink(source: Path, destination: Path) -> None:
+    if fcntl is None:  # pragma: no cover
+        raise OSError("Reflinks are not supported.")
+
+    with open(source, "rb") as source_file:
+        with open(destination, "xb") as destination_file:
+            fcntl.ioctl(
+                destination_file.fileno(),
+                FICLONE,
+                source_file.fileno(),
+            )
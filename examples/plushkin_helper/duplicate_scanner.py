@@ -1,76 +1,848 @@
-import hashlib
-from collections import defaultdict
-from datetime import datetime
+import os
+import stat
+import threading
+import time
+from array import array
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from contextlib import ExitStack
+from functools import partial
+from itertools import groupby
 from pathlib import Path
+from queue import SimpleQueue
+from typing import Any, BinaryIO, NamedTuple, TypeAlias, TypeVar
 
-from entities import DuplicatesData, File, ScannerResponse
+from entities import (
+    DuplicatesData,
+    File,
+    FileIndex,
+    FileKey,
+    ScannerResponse,
+    ScanProgress,
+)
+from hash_cache import HashCache
+from hashers import AUTO, get_hasher
+from readers import DEFAULT_BATCH_SIZE, READERS, read_chunks
 
+# Size of the head and of the tail of file hashed by the partial hash.
+PARTIAL_HASH_SIZE = 4 * 2**10
 
-def scan_dir(path: Path) -> ScannerResponse:
-    """Provide to find duplicates in directory.
+THREADS = "threads"
+PROCESSES = "processes"
+POOLS = (THREADS, PROCESSES)
+# Hashes and comparisons submitted to pool at once per worker. Others wait
+# for them, so results of all candidates aren't kept in futures.
+SUBMITTED_PER_WORKER = 4
 
-    It scan directory tree and find duplicated files. It use md5 hash
-    algorithm for mark the same files faster.
+# Groups up to this number of files are compared byte by byte instead of
+# full hashing. Larger groups are hashed and then compared in parts of
+# this size, so open files are limited.
+COMPARED_FILES = 8
+
+# Kinds of hashes in cache.
+PARTIAL = "partial"
+FULL = "full"
+
+# Stages of scan in progress events.
+WALKING = "walking"
+PARTIAL_HASHING = "partial hashing"
+FULL_HASHING = "full hashing"
+VERIFYING = "verifying"
+DONE = "done"
+# Minimal time between progress events in seconds.
+PROGRESS_INTERVAL = 0.5
+
+ScanEvent: TypeAlias = ScanProgress | DuplicatesData
+# Numbers of compared files grouped by content.
+_Compared: TypeAlias = Future[list[list[int]]]
+T = TypeVar("T")
 
-    Args:
-        path: Path to directories
+
+class _Directory(NamedTuple):
+    """Walked directory with its regular files and their stat.
+
+    Walker counts skipped entries, so only the scan changes response.
 
     """
-    hashed_files: dict[str, list[Path]] = defaultdict(list)
 
-    response = _recursion_scan(
-        path,
-        ScannerResponse(path_to_dir=path),
-        hashed_files,
-    )
+    path: str
+    files: list[tuple[str, os.stat_result]]
+    symlinks: int
+    special_files: int
 
-    for files in hashed_files.values():
-        if len(files) <= 1:
-            continue
-        response.duplicates_found += len(files) - 1
 
-        duplicates = DuplicatesData()
-        duplicates.size = files[0].stat().st_size
+def scan_dir(
+    path: Path,
+    jobs: int = 1,
+    pool: str = THREADS,
+    cache: HashCache | None = None,
+    hasher: str = AUTO,
+    reader: str = AUTO,
+    other_dirs: Sequence[Path] = (),
+    verify: bool = False,
+) -> ScannerResponse:
+    """Provide to find duplicates in directory.
+
+    It collects all duplicates found by ``iter_scan``. Duplicates are
+    sorted by paths, so the result doesn't depend on the order of
+    hashing. Duplicates are searched in ``path`` and ``other_dirs``
+    together.
 
-        for file_path in files:
-            ctime = file_path.stat().st_ctime
-            created_at = datetime.fromtimestamp(ctime).date()
-            file = File(path=file_path, created_at=created_at)
-            duplicates.files.append(file)
-        response.duplicates.append(duplicates)
+    Raises:
+        HasherNotAvailableException: If hasher is not available.
+        ValueError: If reader is unknown.
 
+    """
+    response = ScannerResponse(path_to_dir=path, other_dirs=list(other_dirs))
+    response.duplicates = sorted(
+        (
+            event
+            for event in iter_scan(
+                response,
+                jobs,
+                pool,
+                cache,
+                hasher,
+                reader,
+                verify,
+            )
+            if isinstance(event, DuplicatesData)
+        ),
+        key=lambda duplicates: [file.path for file in duplicates.files],
+    )
     return response
 
 
-def _recursion_scan(
-    current_dir: Path,
+def iter_scan(
     response: ScannerResponse,
-    hashed_files: dict[str, list[Path]],
-) -> ScannerResponse:
-    """Recursive scanning directories."""
-    response.folders_scanned += 1
+    jobs: int = 1,
+    pool: str = THREADS,
+    cache: HashCache | None = None,
+    hasher: str = AUTO,
+    reader: str = AUTO,
+    verify: bool = False,
+) -> Iterator[ScanEvent]:
+    """Scan directories and get duplicates as soon as they are found.
+
+    It scan directory trees ``response.roots`` together and find
+    duplicated files. Files are compared in stages, each next stage is more
+    expensive and gets only files which are still candidates to
+    duplicates:
+     - files are grouped by size, a file with unique size can't have
+       duplicates and is never read
+     - files of the same size are grouped by hash of their first and
+       last ``PARTIAL_HASH_SIZE`` bytes
+     - files with the same partial hash are grouped by hash of the
+       whole content
+     - if ``verify`` is set, files are compared byte by byte by
+       ``compare_files``: groups up to ``COMPARED_FILES`` files instead
+       of full hashing, larger groups after it
 
-    for path in current_dir.iterdir():
-        if path.is_file():
-            current_hash = get_file_hash(path)
-            hashed_files[current_hash].append(path)
+    Files are hashed by a pool of workers, partial hashing starts while
+    the tree is still walked and full hashing of a group starts as soon
+    as its partial hashes are known. Threads are enough when reading is
+    the bottleneck, processes help when hashing on fast drives loads CPU.
 
-            response.files_scanned += 1
+    Trees are walked by ``os.scandir`` without recursion, by a thread
+    per device, so directories on different disks are listed in parallel
+    and a disk isn't read by several walkers. Roots inside other roots
+    are skipped. Each file is stat once and the result is used for size,
+    cache key and creation date. Symbolic links aren't followed and,
+    like other special files, aren't compared. Hard links to already
+    found file are skipped. Files are kept in compact ``FileIndex`` and
+    referred by numbers, files are grouped by raw digests.
+
+    Hashes of unchanged files are taken from cache instead of reading
+    files. Entries of files which are deleted or changed are evicted from
+    cache after the scan.
+
+    Counters of the response are updated during the scan, duplicates
+    aren't added to it. Progress is reported at most every
+    ``PROGRESS_INTERVAL`` seconds and once at the end.
+
+    Args:
+        response: Response with paths to directories, it gets counters.
+        jobs: Number of workers, all CPUs if it isn't positive.
+        pool: Kind of workers, ``threads`` or ``processes``.
+        cache: Cache of hashes, files are always read if it isn't set.
+        hasher: Name of hash algorithm.
+        reader: Way to read files hashed as a whole, see ``read_chunks``.
+        verify: Compare content of duplicates, not only their hashes.
+
+    Yields:
+        Groups of duplicates with files sorted by paths and progress.
+
+    Raises:
+        HasherNotAvailableException: If hasher is not available.
+        ValueError: If reader is unknown.
+
+    """
+    hasher = get_hasher(hasher).name
+    if reader not in READERS:
+        raise ValueError(f"Unknown reader: {reader}.")
+
+    if cache is not None:
+        cache.begin_scan()
+    workers = jobs if jobs > 0 else os.cpu_count() or 1
+    with _get_executor(workers, pool) as executor:
+        scan = _Scan(
+            response,
+            _HashPool(
+                executor,
+                workers * SUBMITTED_PER_WORKER,
+                cache,
+                hasher,
+                reader,
+                response,
+            ),
+            verify,
+        )
+        yield from scan.walk()
+        yield from scan.split_by_hashes()
+
+    if cache is not None:
+        for root in response.roots:
+            cache.evict(root)
+    yield scan.progress(DONE)
+
+
+def _get_executor(workers: int, pool: str) -> Executor:
+    """Create pool of workers for hashing.
+
+    Raises:
+        ValueError: If kind of pool is unknown.
+
+    """
+    if pool == THREADS:
+        return ThreadPoolExecutor(workers)
+    if pool == PROCESSES:
+        return ProcessPoolExecutor(workers)
+    raise ValueError(f"Unknown pool: {pool}.")
+
+
+class _HashPool:
+    """Hash files by pool of workers, take unchanged files from cache.
+
+    Cache is consulted before submitting a file, so workers never touch
+    it and process pool can be used too. Hashes are saved to cache as
+    soon as workers finish. Workers get name of hasher, so it's sent to
+    processes without pickling hash functions. No more than ``submitted``
+    tasks are in pool at once, ``submit`` and ``compare`` wait for a free
+    place.
+
+    Attributes:
+        hashed_bytes: Get number of bytes hashed by workers.
+
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        submitted: int,
+        cache: HashCache | None,
+        hasher: str,
+        reader: str,
+        response: ScannerResponse,
+    ):
+        self._executor = executor
+        self._submitted = threading.BoundedSemaphore(submitted)
+        self._cache = cache
+        self._hasher = hasher
+        self._reader = reader
+        self._response = response
+        self._lock = threading.Lock()
+        self.hashed_bytes = 0
+
+    def submit(self, kind: str, path: Path, key: FileKey) -> Future[str]:
+        """Start hashing of file, ``kind`` is ``partial`` or ``full``."""
+        # Hashes of different algorithms are cached separately.
+        cache_kind = f"{self._hasher}/{kind}"
+        if self._cache is not None:
+            cached = self._cache.get(key, cache_kind)
+            if cached is not None:
+                self._response.cached_hashes += 1
+                future: Future[str] = Future()
+                future.set_result(cached)
+                return future
+
+        if kind == PARTIAL:
+            read_size = min(key.size, 2 * PARTIAL_HASH_SIZE)
+            future = self._submit(
+                get_partial_hash,
+                path,
+                key.size,
+                hasher=self._hasher,
+            )
         else:
-            response = _recursion_scan(
+            read_size = key.size
+            future = self._submit(
+                get_file_hash,
                 path,
-                response,
-                hashed_files,
+                hasher=self._hasher,
+                reader=self._reader,
+                size=key.size,
             )
 
-    return response
+        future.add_done_callback(
+            partial(self._done, cache_kind, path, key, read_size),
+        )
+        return future
+
+    def _done(
+        self,
+        kind: str,
+        path: Path,
+        key: FileKey,
+        read_size: int,
+        future: Future[str],
+    ) -> None:
+        # It's called by workers, so shared counter is locked.
+        if future.exception() is not None:
+            return
+        with self._lock:
+            self.hashed_bytes += read_size
+        if self._cache is not None:
+            self._cache.put(key, kind, future.result(), path)
+
+    def compare(self, paths: list[Path]) -> Future[list[list[int]]]:
+        """Start byte by byte comparison of files."""
+        return self._submit(compare_files, paths)
+
+    def _submit(
+        self,
+        function: Callable[..., T],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Future[T]:
+        """Submit task when there is a free place in pool."""
+        self._submitted.acquire()
+        try:
+            future = self._executor.submit(function, *args, **kwargs)
+        except BaseException:
+            self._submitted.release()
+            raise
+        future.add_done_callback(lambda _: self._submitted.release())
+        return future
+
+
+class _FirstBySize:
+    """Table of the first file of each size, with open addressing.
+
+    Slots are numbers of files in an array and sizes are got by numbers,
+    so table takes 8 bytes per slot instead of a dict entry with boxed
+    integers for each file. Slot of size is marked when its first file
+    is taken to group of files with the same size.
+
+    """
+
+    _EMPTY = -1
+    # Grouped file is kept as ``-file - 2`` to tell it from empty slot.
+    _GROUPED_SHIFT = 2
+
+    def __init__(self, size_of: Callable[[int], int]):
+        self._size_of = size_of
+        self._slots = array("q", [self._EMPTY]) * 8
+        self._used = 0
+
+    def add(self, file: int) -> int | None:
+        """Add file, get the first file of its size if it's the second one.
+
+        Returns:
+            The file itself if its size is new, the first file of the
+            size for the second file and None for the next files.
+
+        """
+        size = self._size_of(file)
+        slot = self._find(size)
+        first = self._slots[slot]
+        if first == self._EMPTY:
+            self._slots[slot] = file
+            self._used += 1
+            if 3 * self._used > 2 * len(self._slots):
+                self._grow()
+            return file
+        if first < 0:
+            return None
+        self._slots[slot] = -first - self._GROUPED_SHIFT
+        return first
+
+    def _find(self, size: int) -> int:
+        """Get slot of size or empty slot where size should be."""
+        mask = len(self._slots) - 1
+        # Fibonacci hashing spreads sizes which are multiples of blocks.
+        slot = (size * 0x9E3779B97F4A7C15 >> 32) & mask
+        while True:
+            file = self._slots[slot]
+            if file == self._EMPTY:
+                return slot
+            if file < 0:
+                file = -file - self._GROUPED_SHIFT
+            if self._size_of(file) == size:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _grow(self) -> None:
+        slots = self._slots
+        self._slots = array("q", [self._EMPTY]) * (2 * len(slots))
+        for file in slots:
+            if file == self._EMPTY:
+                continue
+            first = -file - self._GROUPED_SHIFT if file < 0 else file
+            self._slots[self._find(self._size_of(first))] = file
+
+
+class _Scan:
+    """State of one scan, its stages are generators of events.
+
+    Files of unique size are only in the index and the table of the first
+    file by size. Files sharing size with another file are listed in one
+    array, which is sorted by size after walk, and get partial hashes.
+    Hash of file is kept as future while it's computed and as raw digest
+    after that.
+
+    """
+
+    def __init__(
+        self,
+        response: ScannerResponse,
+        hash_pool: _HashPool,
+        verify: bool = False,
+    ):
+        self._response = response
+        self._hash_pool = hash_pool
+        self._verify = verify
+        self._index = FileIndex()
+        self._first_by_size = _FirstBySize(self._index.size)
+        self._same_size = array("Q")
+        self._hashes: dict[int, Future[str] | bytes] = {}
+        self._hashes_lock = threading.Lock()
+        # Groups waiting for comparison, each part of group is compared
+        # with its first file.
+        self._comparing: deque[
+            tuple[int, list[int], list[tuple[list[int], _Compared]]]
+        ] = deque()
+        # Device and inode of files having several hard links.
+        self._linked: set[tuple[int, int]] = set()
+        self._started = self._reported = time.monotonic()
+
+    def walk(self) -> Iterator[ScanEvent]:
+        """Walk trees by a thread per device, add files to the index."""
+        walked: SimpleQueue[_Directory | None] = SimpleQueue()
+        stop = threading.Event()
+        roots_by_device = _group_by_device(_distinct_roots(
+            self._response.roots,
+        ))
+
+        with ThreadPoolExecutor(len(roots_by_device)) as walkers:
+            futures = [
+                walkers.submit(_walk_device, roots, walked, stop)
+                for roots in roots_by_device
+            ]
+            try:
+                running = len(futures)
+                while running:
+                    directory = walked.get()
+                    if directory is None:
+                        running -= 1
+                    else:
+                        yield from self._add_directory(directory)
+            finally:
+                # Walkers are stopped if scan is stopped or failed.
+                stop.set()
+            for future in futures:
+                future.result()
+
+    def _add_directory(self, walked: _Directory) -> Iterator[ScanEvent]:
+        path, files, symlinks, special_files = walked
+        self._response.folders_scanned += 1
+        self._response.symlinks_skipped += symlinks
+        self._response.special_files_skipped += special_files
+
+        directory = self._index.add_directory(path)
+        for name, file_stat in files:
+            if file_stat.st_nlink > 1:
+                inode = (file_stat.st_dev, file_stat.st_ino)
+                if inode in self._linked:
+                    self._response.hard_links_skipped += 1
+                    continue
+                self._linked.add(inode)
+
+            self._response.files_scanned += 1
+            self._add_file(self._index.add_file(directory, name, file_stat))
+            yield from self._report(WALKING)
+
+    def _add_file(self, file: int) -> None:
+        """Group file by size and start partial hashing."""
+        size = self._index.size(file)
+        self._response.bytes_scanned += size
+        # Partial hashing starts as soon as size isn't unique.
+        first = self._first_by_size.add(file)
+        if first == file:
+            return
+        if first is not None:
+            self._same_size.append(first)
+            self._submit(PARTIAL, first)
+        self._same_size.append(file)
+        self._submit(PARTIAL, file)
+
+    def split_by_hashes(self) -> Iterator[ScanEvent]:
+        """Split files of the same size by partial and full hashes.
+
+        Verified groups are split by content at the end.
+
+        """
+        # Groups waiting for full hashes.
+        hashing: list[tuple[int, list[int]]] = []
+        same_size = sorted(self._same_size, key=self._index.size)
+        del self._same_size[:]
+        for size, grouped in groupby(same_size, key=self._index.size):
+            files = list(grouped)
+            self._response.same_size_files += len(files)
+            self._response.partial_hashed += len(files)
+
+            for group in _group_by_hash(files, map(self._pop_hash, files)):
+                if size <= 2 * PARTIAL_HASH_SIZE or (
+                    self._verify and len(group) <= COMPARED_FILES
+                ):
+                    # Partial hash has already covered the whole file or
+                    # reading files once to compare them is enough.
+                    yield from self._found(size, group)
+                else:
+                    self._response.full_hashed += len(group)
+                    for file in group:
+                        self._submit(FULL, file)
+                    hashing.append((size, group))
+            yield from self._report(PARTIAL_HASHING)
+
+        for size, candidates in hashing:
+            for group in _group_by_hash(
+                candidates,
+                map(self._pop_hash, candidates),
+            ):
+                yield from self._found(size, group)
+            yield from self._report(FULL_HASHING)
+
+        yield from self._split_by_content()
+
+    def _found(self, size: int, files: list[int]) -> Iterator[ScanEvent]:
+        """Get duplicates or start comparing them if they are verified."""
+        if self._verify:
+            self._response.verified += len(files)
+            self._compare(size, files)
+        else:
+            yield self._duplicates(size, files)
+
+    def _compare(self, size: int, files: list[int]) -> None:
+        """Start comparing files by parts of ``COMPARED_FILES`` files.
+
+        The first file is in each part, so other files are compared with
+        it.
+
+        """
+        parts = [
+            [0, *range(start, min(start + COMPARED_FILES - 1, len(files)))]
+            for start in range(1, len(files), COMPARED_FILES - 1)
+        ]
+        self._comparing.append((size, files, [
+            (
+                part,
+                self._hash_pool.compare([
+                    self._index.path(files[number]) for number in part
+                ]),
+            )
+            for part in parts
+        ]))
+
+    def _split_by_content(self) -> Iterator[ScanEvent]:
+        """Get groups of files with the same content.
+
+        Files equal to the first file are joined from all parts. If group
+        has several parts, files which differ from the first one are
+        compared again, it happens only if their full hashes collide.
+
+        """
+        while self._comparing:
+            size, files, parts = self._comparing.popleft()
+            same_as_first = [files[0]]
+            different: list[int] = []
+            for part, compared in parts:
+                joined = {0}
+                for group in compared.result():
+                    numbers = [part[number] for number in group]
+                    if numbers[0] == 0:
+                        joined.update(numbers)
+                    elif len(parts) == 1:
+                        yield self._duplicates(
+                            size,
+                            [files[number] for number in numbers],
+                        )
+                same_as_first.extend(
+                    files[number] for number in part[1:] if number in joined
+                )
+                if len(parts) > 1:
+                    different.extend(
+                        files[number]
+                        for number in part[1:]
+                        if number not in joined
+                    )
+
+            if len(same_as_first) > 1:
+                yield self._duplicates(size, same_as_first)
+            if len(different) > 1:
+                self._compare(size, different)
+            yield from self._report(VERIFYING)
+
+    def progress(self, stage: str) -> ScanProgress:
+        """Get current progress of the scan."""
+        self._response.bytes_hashed = self._hash_pool.hashed_bytes
+        return ScanProgress(
+            stage=stage,
+            files_scanned=self._response.files_scanned,
+            folders_scanned=self._response.folders_scanned,
+            bytes_scanned=self._response.bytes_scanned,
+            bytes_hashed=self._response.bytes_hashed,
+            seconds=time.monotonic() - self._started,
+        )
+
+    def _report(self, stage: str) -> Iterator[ScanEvent]:
+        """Get progress if it wasn't reported for a while."""
+        now = time.monotonic()
+        if now - self._reported >= PROGRESS_INTERVAL:
+            self._reported = now
+            yield self.progress(stage)
+
+    def _submit(self, kind: str, file: int) -> None:
+        future = self._hash_pool.submit(
+            kind,
+            self._index.path(file),
+            self._index.key(file),
+        )
+        self._hashes[file] = future
+        # It's called at once if the hash is ready.
+        future.add_done_callback(partial(self._hashed, file))
+
+    def _hashed(self, file: int, future: Future[str]) -> None:
+        """Replace finished future by digest, failed one is left."""
+        if future.exception() is not None:
+            return
+        with self._hashes_lock:
+            # Hash may be already taken by the scan.
+            if self._hashes.get(file) is future:
+                self._hashes[file] = bytes.fromhex(future.result())
+
+    def _pop_hash(self, file: int) -> bytes:
+        """Take digest of file, wait for it if it's computed.
+
+        Raises:
+            OSError: If file can't be read.
+
+        """
+        with self._hashes_lock:
+            file_hash = self._hashes.pop(file)
+        if isinstance(file_hash, Future):
+            return bytes.fromhex(file_hash.result())
+        return file_hash
+
+    def _duplicates(self, size: int, files: list[int]) -> DuplicatesData:
+        """Get group of the same files sorted by paths."""
+        self._response.duplicates_found += len(files) - 1
+        return DuplicatesData(
+            size=size,
+            files=sorted(
+                (
+                    File(
+                        path=self._index.path(file),
+                        created_at=self._index.created_at(file),
+                        key=self._index.key(file),
+                    )
+                    for file in files
+                ),
+                key=lambda file: file.path,
+            ),
+        )
+
 
+def _group_by_hash(
+    files: Sequence[int],
+    hashes: Iterable[bytes],
+) -> list[list[int]]:
+    """Get groups of two and more files with the same hash."""
+    hashed_files: dict[bytes, list[int]] = defaultdict(list)
+    for file, file_hash in zip(files, hashes):
+        hashed_files[file_hash].append(file)
 
-def get_file_hash(path: Path, batch_size: int = 2**20) -> str:
-    """Hash file by md5 hashing."""
-    hashed_file = hashlib.md5()
+    return [group for group in hashed_files.values() if len(group) > 1]
+
+
+def _distinct_roots(roots: Iterable[Path]) -> list[str]:
+    """Get roots which aren't the same as or inside other roots."""
+    real_paths = {root: Path(os.path.realpath(root)) for root in roots}
+    distinct: dict[Path, Path] = {}
+    for root, real_path in sorted(
+        real_paths.items(),
+        key=lambda item: len(item[1].parts),
+    ):
+        if not any(map(real_path.is_relative_to, distinct.values())):
+            distinct[root] = real_path
+    return [os.fspath(root) for root in real_paths if root in distinct]
+
+
+def _group_by_device(roots: Iterable[str]) -> list[list[str]]:
+    """Get roots grouped by device of file system."""
+    roots_by_device: dict[int, list[str]] = defaultdict(list)
+    for root in roots:
+        roots_by_device[os.stat(root).st_dev].append(root)
+    return list(roots_by_device.values())
+
+
+def _walk_device(
+    roots: list[str],
+    walked: SimpleQueue[_Directory | None],
+    stop: threading.Event,
+) -> None:
+    """Walk trees on one device, ``None`` is put to queue at the end."""
+    try:
+        for root in roots:
+            _walk(root, walked, stop)
+    finally:
+        walked.put(None)
+
+
+def _walk(
+    root: str,
+    walked: SimpleQueue[_Directory | None],
+    stop: threading.Event,
+) -> None:
+    """Put each directory of tree with its regular files to queue.
+
+    Directories are walked depth-first by a stack, so deep trees don't
+    hit the recursion limit. Type of entry is known from the directory
+    listing on most file systems, regular files are stat once.
+
+    """
+    directories = [root]
+    while directories and not stop.is_set():
+        path = directories.pop()
+        files = []
+        symlinks = special_files = 0
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_symlink():
+                    symlinks += 1
+                elif entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    file_stat = entry.stat(follow_symlinks=False)
+                    # File may be replaced after listing the directory.
+                    if stat.S_ISREG(file_stat.st_mode):
+                        files.append((entry.name, file_stat))
+                    else:
+                        special_files += 1
+                else:
+                    special_files += 1
+        walked.put(_Directory(path, files, symlinks, special_files))
+
+
+def get_partial_hash(
+    path: Path,
+    size: int,
+    chunk_size: int = PARTIAL_HASH_SIZE,
+    hasher: str = AUTO,
+) -> str:
+    """Hash the first and the last chunks of file.
+
+    Files not greater than two chunks are hashed as a whole.
+
+    """
+    hashed_file = get_hasher(hasher).new()
     with open(path, "rb") as file:
-        while buffer := file.read(batch_size):
-            hashed_file.update(buffer)
+        hashed_file.update(file.read(chunk_size))
+        if size > chunk_size:
+            file.seek(max(size - chunk_size, chunk_size))
+            hashed_file.update(file.read(chunk_size))
 
     return hashed_file.hexdigest()
+
+
+def get_file_hash(
+    path: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    hasher: str = AUTO,
+    reader: str = AUTO,
+    size: int | None = None,
+) -> str:
+    """Hash the whole file, size is known from directory listing."""
+    hashed_file = get_hasher(hasher).new()
+    for chunk in read_chunks(path, batch_size, reader, size):
+        hashed_file.update(chunk)
+
+    return hashed_file.hexdigest()
+
+
+def compare_files(
+    paths: Sequence[Path],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> list[list[int]]:
+    """Get groups of two and more files with the same content.
+
+    Files are read in lockstep by chunks, so each file is read once.
+    Group is split as soon as chunks of its files differ, a file left
+    without equal ones is closed and isn't read further.
+
+    Returns:
+        Groups of numbers of paths, numbers are sorted.
+
+    """
+    with ExitStack() as stack:
+        files = [
+            stack.enter_context(open(path, "rb", buffering=0))
+            for path in paths
+        ]
+        groups = [list(range(len(files)))]
+        same: list[list[int]] = []
+        while groups:
+            compared = groups
+            groups = []
+            for group in compared:
+                for chunk, numbers in _split_by_chunk(
+                    files,
+                    group,
+                    batch_size,
+                ):
+                    if len(numbers) == 1:
+                        files[numbers[0]].close()
+                    elif chunk:
+                        groups.append(numbers)
+                    else:
+                        # All files of group have ended together.
+                        same.append(numbers)
+    return sorted(same)
+
+
+def _split_by_chunk(
+    files: Sequence[BinaryIO],
+    group: list[int],
+    batch_size: int,
+) -> list[tuple[bytes, list[int]]]:
+    """Read the next chunk of each file and group files by chunks.
+
+    Chunks are compared with the first chunk of each found group, not
+    hashed, so comparison is as cheap as ``memcmp``.
+
+    """
+    chunks: list[tuple[bytes, list[int]]] = []
+    for number in group:
+        chunk = files[number].read(batch_size)
+        for other_chunk, numbers in chunks:
+            if chunk == other_chunk:
+                numbers.append(number)
+                break
+        else:
+            chunks.append((chunk, [number]))
+    return chunks
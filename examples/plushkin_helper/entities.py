@@ -1,29 +1,192 @@
+import os
+from array import array
 from dataclasses import dataclass, field
-from datetime import date
+from datetime import date, datetime
 from pathlib import Path
+from typing import NamedTuple
 
 
-@dataclass(kw_only=True, frozen=True)
+class FileKey(NamedTuple):
+    """Identity of file content without reading it.
+
+    File with the same device, inode, size and modification time is
+    considered unchanged.
+
+    """
+
+    device: int
+    inode: int
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def from_stat(cls, stat: os.stat_result) -> "FileKey":
+        """Get key from result of stat call."""
+        return cls(stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class FileIndex:
+    """Compact index of scanned files.
+
+    Files are numbered in the order of adding. Fields of files are
+    stored in arrays and names are encoded into one buffer. Path of each
+    directory is stored once and files refer to it by number. So a file
+    takes 56 bytes and its name instead of hundreds of bytes of
+    ``Path`` and ``os.stat_result`` objects.
+
+    """
+
+    __slots__ = (
+        "_directories",
+        "_parents",
+        "_names",
+        "_name_ends",
+        "_sizes",
+        "_devices",
+        "_inodes",
+        "_mtimes_ns",
+        "_ctimes",
+    )
+
+    def __init__(self) -> None:
+        self._directories: list[str] = []
+        self._parents = array("L")
+        self._names = bytearray()
+        self._name_ends = array("Q")
+        self._sizes = array("q")
+        self._devices = array("Q")
+        self._inodes = array("Q")
+        self._mtimes_ns = array("q")
+        self._ctimes = array("d")
+
+    def add_directory(self, path: str) -> int:
+        """Add directory, get its number."""
+        self._directories.append(path)
+        return len(self._directories) - 1
+
+    def add_file(
+        self,
+        directory: int,
+        name: str,
+        stat: os.stat_result,
+    ) -> int:
+        """Add file from directory, get its number."""
+        self._parents.append(directory)
+        self._names += os.fsencode(name)
+        self._name_ends.append(len(self._names))
+        self._sizes.append(stat.st_size)
+        self._devices.append(stat.st_dev)
+        self._inodes.append(stat.st_ino)
+        self._mtimes_ns.append(stat.st_mtime_ns)
+        self._ctimes.append(stat.st_ctime)
+        return len(self._sizes) - 1
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def path(self, index: int) -> Path:
+        """Get path of file."""
+        start = self._name_ends[index - 1] if index else 0
+        end = self._name_ends[index]
+        name = os.fsdecode(bytes(self._names[start:end]))
+        return Path(self._directories[self._parents[index]], name)
+
+    def size(self, index: int) -> int:
+        """Get size of file."""
+        return self._sizes[index]
+
+    def key(self, index: int) -> FileKey:
+        """Get key of file content in cache."""
+        return FileKey(
+            self._devices[index],
+            self._inodes[index],
+            self._sizes[index],
+            self._mtimes_ns[index],
+        )
+
+    def created_at(self, index: int) -> date:
+        """Get date of file creation."""
+        return datetime.fromtimestamp(self._ctimes[index]).date()
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
 class File:
-    """Dataclass for file."""
+    """Dataclass for file.
+
+    Key is taken when file is scanned, so changes made after the scan
+    can be found.
+
+    """
     path: Path
     created_at: date | None = None
+    key: FileKey | None = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class DuplicatesData:
     """Dataclass contains duplicates of files."""
     files: list[File] = field(default_factory=list)
     size: int = 0
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ScannerResponse:
-    """Scanner result response."""
+    """Scanner result response.
+
+    Counters of stages show how many files got to each stage: files
+    sharing size with other files, files hashed partially, files hashed
+    as a whole and files compared byte by byte. Hashes taken from cache
+    aren't read from disk.
+    Symbolic links, special files like sockets or devices, and hard links
+    to already found files aren't compared.
+
+    Attributes:
+        roots: Get all scanned directories.
+
+    """
     path_to_dir: Path
+    # Directories scanned together with the first one.
+    other_dirs: list[Path] = field(default_factory=list)
 
     files_scanned: int = 0
     folders_scanned: int = 0
     duplicates_found: int = 0
+    bytes_scanned: int = 0
+    symlinks_skipped: int = 0
+    special_files_skipped: int = 0
+    hard_links_skipped: int = 0
+
+    same_size_files: int = 0
+    partial_hashed: int = 0
+    full_hashed: int = 0
+    cached_hashes: int = 0
+    verified: int = 0
+    bytes_hashed: int = 0
 
     duplicates: list[DuplicatesData] = field(default_factory=list)
+
+    @property
+    def roots(self) -> list[Path]:
+        """Get all scanned directories."""
+        return [self.path_to_dir, *self.other_dirs]
+
+
+@dataclass(kw_only=True, frozen=True, slots=True)
+class ScanProgress:
+    """Progress of scan.
+
+    Bytes scanned are sizes of all found files, bytes hashed are read by
+    workers, files which hashes are cached aren't read.
+
+    """
+    stage: str
+    files_scanned: int
+    folders_scanned: int
+    bytes_scanned: int
+    bytes_hashed: int
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        """Get hashed bytes per second."""
+        return self.bytes_hashed / self.seconds if self.seconds else 0.0
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+
+from entities import FileKey
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "plushkin" / "hashes.sqlite3"
+
+
+class HashCache:
+    """Persistent cache of file hashes in SQLite database.
+
+    Hashes of different kinds (e.g. partial and full) are stored for each
+    file. Entry is used only if size and modification time of the file
+    are the same as when it was hashed. Entries are marked by time of
+    the scan which used them. After the scan, other entries are checked
+    by stat of their paths, entries of deleted or changed files are
+    evicted.
+
+    Changes are committed by ``evict`` and ``close``, not by each hash,
+    so saving isn't slowed down by syncing the disk. Cache can be used
+    from several threads.
+
+    Args:
+        path: Path to database file, it's created if it doesn't exist.
+
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._scan_started = 0
+        self.begin_scan()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS hashes ("
+                "device INTEGER, inode INTEGER, kind TEXT, "
+                "size INTEGER, mtime_ns INTEGER, hash TEXT, "
+                "path TEXT, used_at INTEGER, "
+                "PRIMARY KEY (device, inode, kind))",
+            )
+
+    def begin_scan(self) -> None:
+        """Start new scan, entries are marked by time of its start."""
+        self._scan_started = time.time_ns()
+
+    def get(self, key: FileKey, kind: str) -> str | None:
+        """Get hash of unchanged file, None if it isn't cached."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT hash FROM hashes WHERE device = ? AND inode = ? "
+                "AND kind = ? AND size = ? AND mtime_ns = ?",
+                (key.device, key.inode, kind, key.size, key.mtime_ns),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._connection.execute(
+                "UPDATE hashes SET used_at = ? "
+                "WHERE device = ? AND inode = ? AND kind = ?",
+                (self._scan_started, key.device, key.inode, kind),
+            )
+        return row[0]
+
+    def put(self, key: FileKey, kind: str, file_hash: str, path: Path) -> None:
+        """Save hash of file."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO hashes "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key.device,
+                    key.inode,
+                    kind,
+                    key.size,
+                    key.mtime_ns,
+                    file_hash,
+                    os.fsdecode(path.absolute()),
+                    self._scan_started,
+                ),
+            )
+
+    def evict(self, root: Path) -> int:
+        """Remove entries of deleted or changed files in directory.
+
+        It's called after scan of the directory. Entries used by the scan
+        are kept without checking. Files of other entries may be not
+        hashed by the scan, e.g. if their size is unique, so the files
+        are stat again.
+
+        Returns:
+            Number of removed entries.
+
+        """
+        prefix = os.path.join(os.fsdecode(root.absolute()), "")
+        with self._lock:
+            entries = self._connection.execute(
+                "SELECT device, inode, size, mtime_ns, path, kind "
+                "FROM hashes WHERE used_at < ? AND substr(path, 1, ?) = ?",
+                (self._scan_started, len(prefix), prefix),
+            ).fetchall()
+
+        stale = [
+            (device, inode, kind)
+            for device, inode, size, mtime_ns, path, kind in entries
+            if not _is_unchanged(FileKey(device, inode, size, mtime_ns), path)
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM hashes "
+                "WHERE device = ? AND inode = ? AND kind = ?",
+                stale,
+            )
+        return len(stale)
+
+    def close(self) -> None:
+        """Commit changes and close database."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def _is_unchanged(key: FileKey, path: str) -> bool:
+    """Check file at path has the key, unreadable file is changed."""
+    try:
+        file_stat = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return False
+    return FileKey.from_stat(file_stat) == key
@@ -0,0 +1,103 @@
+import hashlib
+import re
+from collections.abc import Callable
+from functools import partial
+from typing import NamedTuple, Protocol
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover
+    xxhash = None
+
+AUTO = "auto"
+MD5 = "md5"
+BLAKE2B = "blake2b"
+XXH3 = "xxh3"
+
+# Digest size of blake2b in bytes, it's 128 bits like md5.
+BLAKE2B_DIGEST_SIZE = 16
+# The greatest digest size of blake2b, ``hashlib.blake2b.MAX_DIGEST_SIZE``.
+BLAKE2B_MAX_DIGEST_SIZE = 64
+# Name of blake2b with custom digest size, e.g. ``blake2b-32``.
+BLAKE2B_SIZED = re.compile(rf"{BLAKE2B}-(\d+)")
+
+
+class HasherNotAvailableException(Exception):
+    """Hasher is not available.
+
+    This error is raised if hasher is unknown or its optional dependencies
+    are not installed.
+
+    Args:
+        name: not available hasher name.
+
+    """
+
+    def __init__(self, name: str):
+        super().__init__(f"{name} hasher is not available.")
+
+
+class HashObject(Protocol):
+    """Incremental hash like objects of ``hashlib``."""
+
+    def update(self, data: bytes | memoryview, /) -> None:
+        """Hash next part of data."""
+
+    def hexdigest(self) -> str:
+        """Get hash of all data."""
+
+
+class Hasher(NamedTuple):
+    """Hash algorithm.
+
+    Attributes:
+        name: Name of algorithm, hashes of different algorithms can't be
+            compared.
+        new: Create hash object.
+
+    """
+
+    name: str
+    new: Callable[[], HashObject]
+
+
+HASHERS: dict[str, Callable[[], HashObject]] = {
+    MD5: hashlib.md5,
+    BLAKE2B: partial(hashlib.blake2b, digest_size=BLAKE2B_DIGEST_SIZE),
+}
+if xxhash is not None:
+    # Non-cryptographic hash, it's several times faster than reading
+    # from disk.
+    HASHERS[XXH3] = xxhash.xxh3_128
+
+
+def register_hasher(name: str, new: Callable[[], HashObject]) -> None:
+    """Make hasher available by its name."""
+    HASHERS[name] = new
+
+
+def get_hasher(name: str = AUTO) -> Hasher:
+    """Get hasher by name.
+
+    The ``auto`` hasher is xxh3 if ``xxhash`` is installed and blake2b
+    otherwise. Blake2b with digest size from 1 to 64 bytes is named
+    like ``blake2b-32``.
+
+    Raises:
+        HasherNotAvailableException: If hasher is unknown or its
+            dependencies are not installed.
+
+    """
+    if name == AUTO:
+        name = XXH3 if XXH3 in HASHERS else BLAKE2B
+
+    if name in HASHERS:
+        return Hasher(name, HASHERS[name])
+
+    sized = BLAKE2B_SIZED.fullmatch(name)
+    if sized and 0 < int(sized[1]) <= BLAKE2B_MAX_DIGEST_SIZE:
+        return Hasher(
+            name,
+            partial(hashlib.blake2b, digest_size=int(sized[1])),
+        )
+    raise HasherNotAvailableException(name)
@@ -1,8 +1,21 @@
 import argparse
+import sys
+from collections.abc import Iterator
 from pathlib import Path
 
 import duplicate_scanner
-from entities import DuplicatesData, ScannerResponse
+from dedupe import (
+    HARDLINK,
+    KEEP_POLICIES,
+    LINKS,
+    OLDEST,
+    choose_kept,
+    link_file,
+)
+from entities import DuplicatesData, ScannerResponse, ScanProgress
+from hash_cache import DEFAULT_CACHE_PATH, HashCache
+from hashers import AUTO, HASHERS, HasherNotAvailableException, get_hasher
+from readers import READERS
 
 
 class Plushkin:
@@ -27,6 +40,25 @@ class Plushkin:
         "Size cleaned: {cleaned_size} bytes\n"
     )
     WRONG_INPUT = "Enter correct number."
+    LINKING_STARTED = f"LINKING started\n{SEP_LINE}"
+    LINKING_END = f"LINKING finished\n{SEP_LINE}\n"
+    DRY_RUN = "Dry run, files are not changed."
+    FILE_IS_KEPT = "Kept: {}"
+    FILE_IS_LINKED = "Linked: {}"
+    FILE_IS_SKIPPED = "Skipped, already linked or changed: {}"
+    FILE_WOULD_BE_LINKED = "Would link: {}"
+    LINKING_REPORT = (
+        "Files linked: {linked_files}\n"
+        "Errors: {errors}\n"
+        "Size reclaimed: {reclaimed_size} bytes\n"
+    )
+    PROGRESS = (
+        "{stage}: {files_scanned} files, {folders_scanned} folders, "
+        "{mib_scanned:.1f} MiB scanned, {mib_hashed:.1f} MiB hashed, "
+        "{throughput:.1f} MiB/s"
+    )
+    # Clear the current line of terminal.
+    CLEAR_LINE = "\r\033[K"
     ERROR = "*--- ERROR ---*"
 
     def __init__(self) -> None:
@@ -38,24 +70,183 @@ class Plushkin:
             "path",
             type=str,
             nargs="+",
-            help="path to dir",
+            help="paths to dirs, duplicates are searched in all of them",
         )
-        self._parser.add_argument(
+        actions = self._parser.add_mutually_exclusive_group()
+        actions.add_argument(
             "-d",
             dest="accumulate",
             action="store_const",
             const=self.scan_with_removing,
             default=self.scan,
-            help="searching with deleting",
+            help="searching with deleting, implies --verify",
+        )
+        actions.add_argument(
+            "--link",
+            choices=LINKS,
+            help=(
+                "replace duplicates by links to kept file without prompts, "
+                "implies --verify"
+            ),
+        )
+        self._parser.add_argument(
+            "--keep",
+            choices=KEEP_POLICIES,
+            default=OLDEST,
+            help="file kept by --link: the oldest, with the shortest path or "
+            "from the first path",
+        )
+        self._parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="only report files which --link would replace",
+        )
+        self._parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="number of workers hashing files, all CPUs if 0",
+        )
+        self._parser.add_argument(
+            "--processes",
+            dest="pool",
+            action="store_const",
+            const=duplicate_scanner.PROCESSES,
+            default=duplicate_scanner.THREADS,
+            help="hash files in processes instead of threads",
+        )
+        self._parser.add_argument(
+            "--hash",
+            dest="hasher",
+            type=self._hasher_name,
+            default=AUTO,
+            help=(
+                f"hash algorithm: {', '.join([AUTO, *HASHERS])} or blake2b "
+                "with digest size in bytes like blake2b-32"
+            ),
+        )
+        self._parser.add_argument(
+            "--reader",
+            choices=READERS,
+            default=AUTO,
+            help="way to read files, auto maps large files to memory",
+        )
+        self._parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="compare duplicates byte by byte, not only their hashes",
+        )
+        self._parser.add_argument(
+            "--cache-path",
+            type=Path,
+            default=DEFAULT_CACHE_PATH,
+            help=f"file with cached hashes, {DEFAULT_CACHE_PATH} by default",
         )
+        self._parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="read all files instead of using cached hashes",
+        )
+        self.jobs = 1
+        self.pool = duplicate_scanner.THREADS
+        self.cache_path: Path | None = None
+        self.hasher = AUTO
+        self.reader = AUTO
+        self.verify = False
+        self.link: str | None = None
+        self.keep = OLDEST
+        self.dry_run = False
+
+    @staticmethod
+    def _hasher_name(name: str) -> str:
+        """Check hasher from command line."""
+        try:
+            return get_hasher(name).name
+        except HasherNotAvailableException as error:
+            raise argparse.ArgumentTypeError(str(error)) from error
+
+    def _scan(self, response: ScannerResponse) -> Iterator[DuplicatesData]:
+        """Scan directory and get duplicates as soon as they are found.
+
+        Progress is shown in the last line of terminal.
+
+        """
+        for event in self._iter_scan(response):
+            if isinstance(event, ScanProgress):
+                self._print_progress(event)
+            else:
+                self._clear_progress()
+                yield event
+        self._clear_progress()
+
+    def _iter_scan(
+        self,
+        response: ScannerResponse,
+    ) -> Iterator[duplicate_scanner.ScanEvent]:
+        """Scan directory with options from command line."""
+        if self.cache_path is None:
+            yield from duplicate_scanner.iter_scan(
+                response,
+                self.jobs,
+                self.pool,
+                hasher=self.hasher,
+                reader=self.reader,
+                verify=self.verify,
+            )
+            return
+
+        with HashCache(self.cache_path) as cache:
+            yield from duplicate_scanner.iter_scan(
+                response,
+                self.jobs,
+                self.pool,
+                cache,
+                self.hasher,
+                self.reader,
+                self.verify,
+            )
+
+    def _print_progress(self, progress: ScanProgress) -> None:
+        """Print progress over the previous one if it's a terminal."""
+        if not sys.stderr.isatty():
+            return
+        print(
+            self.CLEAR_LINE + self.PROGRESS.format(
+                stage=progress.stage.capitalize(),
+                files_scanned=progress.files_scanned,
+                folders_scanned=progress.folders_scanned,
+                mib_scanned=progress.bytes_scanned / 2**20,
+                mib_hashed=progress.bytes_hashed / 2**20,
+                throughput=progress.throughput / 2**20,
+            ),
+            end="",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    def _clear_progress(self) -> None:
+        if sys.stderr.isatty():
+            print(self.CLEAR_LINE, end="", file=sys.stderr, flush=True)
 
     def _print_general_info(self, scan_result: ScannerResponse) -> None:
         """Print general info from result of scanning."""
         print(
-            f"Scan report for folder: {scan_result.path_to_dir}\n"
+            "Scan report for folder: "
+            f"{', '.join(map(str, scan_result.roots))}\n"
             f"Files scanned: {scan_result.files_scanned}\n"
             f"Folders scanned: {scan_result.folders_scanned}\n"
             f"Duplications found: {scan_result.duplicates_found}\n"
+            f"Bytes scanned: {scan_result.bytes_scanned}\n"
+            f"Bytes hashed: {scan_result.bytes_hashed}\n"
+            f"Symbolic links skipped: {scan_result.symlinks_skipped}\n"
+            f"Special files skipped: {scan_result.special_files_skipped}\n"
+            f"Hard links skipped: {scan_result.hard_links_skipped}\n"
+            f"Files with the same size: {scan_result.same_size_files}\n"
+            f"Files hashed partially: {scan_result.partial_hashed}\n"
+            f"Files hashed fully: {scan_result.full_hashed}\n"
+            f"Hashes taken from cache: {scan_result.cached_hashes}\n"
+            f"Files compared byte by byte: {scan_result.verified}\n"
             f"{self.SEP_LINE}",
         )
 
@@ -96,18 +287,19 @@ class Plushkin:
 
         return user_input
 
-    def scan_with_removing(self, path: Path) -> None:
-        """Scan directory with deleting duplicates."""
-        scan_result = duplicate_scanner.scan_dir(path)
-
-        self._print_general_info(scan_result)
+    def scan_with_removing(self, path: Path, *other_dirs: Path) -> None:
+        """Scan directories with deleting duplicates."""
+        scan_result = ScannerResponse(
+            path_to_dir=path,
+            other_dirs=list(other_dirs),
+        )
         print(self.CLEANING_STARTED)
 
         removed_files = 0
         errors = 0
         cleaned_size = 0
 
-        for duplicate in scan_result.duplicates:
+        for duplicate in self._scan(scan_result):
             self._print_duplicates(duplicate)
 
             max_number = len(duplicate.files)
@@ -129,27 +321,116 @@ class Plushkin:
             print(self.SEP_LINE)
 
         print(self.CLEANING_END)
+        self._print_general_info(scan_result)
         print(self.DELETING_REPORT.format(
             removed_files=removed_files,
             errors=errors,
             cleaned_size=cleaned_size,
         ))
 
-    def scan(self, path: Path) -> None:
-        """Scan directory."""
-        scan_result = duplicate_scanner.scan_dir(path)
+    def _link_duplicates(
+        self,
+        duplicate: DuplicatesData,
+        roots: list[Path],
+    ) -> tuple[int, int]:
+        """Replace duplicates by links to the file kept by policy.
 
+        Returns:
+            Numbers of replaced files and of errors. Dry run counts files
+            which would be replaced.
+
+        """
+        kept = choose_kept(duplicate.files, self.keep, roots)
+        print(self.FILE_IS_KEPT.format(kept.path))
+
+        linked_files = 0
+        errors = 0
+        for file in duplicate.files:
+            if file is kept:
+                continue
+            if self.dry_run:
+                print(self.FILE_WOULD_BE_LINKED.format(file.path))
+                linked_files += 1
+                continue
+
+            try:
+                if link_file(kept, file, self.link or HARDLINK):
+                    print(self.FILE_IS_LINKED.format(file.path))
+                    linked_files += 1
+                else:
+                    print(self.FILE_IS_SKIPPED.format(file.path))
+            except OSError as error:
+                print(self.ERROR)
+                print(error)
+                errors += 1
+        return linked_files, errors
+
+    def scan_with_linking(self, path: Path, *other_dirs: Path) -> None:
+        """Scan directories, replace duplicates by links without prompts."""
+        scan_result = ScannerResponse(
+            path_to_dir=path,
+            other_dirs=list(other_dirs),
+        )
+        print(self.LINKING_STARTED)
+        if self.dry_run:
+            print(self.DRY_RUN)
+
+        linked_files = 0
+        errors = 0
+        reclaimed_size = 0
+
+        for duplicate in self._scan(scan_result):
+            print(f"Size: {duplicate.size} bytes\n")
+            linked, failed = self._link_duplicates(
+                duplicate,
+                scan_result.roots,
+            )
+            linked_files += linked
+            errors += failed
+            reclaimed_size += linked * duplicate.size
+            print(self.SEP_LINE)
+
+        print(self.LINKING_END)
         self._print_general_info(scan_result)
-        for duplicate in scan_result.duplicates:
+        print(self.LINKING_REPORT.format(
+            linked_files=linked_files,
+            errors=errors,
+            reclaimed_size=reclaimed_size,
+        ))
+
+    def scan(self, path: Path, *other_dirs: Path) -> None:
+        """Scan directories, duplicates are printed as soon as found."""
+        scan_result = ScannerResponse(
+            path_to_dir=path,
+            other_dirs=list(other_dirs),
+        )
+
+        for duplicate in self._scan(scan_result):
             self._print_duplicates(duplicate)
             print(self.SEP_LINE)
+        self._print_general_info(scan_result)
 
     def parse(self) -> None:
         """Parse attribute from command line."""
         args = self._parser.parse_args()
+        self.jobs = args.jobs
+        self.pool = args.pool
+        self.cache_path = None if args.no_cache else args.cache_path
+        self.hasher = args.hasher
+        self.reader = args.reader
+        # Files are deleted or replaced, so hashes aren't trusted, e.g.
+        # cache misses changes which kept size and time of file.
+        self.verify = (
+            args.verify
+            or args.link is not None
+            or args.accumulate == self.scan_with_removing
+        )
+        self.link = args.link
+        self.keep = args.keep
+        self.dry_run = args.dry_run
 
-        path = Path(args.path[0])
-        args.accumulate(path)
+        accumulate = self.scan_with_linking if args.link else args.accumulate
+        accumulate(*map(Path, args.path))
 
 
 if __name__ == "__main__":
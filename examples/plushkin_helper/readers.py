@@ -0,0 +1,89 @@
+import io
+import mmap
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+AUTO = "auto"
+READ = "read"
+READINTO = "readinto"
+MMAP = "mmap"
+READERS = (AUTO, READ, READINTO, MMAP)
+
+DEFAULT_BATCH_SIZE = 2**20
+# The auto reader maps files from this size, smaller ones are read into
+# buffer, because mapping costs more than copying few pages.
+MMAP_THRESHOLD = 16 * 2**20
+
+Chunk = bytes | memoryview
+
+
+def read_chunks(
+    path: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    reader: str = AUTO,
+    size: int | None = None,
+) -> Iterator[Chunk]:
+    """Read file sequentially by chunks.
+
+    Readers:
+     - ``read`` creates new bytes object for each chunk
+     - ``readinto`` reads all chunks into one buffer, which isn't
+       larger than the file, a chunk is valid until the next one is read
+     - ``mmap`` maps the whole file to memory and gets it as one chunk,
+       so it isn't copied from page cache at all
+     - ``auto`` maps files from ``MMAP_THRESHOLD`` bytes and reads
+       smaller files into buffer
+
+    Kernel is advised that file larger than a chunk is read
+    sequentially, so it reads ahead more aggressively. Size of file is
+    used to choose reader and buffer, it's stat only if size isn't set.
+
+    Raises:
+        ValueError: If reader is unknown.
+
+    """
+    if reader not in READERS:
+        raise ValueError(f"Unknown reader: {reader}.")
+
+    with open(path, "rb", buffering=0) as file:
+        if size is None:
+            size = os.fstat(file.fileno()).st_size
+        if size > batch_size and hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        if reader == AUTO:
+            reader = MMAP if size >= MMAP_THRESHOLD else READINTO
+
+        if reader == READ:
+            while chunk := file.read(batch_size):
+                yield chunk
+        elif reader == READINTO:
+            # The whole small file is read by one call, the next one
+            # finds the end of file.
+            yield from _read_into_buffer(file, min(batch_size, size + 1))
+        else:
+            yield from _map(file.fileno())
+
+
+def _read_into_buffer(file: io.FileIO, batch_size: int) -> Iterator[Chunk]:
+    # Unbuffered file reads directly into the buffer.
+    buffer = memoryview(bytearray(batch_size))
+    while read_size := file.readinto(buffer):
+        yield buffer[:read_size]
+
+
+def _map(file_descriptor: int) -> Iterator[Chunk]:
+    try:
+        memory = mmap.mmap(file_descriptor, 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # Empty file can't be mapped.
+        return
+
+    with memory:
+        if hasattr(memory, "madvise"):
+            memory.madvise(mmap.MADV_SEQUENTIAL)
+        # View is released before unmapping, even if it's still
+        # referenced by caller.
+        with memoryview(memory) as chunk:
+            yield chunk
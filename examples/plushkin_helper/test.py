@@ -1,11 +1,39 @@
+import hashlib
+import inspect
+import os
+import stat
+import sys
+import threading
+import tracemalloc
+from concurrent.futures import Executor, Future
+from datetime import date
 from pathlib import Path
+from typing import Any
 
+import dedupe
 import duplicate_scanner
 import pytest
+from _pytest.capture import CaptureFixture
 from _pytest.monkeypatch import MonkeyPatch
-from entities import DuplicatesData, ScannerResponse
+from entities import (
+    DuplicatesData,
+    File,
+    FileIndex,
+    FileKey,
+    ScannerResponse,
+    ScanProgress,
+)
+from hash_cache import HashCache
+from hashers import (
+    BLAKE2B,
+    HASHERS,
+    MD5,
+    HasherNotAvailableException,
+    get_hasher,
+)
 from plushkin import Plushkin
 from pytest_lazyfixture import lazy_fixture
+from readers import READERS
 
 
 @pytest.fixture
@@ -120,6 +148,7 @@ def test_scan_directory_with_removing(
         files_scanned=2,
         folders_scanned=4,
         duplicates_found=0,
+        bytes_scanned=23,
         duplicates=[],
     )
     monkeypatch.setattr(
@@ -136,3 +165,925 @@ def test_scan_directory_with_removing(
 
     response = duplicate_scanner.scan_dir(tmp_path)
     assert response == expected
+
+
+@pytest.fixture
+def big_files(tmp_path: Path) -> Path:
+    """Fixture with big files of the same size."""
+    chunk = b"x" * duplicate_scanner.PARTIAL_HASH_SIZE
+    folder = tmp_path / "path"
+    folder.mkdir()
+
+    (folder / "original.bin").write_bytes(chunk + b"middle" + chunk)
+    (folder / "copy.bin").write_bytes(chunk + b"middle" + chunk)
+    (folder / "other middle.bin").write_bytes(chunk + b"MIDDLE" + chunk)
+    (folder / "other head.bin").write_bytes(b"y" + chunk + b"iddle" + chunk)
+    (folder / "other size.bin").write_bytes(chunk)
+
+    return folder
+
+
+def test_scan_stages(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    big_files: Path,
+) -> None:
+    """Test only files which may be duplicates get to further stages."""
+    full_hashed = []
+    get_file_hash = duplicate_scanner.get_file_hash
+
+    def _get_file_hash(path: Path, **kwargs: Any) -> str:
+        full_hashed.append(path.name)
+        return get_file_hash(path, **kwargs)
+
+    monkeypatch.setattr(duplicate_scanner, "get_file_hash", _get_file_hash)
+
+    response = duplicate_scanner.scan_dir(tmp_path)
+
+    assert response.files_scanned == 5
+    assert response.same_size_files == 4
+    assert response.partial_hashed == 4
+    assert response.full_hashed == 3
+    assert sorted(full_hashed) == [
+        "copy.bin",
+        "original.bin",
+        "other middle.bin",
+    ]
+    assert response.duplicates_found == 1
+    assert sorted(
+        file.path.name for file in response.duplicates[0].files
+    ) == ["copy.bin", "original.bin"]
+    assert response.duplicates[0].size == (
+        2 * duplicate_scanner.PARTIAL_HASH_SIZE + 6
+    )
+
+
+def test_small_files_are_not_hashed_twice(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    two_duplicates: Path,
+) -> None:
+    """Test partial hash of small files is used as the full one."""
+    monkeypatch.setattr(duplicate_scanner, "get_file_hash", None)
+
+    response = duplicate_scanner.scan_dir(tmp_path)
+
+    assert response.duplicates_found == 1
+    assert response.partial_hashed == 2
+    assert response.full_hashed == 0
+
+
+@pytest.mark.parametrize(
+    ["jobs", "pool"],
+    [
+        [1, duplicate_scanner.THREADS],
+        [4, duplicate_scanner.THREADS],
+        [0, duplicate_scanner.THREADS],
+        [2, duplicate_scanner.PROCESSES],
+    ],
+)
+def test_parallel_scan(
+    tmp_path: Path,
+    big_files: Path,
+    jobs: int,
+    pool: str,
+) -> None:
+    """Test result of scan doesn't depend on workers."""
+    for index in range(10):
+        (big_files / f"small copy {index}.txt").write_text("same text")
+        (big_files / f"unique {index}.txt").write_text("text" * index)
+
+    response = duplicate_scanner.scan_dir(tmp_path, jobs, pool)
+
+    assert response.duplicates_found == 10
+    assert [
+        [file.path.name for file in duplicates.files]
+        for duplicates in response.duplicates
+    ] == [
+        ["copy.bin", "original.bin"],
+        [f"small copy {index}.txt" for index in range(10)],
+    ]
+
+
+def test_unknown_pool(tmp_path: Path) -> None:
+    """Test unknown kind of workers."""
+    with pytest.raises(ValueError):  # noqa: PT011
+        duplicate_scanner.scan_dir(tmp_path, pool="fibers")
+
+
+def test_rescan_with_cache(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    big_files: Path,
+) -> None:
+    """Test unchanged files aren't read again."""
+    cache_path = tmp_path / "cache.sqlite3"
+    with HashCache(cache_path) as cache:
+        first = duplicate_scanner.scan_dir(big_files, cache=cache)
+
+    monkeypatch.setattr(duplicate_scanner, "get_partial_hash", None)
+    monkeypatch.setattr(duplicate_scanner, "get_file_hash", None)
+    with HashCache(cache_path) as cache:
+        second = duplicate_scanner.scan_dir(big_files, cache=cache)
+
+    assert first.cached_hashes == 0
+    assert second.cached_hashes == 7
+    assert second.duplicates == first.duplicates
+
+
+def test_changed_file_is_hashed_again(
+    tmp_path: Path,
+    big_files: Path,
+) -> None:
+    """Test cache isn't used for modified file."""
+    cache_path = tmp_path / "cache.sqlite3"
+    with HashCache(cache_path) as cache:
+        duplicate_scanner.scan_dir(big_files, cache=cache)
+
+    copy = big_files / "copy.bin"
+    copy.write_bytes(copy.read_bytes().replace(b"middle", b"MIDDLE"))
+    with HashCache(cache_path) as cache:
+        response = duplicate_scanner.scan_dir(big_files, cache=cache)
+
+    assert response.cached_hashes == 5
+    assert [
+        sorted(file.path.name for file in duplicates.files)
+        for duplicates in response.duplicates
+    ] == [["copy.bin", "other middle.bin"]]
+
+
+def test_cache_evicts_deleted_files(tmp_path: Path, big_files: Path) -> None:
+    """Test entries of deleted files are removed after scan."""
+    cache_path = tmp_path / "cache.sqlite3"
+    with HashCache(cache_path) as cache:
+        duplicate_scanner.scan_dir(big_files, cache=cache)
+        (big_files / "other middle.bin").unlink()
+        (big_files / "other head.bin").unlink()
+        # The same cache is used by the next scan.
+        response = duplicate_scanner.scan_dir(big_files, cache=cache)
+        assert cache.evict(big_files) == 0
+
+    assert response.cached_hashes == 4
+    with HashCache(cache_path) as cache:
+        # Entries of existing files are kept without new scan.
+        assert cache.evict(big_files) == 0
+        (big_files / "copy.bin").unlink()
+        assert cache.evict(tmp_path / "other") == 0
+        assert cache.evict(big_files) == 2
+
+
+def test_cache_evicts_files_which_cant_be_stat(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    big_files: Path,
+) -> None:
+    """Test errors of stat don't fail eviction after scan."""
+    cache_path = tmp_path / "cache.sqlite3"
+    with HashCache(cache_path) as cache:
+        duplicate_scanner.scan_dir(big_files, cache=cache)
+
+    def _stat(*args: Any, **kwargs: Any) -> os.stat_result:
+        raise PermissionError("Permission denied")
+
+    with HashCache(cache_path) as cache:
+        monkeypatch.setattr(os, "stat", _stat)
+        assert cache.evict(big_files) == 7
+
+
+def test_cache_keeps_files_of_unique_size(
+    tmp_path: Path,
+    big_files: Path,
+) -> None:
+    """Test entries of files which aren't hashed again are kept."""
+    cache_path = tmp_path / "cache.sqlite3"
+    with HashCache(cache_path) as cache:
+        duplicate_scanner.scan_dir(big_files, cache=cache)
+
+    (big_files / "other middle.bin").unlink()
+    (big_files / "other head.bin").unlink()
+    (big_files / "copy.bin").unlink()
+    with HashCache(cache_path) as cache:
+        # The original has unique size now and isn't hashed.
+        response = duplicate_scanner.scan_dir(big_files, cache=cache)
+
+    assert response.same_size_files == 0
+    (big_files / "copy.bin").write_bytes(
+        (big_files / "original.bin").read_bytes(),
+    )
+    with HashCache(cache_path) as cache:
+        response = duplicate_scanner.scan_dir(big_files, cache=cache)
+
+    assert response.cached_hashes == 2
+    assert response.duplicates_found == 1
+
+
+@pytest.mark.parametrize("hasher", [*HASHERS, "blake2b-32"])
+def test_scan_with_hasher(
+    tmp_path: Path,
+    big_files: Path,
+    hasher: str,
+) -> None:
+    """Test result of scan doesn't depend on hash algorithm."""
+    response = duplicate_scanner.scan_dir(tmp_path, hasher=hasher)
+
+    assert [
+        [file.path.name for file in duplicates.files]
+        for duplicates in response.duplicates
+    ] == [["copy.bin", "original.bin"]]
+
+
+@pytest.mark.parametrize(
+    ["hasher", "digest_size"],
+    [[MD5, 16], [BLAKE2B, 16], ["blake2b-8", 8], ["blake2b-64", 64]],
+)
+def test_digest_size(tmp_path: Path, hasher: str, digest_size: int) -> None:
+    """Test length of hashes."""
+    file = tmp_path / "file.txt"
+    file.write_text("text")
+
+    file_hash = duplicate_scanner.get_file_hash(file, hasher=hasher)
+
+    assert len(file_hash) == 2 * digest_size
+    assert file_hash == duplicate_scanner.get_partial_hash(
+        file,
+        4,
+        hasher=hasher,
+    )
+
+
+@pytest.mark.parametrize("hasher", ["sha0", "blake2b-0", "blake2b-65"])
+def test_unknown_hasher(tmp_path: Path, hasher: str) -> None:
+    """Test unknown hash algorithm."""
+    with pytest.raises(HasherNotAvailableException):
+        get_hasher(hasher)
+    with pytest.raises(HasherNotAvailableException):
+        duplicate_scanner.scan_dir(tmp_path, hasher=hasher)
+
+
+def test_cache_separates_hashers(tmp_path: Path, big_files: Path) -> None:
+    """Test hashes of other algorithm aren't taken from cache."""
+    cache_path = tmp_path / "cache.sqlite3"
+    with HashCache(cache_path) as cache:
+        duplicate_scanner.scan_dir(big_files, cache=cache, hasher=MD5)
+    with HashCache(cache_path) as cache:
+        response = duplicate_scanner.scan_dir(
+            big_files,
+            cache=cache,
+            hasher=BLAKE2B,
+        )
+
+    assert response.cached_hashes == 0
+    assert response.duplicates_found == 1
+
+
+def test_deep_tree(tmp_path: Path) -> None:
+    """Test tree deeper than recursion limit is scanned."""
+    depth = 100
+    folder = tmp_path
+    for _ in range(depth):
+        folder /= "dir"
+        folder.mkdir()
+    (tmp_path / "file.txt").write_text("same text")
+    (folder / "file.txt").write_text("same text")
+
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack()) + depth // 2)
+    try:
+        response = duplicate_scanner.scan_dir(tmp_path)
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    assert response.folders_scanned == depth + 1
+    assert response.duplicates_found == 1
+
+
+def test_symlinks_and_special_files_are_skipped(two_duplicates: Path) -> None:
+    """Test only regular files are compared."""
+    root = two_duplicates.parent
+    (root / "link to file").symlink_to(root / "file 1.txt")
+    (root / "link to dir").symlink_to(two_duplicates)
+    (root / "broken link").symlink_to(root / "missing")
+    os.mkfifo(root / "fifo")
+
+    response = duplicate_scanner.scan_dir(root)
+
+    assert response.files_scanned == 3
+    assert response.folders_scanned == 3
+    assert response.symlinks_skipped == 3
+    assert response.special_files_skipped == 1
+    assert [
+        [file.path.name for file in duplicates.files]
+        for duplicates in response.duplicates
+    ] == [["file 1.txt", "file 2.txt"]]
+
+
+def test_files_are_not_stat_again(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    big_files: Path,
+) -> None:
+    """Test stat from directory listing is used for all stages.
+
+    Only roots of scan are stat to find their devices.
+
+    """
+    def _checked(stat_function: Any) -> Any:
+        def _stat(*args: Any, **kwargs: Any) -> os.stat_result:
+            result = stat_function(*args, **kwargs)
+            if stat.S_ISREG(result.st_mode):
+                raise AssertionError("File is stat again.")
+            return result
+
+        return _stat
+
+    # ``Path.stat`` calls ``os.stat`` too.
+    monkeypatch.setattr(os, "stat", _checked(os.stat))
+    monkeypatch.setattr(os, "fstat", _checked(os.fstat))
+
+    response = duplicate_scanner.scan_dir(tmp_path)
+
+    assert response.duplicates_found == 1
+    assert response.duplicates[0].files[0].created_at is not None
+
+
+@pytest.mark.parametrize("reader", READERS)
+@pytest.mark.parametrize("size", [0, 1, 1000, 4096, 10000])
+def test_readers(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    reader: str,
+    size: int,
+) -> None:
+    """Test hash doesn't depend on the way file is read."""
+    monkeypatch.setattr("readers.MMAP_THRESHOLD", 4096)
+    file = tmp_path / "file.bin"
+    file.write_bytes(os.urandom(size))
+
+    assert duplicate_scanner.get_file_hash(
+        file,
+        batch_size=1024,
+        hasher=MD5,
+        reader=reader,
+    ) == hashlib.md5(file.read_bytes()).hexdigest()
+
+
+@pytest.mark.parametrize("reader", READERS)
+def test_scan_with_reader(
+    tmp_path: Path,
+    big_files: Path,
+    reader: str,
+) -> None:
+    """Test result of scan doesn't depend on reader."""
+    response = duplicate_scanner.scan_dir(tmp_path, reader=reader)
+
+    assert response.full_hashed == 3
+    assert [
+        [file.path.name for file in duplicates.files]
+        for duplicates in response.duplicates
+    ] == [["copy.bin", "original.bin"]]
+
+
+def test_unknown_reader(tmp_path: Path) -> None:
+    """Test unknown way to read files."""
+    with pytest.raises(ValueError):  # noqa: PT011
+        duplicate_scanner.scan_dir(tmp_path, reader="aio")
+
+
+def test_duplicates_are_yielded_before_scan_ends(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    big_files: Path,
+) -> None:
+    """Test group is got while other files are still hashed."""
+    for index in range(2):
+        (big_files / f"small copy {index}.txt").write_text("same text")
+    can_hash = threading.Event()
+    get_file_hash = duplicate_scanner.get_file_hash
+
+    def _get_file_hash(path: Path, **kwargs: Any) -> str:
+        assert can_hash.wait(5)
+        return get_file_hash(path, **kwargs)
+
+    monkeypatch.setattr(duplicate_scanner, "get_file_hash", _get_file_hash)
+
+    response = ScannerResponse(path_to_dir=tmp_path)
+    events = duplicate_scanner.iter_scan(response, jobs=2)
+    first = next(
+        event for event in events if isinstance(event, DuplicatesData)
+    )
+    assert [file.path.name for file in first.files] == [
+        "small copy 0.txt",
+        "small copy 1.txt",
+    ]
+    assert response.duplicates_found == 1
+
+    can_hash.set()
+    rest = [event for event in events if isinstance(event, DuplicatesData)]
+    assert [
+        [file.path.name for file in duplicates.files] for duplicates in rest
+    ] == [["copy.bin", "original.bin"]]
+    assert response.duplicates_found == 2
+    assert response.duplicates == []
+
+
+def test_submitted_hashes_are_limited(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Test pool doesn't get more tasks than allowed per worker."""
+    for index in range(20):
+        (tmp_path / f"{index}.txt").write_text(f"text {index % 10}")
+    pending = []
+    get_executor = duplicate_scanner._get_executor
+
+    def _get_executor(workers: int, pool: str) -> Executor:
+        executor = get_executor(workers, pool)
+        submit = executor.submit
+
+        def _submit(*args: Any, **kwargs: Any) -> Future[Any]:
+            future = submit(*args, **kwargs)
+            pending.append(future)
+            assert sum(not task.done() for task in pending) <= (
+                workers * duplicate_scanner.SUBMITTED_PER_WORKER
+            )
+            return future
+
+        monkeypatch.setattr(executor, "submit", _submit)
+        return executor
+
+    monkeypatch.setattr(duplicate_scanner, "_get_executor", _get_executor)
+
+    response = duplicate_scanner.scan_dir(tmp_path)
+    assert len(pending) == 20
+    assert len(response.duplicates) == 10
+
+
+def test_scan_progress(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    big_files: Path,
+) -> None:
+    """Test progress events."""
+    monkeypatch.setattr(duplicate_scanner, "PROGRESS_INTERVAL", 0)
+
+    response = ScannerResponse(path_to_dir=tmp_path)
+    progress = [
+        event
+        for event in duplicate_scanner.iter_scan(response)
+        if isinstance(event, ScanProgress)
+    ]
+
+    assert [event.files_scanned for event in progress[:5]] == [
+        1, 2, 3, 4, 5,
+    ]
+    assert {event.stage for event in progress} == {
+        duplicate_scanner.WALKING,
+        duplicate_scanner.PARTIAL_HASHING,
+        duplicate_scanner.FULL_HASHING,
+        duplicate_scanner.DONE,
+    }
+    last = progress[-1]
+    chunk_size = duplicate_scanner.PARTIAL_HASH_SIZE
+    assert last.stage == duplicate_scanner.DONE
+    assert last.bytes_scanned == response.bytes_scanned == (
+        4 * (2 * chunk_size + 6) + chunk_size
+    )
+    # Four files are hashed partially and three as a whole.
+    assert last.bytes_hashed == response.bytes_hashed == (
+        4 * 2 * chunk_size + 3 * (2 * chunk_size + 6)
+    )
+    assert last.throughput > 0
+
+
+def test_cli_prints_duplicates_before_report(
+    capsys: CaptureFixture[str],
+    tmp_path: Path,
+    two_duplicates: Path,
+) -> None:
+    """Test duplicates are printed as soon as they are found."""
+    Plushkin().scan(tmp_path)
+
+    output = capsys.readouterr().out
+    assert output.startswith("Size: 9 bytes")
+    assert output.index("file 2.txt") < output.index("Scan report")
+    assert "Bytes scanned: 32" in output
+
+
+def test_file_index(tmp_path: Path) -> None:
+    """Test files are got back from index."""
+    names = ["file.txt", "файл.txt", os.fsdecode(b"\xff.bin")]
+    folder = tmp_path / "dir"
+    folder.mkdir()
+    for size, name in enumerate(names):
+        (folder / name).write_bytes(b"x" * size)
+
+    index = FileIndex()
+    index.add_directory(os.fspath(tmp_path))
+    directory = index.add_directory(os.fspath(folder))
+    files = [
+        index.add_file(directory, name, (folder / name).stat())
+        for name in names
+    ]
+
+    assert len(index) == 3
+    for file, name in zip(files, names):
+        path = folder / name
+        assert index.path(file) == path
+        assert index.size(file) == path.stat().st_size
+        assert index.key(file) == FileKey.from_stat(path.stat())
+        assert index.created_at(file) is not None
+
+
+def test_file_index_is_compact(tmp_path: Path) -> None:
+    """Test file takes a few dozen bytes besides its name."""
+    files_num = 10000
+    file = tmp_path / "file.txt"
+    file.write_text("text")
+    file_stat = file.stat()
+
+    index = FileIndex()
+    directory = index.add_directory(os.fspath(tmp_path))
+    tracemalloc.start()
+    try:
+        for number in range(files_num):
+            index.add_file(directory, f"{number:08}", file_stat)
+        memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert memory / files_num < 8 + 64
+
+
+def test_first_by_size_groups_files() -> None:
+    """Test table gives the first file of size for the second one."""
+    sizes = [4096, 8192, 4096, 4096, 0, 8192]
+    first_by_size = duplicate_scanner._FirstBySize(sizes.__getitem__)
+
+    firsts = [first_by_size.add(file) for file in range(len(sizes))]
+
+    assert firsts == [0, 1, 0, None, 4, 1]
+
+
+def test_first_by_size_is_compact() -> None:
+    """Test table of files of unique sizes takes a few dozen bytes."""
+    files_num = 10000
+    first_by_size = duplicate_scanner._FirstBySize(lambda file: 512 * file)
+    tracemalloc.start()
+    try:
+        for file in range(files_num):
+            assert first_by_size.add(file) == file
+        memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert memory / files_num < 8 * 3
+
+
+def test_scan_several_roots(tmp_path: Path) -> None:
+    """Test duplicates are found across roots."""
+    roots = [tmp_path / "first", tmp_path / "second"]
+    for number, root in enumerate(roots):
+        (root / "dir").mkdir(parents=True)
+        (root / "dir" / "file.txt").write_text("same text")
+        (root / "other.txt").write_text(f"other text {number}")
+
+    response = duplicate_scanner.scan_dir(roots[0], other_dirs=roots[1:])
+
+    assert response.roots == roots
+    assert response.files_scanned == 4
+    assert response.folders_scanned == 4
+    assert [
+        [file.path for file in duplicates.files]
+        for duplicates in response.duplicates
+    ] == [[root / "dir" / "file.txt" for root in roots]]
+
+
+def test_nested_roots_are_scanned_once(
+    tmp_path: Path,
+    two_duplicates: Path,
+) -> None:
+    """Test the same and nested roots don't duplicate files."""
+    response = duplicate_scanner.scan_dir(
+        two_duplicates,
+        other_dirs=[tmp_path, tmp_path / "path" / ".." / "path"],
+    )
+
+    assert response.files_scanned == 3
+    assert response.duplicates_found == 1
+
+
+def test_hard_links_are_skipped(tmp_path: Path) -> None:
+    """Test hard links to the same file aren't duplicates."""
+    file = tmp_path / "file.txt"
+    file.write_text("same text")
+    (tmp_path / "link.txt").hardlink_to(file)
+    (tmp_path / "copy.txt").write_text("same text")
+
+    response = duplicate_scanner.scan_dir(tmp_path)
+
+    assert response.files_scanned == 2
+    assert response.hard_links_skipped == 1
+    assert response.duplicates_found == 1
+    assert response.bytes_scanned == 18
+
+
+def test_cli_scans_several_roots(
+    capsys: CaptureFixture[str],
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Test all paths from command line are scanned."""
+    roots = [tmp_path / "first", tmp_path / "second"]
+    for root in roots:
+        root.mkdir()
+        (root / "file.txt").write_text("same text")
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["plushkin.py", "--no-cache", *map(str, roots)],
+    )
+
+    Plushkin().parse()
+
+    output = capsys.readouterr().out
+    assert f"Scan report for folder: {roots[0]}, {roots[1]}" in output
+    assert "Duplications found: 1" in output
+
+
+@pytest.mark.parametrize(
+    ["keep", "kept"],
+    [
+        [dedupe.OLDEST, "b/old.txt"],
+        [dedupe.SHORTEST_PATH, "c.txt"],
+        [dedupe.FIRST_ROOT, "a/b/new.txt"],
+    ],
+)
+def test_choose_kept(keep: str, kept: str) -> None:
+    """Test kept file is chosen by policy."""
+    files = [
+        File(path=Path("a/b/new.txt"), created_at=date(2024, 2, 1)),
+        File(path=Path("b/old.txt"), created_at=date(2024, 1, 1)),
+        File(path=Path("c.txt"), created_at=date(2024, 3, 1)),
+    ]
+
+    assert dedupe.choose_kept(files, keep, [Path("a"), Path(".")]).path == (
+        Path(kept)
+    )
+
+
+def test_unknown_keep_policy() -> None:
+    """Test error is raised for unknown keep policy."""
+    files = [File(path=Path("file.txt"), created_at=date(2024, 1, 1))]
+    with pytest.raises(ValueError):  # noqa: PT011
+        dedupe.choose_kept(files, "newest")
+
+
+def _scanned(path: Path) -> File:
+    """Get file with its current key, like scan creates it."""
+    return File(path=path, key=FileKey.from_stat(path.stat()))
+
+
+def test_link_file(tmp_path: Path) -> None:
+    """Test duplicate is replaced by hard link."""
+    kept = tmp_path / "kept.txt"
+    kept.write_text("same text")
+    duplicate = tmp_path / "duplicate.txt"
+    duplicate.write_text("same text")
+
+    assert dedupe.link_file(_scanned(kept), _scanned(duplicate))
+    assert duplicate.samefile(kept)
+    assert duplicate.read_text() == "same text"
+    assert not dedupe.link_file(_scanned(kept), _scanned(duplicate))
+    assert sorted(tmp_path.iterdir()) == [duplicate, kept]
+
+
+@pytest.mark.parametrize("changed", ["kept.txt", "duplicate.txt"])
+def test_changed_file_is_not_linked(tmp_path: Path, changed: str) -> None:
+    """Test files changed after the scan are left as they are."""
+    kept = tmp_path / "kept.txt"
+    kept.write_text("same text")
+    duplicate = tmp_path / "duplicate.txt"
+    duplicate.write_text("same text")
+    files = [_scanned(kept), _scanned(duplicate)]
+    (tmp_path / changed).write_text("other text")
+
+    assert not dedupe.link_file(*files)
+    assert not duplicate.samefile(kept)
+    assert (tmp_path / changed).read_text() == "other text"
+    assert sorted(tmp_path.iterdir()) == [duplicate, kept]
+
+
+@pytest.mark.parametrize("link", dedupe.LINKS)
+def test_failed_link_keeps_duplicate(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    link: str,
+) -> None:
+    """Test duplicate isn't changed and temporary file is removed."""
+    kept = tmp_path / "kept.txt"
+    kept.write_text("same text")
+    duplicate = tmp_path / "duplicate.txt"
+    duplicate.write_text("same text")
+
+    def _replace(*args: Any) -> None:
+        raise OSError("Disk is full.")
+
+    monkeypatch.setattr(os, "replace", _replace)
+
+    with pytest.raises(OSError, match="|".join([
+        "Disk is full",
+        "Operation not supported",
+        "Invalid argument",
+    ])):
+        dedupe.link_file(_scanned(kept), _scanned(duplicate), link)
+    assert not duplicate.samefile(kept)
+    assert duplicate.read_text() == "same text"
+    assert sorted(tmp_path.iterdir()) == [duplicate, kept]
+
+
+def test_unknown_link(tmp_path: Path) -> None:
+    """Test error is raised for unknown way to link."""
+    file = tmp_path / "file.txt"
+    file.write_text("text")
+    with pytest.raises(ValueError):  # noqa: PT011
+        dedupe.link_file(_scanned(file), _scanned(file), "symlink")
+
+
+def test_cli_doesnt_link_files_changed_in_place(
+    capsys: CaptureFixture[str],
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Test cached hashes of files with the same key don't link them.
+
+    File is changed keeping its size and modification time, so cache
+    takes it as unchanged.
+
+    """
+    root = tmp_path / "root"
+    root.mkdir()
+    kept = root / "kept.txt"
+    kept.write_text("hello")
+    changed = root / "changed.txt"
+    changed.write_text("hello")
+    cache_path = tmp_path / "cache.sqlite3"
+    with HashCache(cache_path) as cache:
+        duplicate_scanner.scan_dir(root, cache=cache)
+
+    changed_stat = changed.stat()
+    changed.write_text("WORLD")
+    os.utime(
+        changed,
+        ns=(changed_stat.st_atime_ns, changed_stat.st_mtime_ns),
+    )
+    assert FileKey.from_stat(changed.stat()) == (
+        FileKey.from_stat(changed_stat)
+    )
+    monkeypatch.setattr(sys, "argv", [
+        "plushkin.py",
+        "--cache-path",
+        str(cache_path),
+        "--link",
+        dedupe.HARDLINK,
+        str(root),
+    ])
+
+    Plushkin().parse()
+
+    assert "Files linked: 0" in capsys.readouterr().out
+    assert not changed.samefile(kept)
+    assert changed.read_text() == "WORLD"
+
+
+@pytest.mark.parametrize("dry_run", [False, True])
+def test_cli_links_duplicates(
+    capsys: CaptureFixture[str],
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    dry_run: bool,
+) -> None:
+    """Test duplicates are linked to the kept file without prompts."""
+    roots = [tmp_path / "first", tmp_path / "second" / "dir"]
+    for root in roots:
+        root.mkdir(parents=True)
+    files = [
+        roots[0] / "dir" / "file.txt",
+        roots[0] / "file.txt",
+        roots[1] / "file.txt",
+    ]
+    files[0].parent.mkdir()
+    for file in files:
+        file.write_text("same text")
+    monkeypatch.setattr(sys, "argv", [
+        "plushkin.py",
+        "--no-cache",
+        "--link",
+        dedupe.HARDLINK,
+        "--keep",
+        dedupe.SHORTEST_PATH,
+        *(["--dry-run"] if dry_run else []),
+        *map(str, roots),
+    ])
+    monkeypatch.setattr("builtins.input", lambda _: pytest.fail("Prompt."))
+
+    Plushkin().parse()
+
+    output = capsys.readouterr().out
+    assert f"Kept: {files[1]}" in output
+    assert "Files linked: 2\nErrors: 0\nSize reclaimed: 18 bytes" in output
+    assert [file.samefile(files[1]) for file in files] == [
+        not dry_run,
+        True,
+        not dry_run,
+    ]
+
+
+def test_compare_files(tmp_path: Path) -> None:
+    """Test files are grouped by content chunk by chunk."""
+    contents = [b"aaaaab", b"aaaaaa", b"aaaaab", b"baaaaa", b"aaaaaa", b"aaa"]
+    paths = []
+    for number, content in enumerate(contents):
+        path = tmp_path / f"{number}.bin"
+        path.write_bytes(content)
+        paths.append(path)
+
+    assert duplicate_scanner.compare_files(paths, batch_size=2) == [
+        [0, 2],
+        [1, 4],
+    ]
+    assert duplicate_scanner.compare_files(paths[:1]) == []
+
+
+@pytest.mark.parametrize("compared_files", [2, 8])
+def test_scan_with_verification(
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    compared_files: int,
+) -> None:
+    """Test files with colliding hashes aren't duplicates if verified."""
+    size = 4 * duplicate_scanner.PARTIAL_HASH_SIZE
+    for number, content in enumerate(b"aabbc"):
+        (tmp_path / f"{number}.bin").write_bytes(bytes([content]) * size)
+    monkeypatch.setattr(
+        duplicate_scanner,
+        "get_partial_hash",
+        lambda *args, **kwargs: "00",
+    )
+    monkeypatch.setattr(
+        duplicate_scanner,
+        "get_file_hash",
+        lambda *args, **kwargs: "00",
+    )
+    monkeypatch.setattr(duplicate_scanner, "COMPARED_FILES", compared_files)
+
+    assert duplicate_scanner.scan_dir(tmp_path).duplicates_found == 4
+
+    response = duplicate_scanner.scan_dir(tmp_path, verify=True)
+
+    assert response.duplicates_found == 2
+    assert response.verified == 5
+    # Large groups are fully hashed before comparison.
+    assert response.full_hashed == (5 if compared_files == 2 else 0)
+    assert [
+        [file.path.name for file in duplicates.files]
+        for duplicates in response.duplicates
+    ] == [["0.bin", "1.bin"], ["2.bin", "3.bin"]]
+
+
+def test_cli_verifies_duplicates(
+    capsys: CaptureFixture[str],
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    two_duplicates: Path,
+) -> None:
+    """Test duplicates are compared byte by byte from command line."""
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["plushkin.py", "--no-cache", "--verify", str(tmp_path)],
+    )
+
+    Plushkin().parse()
+
+    output = capsys.readouterr().out
+    assert "Duplications found: 1" in output
+    assert "Files compared byte by byte: 2" in output
+
+
+def test_cli_verifies_duplicates_before_deleting(
+    capsys: CaptureFixture[str],
+    monkeypatch: MonkeyPatch,
+    tmp_path: Path,
+    two_duplicates: Path,
+) -> None:
+    """Test deletion doesn't trust hashes."""
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["plushkin.py", "--no-cache", "-d", str(tmp_path)],
+    )
+    monkeypatch.setattr("builtins.input", lambda _: "")
+
+    Plushkin().parse()
+
+    assert "Files compared byte by byte: 2" in capsys.readouterr().out